@@ -1,6 +1,8 @@
 from oemof import solph
 from oemof.solph import sequence, Bus, Sink, Flow, Investment
 from oemof.solph.components import GenericStorage, ExtractionTurbineCHP
+from pyomo.core.base.block import SimpleBlock
+from pyomo.environ import Constraint, NonNegativeReals, Set, Var
 
 from oemof.tabular import facades
 from oemof.tabular.facades import Link, TYPEMAP
@@ -174,6 +176,175 @@ class AsymmetricStorage(GenericStorage, Facade):
         self._set_flows()
 
 
+class CompactStorageBlock(SimpleBlock):
+    r"""Base block for storages with further terms in their storage balance.
+
+    Facades with a compact formulation model parts of their component, e.g. the inflow of a
+    reservoir or the drive power of vehicles, in the storage balance instead of as subnodes:
+
+    .. math::
+
+        x^{level}(t) =
+        x^{level}(t-1) \cdot (1 - c^{loss\_rate}(t))
+        + \left(x^{flow, in}(t) \cdot c^{inflow\_conversion\_factor}(t)
+        - \frac{x^{flow, out}(t)}{c^{outflow\_conversion\_factor}(t)}
+        + x^{balance}(t)\right) \cdot \tau(t)
+        \qquad \forall t \in T
+
+    The term :math:`x^{balance}(t)` is defined by the sub-classes, see balance_term().
+
+    The variables and constraints are named like those of
+    `oemof.solph.components.GenericStorageBlock` ('capacity', 'init_cap', 'balance_first',
+    'balance', 'balanced_cstr'), so that the storages are linked over representative
+    periods and windows of a rolling horizon like all other storages.
+
+    **The following parts of the objective function are created:**
+
+    Nothing added to the objective function.
+    """
+
+    CONSTRAINT_GROUP = True
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+    def _create(self, group=None):
+        m = self.parent_block()
+
+        if group is None:
+            return None
+
+        i = {n: [i for i in n.inputs][0] for n in group}
+        o = {n: [o for o in n.outputs][0] for n in group}
+
+        #  ************* SETS *********************************
+
+        self.STORAGES = Set(initialize=[n for n in group])
+
+        self.STORAGES_BALANCED = Set(
+            initialize=[n for n in group if n.balanced is True]
+        )
+
+        #  ************* VARIABLES *****************************
+
+        def _storage_capacity_bound_rule(block, n, t):
+            return (
+                n.nominal_storage_capacity * n.min_storage_level[t],
+                n.nominal_storage_capacity * n.max_storage_level[t],
+            )
+
+        self.capacity = Var(
+            self.STORAGES, m.TIMESTEPS, bounds=_storage_capacity_bound_rule
+        )
+
+        def _storage_init_capacity_bound_rule(block, n):
+            return 0, n.nominal_storage_capacity
+
+        self.init_cap = Var(
+            self.STORAGES,
+            within=NonNegativeReals,
+            bounds=_storage_init_capacity_bound_rule,
+        )
+
+        for n in group:
+            if n.initial_storage_level is not None:
+                self.init_cap[n] = n.initial_storage_level * n.nominal_storage_capacity
+                self.init_cap[n].fix()
+
+        self._create_variables()
+
+        #  ************* Constraints ***************************
+
+        def _flow_balance(block, n, t):
+            return (
+                m.flow[i[n], n, t] * n.inflow_conversion_factor[t]
+                - m.flow[n, o[n], t] / n.outflow_conversion_factor[t]
+                + block.balance_term(n, t)
+            ) * m.timeincrement[t]
+
+        def _storage_balance_first_rule(block, n):
+            return block.capacity[n, 0] == block.init_cap[n] * (
+                1 - n.loss_rate[0]
+            ) + _flow_balance(block, n, 0)
+
+        self.balance_first = Constraint(self.STORAGES, rule=_storage_balance_first_rule)
+
+        def _storage_balance_rule(block, n, t):
+            return block.capacity[n, t] == block.capacity[n, t - 1] * (
+                1 - n.loss_rate[t]
+            ) + _flow_balance(block, n, t)
+
+        self.balance = Constraint(
+            self.STORAGES,
+            [t for t in m.TIMESTEPS if t > 0],
+            rule=_storage_balance_rule,
+        )
+
+        def _balanced_storage_rule(block, n):
+            return block.capacity[n, m.TIMESTEPS[-1]] == block.init_cap[n]
+
+        self.balanced_cstr = Constraint(
+            self.STORAGES_BALANCED, rule=_balanced_storage_rule
+        )
+
+    def _create_variables(self):
+        r"""
+        Creates the variables of the balance term, if any.
+        """
+
+    def balance_term(self, n, t):
+        r"""
+        Returns the term added to the flow balance of storage n in time step t (in units of
+        power).
+        """
+        return 0
+
+    def _objective_expression(self):
+        return 0
+
+
+class BevBlock(CompactStorageBlock):
+    r"""Block for the compact formulation of :class:`Bev`.
+
+    The drive power of the fleet is a parameter of the storage balance:
+
+    .. math::
+
+        x^{balance}(t) = - \frac{c^{amount} \cdot c^{drive\_power}(t)}
+            {c^{efficiency\_discharging}}
+        \qquad \forall t \in T
+    """
+
+    def balance_term(self, n, t):
+        return -n.drive_demand[t] / sequence(n.efficiency_discharging)[t]
+
+
+class ReservoirWithPumpBlock(CompactStorageBlock):
+    r"""Block for the compact formulation of :class:`ReservoirWithPump`.
+
+    The inflow is a variable of the block that enters the storage balance directly:
+
+    .. math::
+
+        x^{balance}(t) = x^{inflow}(t) \qquad \forall t \in T
+
+    .. math::
+        0 \leq x^{inflow}(t) \leq c^{capacity\_turbine} \cdot c^{profile}(t)
+        \qquad \forall t \in T
+    """
+
+    def _create_variables(self):
+        m = self.parent_block()
+
+        def _inflow_bound_rule(block, n, t):
+            return 0, n.max_inflow[t]
+
+        self.inflow = Var(self.STORAGES, m.TIMESTEPS, bounds=_inflow_bound_rule)
+
+    def balance_term(self, n, t):
+        return self.inflow[n, t]
+
+
 class Bev(GenericStorage, Facade):
     r"""A fleet of Battery electric vehicles with vehicle-to-grid.
 
@@ -226,6 +397,17 @@ class Bev(GenericStorage, Facade):
                {c^{efficiency\_discharging}(t) \cdot c^{efficiency\_v2g}(t)}
         \qquad \forall t \in T
 
+    The attribute `formulation` selects how the drive power and vehicle-to-grid are
+    modelled:
+
+    * 'internal_bus' (default): The storage feeds an internal Bus with a Sink for the drive
+      power with a fixed flow and a Transformer for vehicle-to-grid.
+    * 'compact': The drive power is a parameter of the storage balance, see
+      :class:`BevBlock`. Vehicle-to-grid is the output flow of the storage. Its outflow
+      conversion factor, efficiency_discharging / efficiency_v2g, gives the same relation as
+      the vehicle_to_grid Transformer, whose conversion factor is set on its input.
+      There are no subnodes.
+
     Note
     ----
     As the Bev is a sub-class of `oemof.solph.GenericStorage` you also
@@ -268,6 +450,8 @@ class Bev(GenericStorage, Facade):
 
     """
 
+    FORMULATIONS = ["internal_bus", "compact"]
+
     def __init__(self, *args, **kwargs):
 
         kwargs.update(
@@ -304,8 +488,23 @@ class Bev(GenericStorage, Facade):
 
         self.expandable = bool(kwargs.get("expandable", False))
 
+        self.formulation = kwargs.get("formulation") or "internal_bus"
+
+        if self.formulation not in self.FORMULATIONS:
+            raise ValueError(
+                "Formulation '{}' of {} is not one of {}.".format(
+                    self.formulation, self.label, self.FORMULATIONS
+                )
+            )
+
         self.build_solph_components()
 
+    def constraint_group(self):
+        if self.formulation == "compact":
+            return BevBlock
+
+        return super().constraint_group()
+
     def build_solph_components(self):
 
         self.nominal_storage_capacity = self.storage_capacity
@@ -317,6 +516,10 @@ class Bev(GenericStorage, Facade):
         if self.expandable:
             raise NotImplementedError("Investment for bev class is not implemented.")
 
+        if self.formulation == "compact":
+            self.build_compact_components()
+            return
+
         internal_bus = Bus(label=self.label + "-internal_bus")
 
         vehicle_to_grid = Transformer(
@@ -358,6 +561,37 @@ class Bev(GenericStorage, Facade):
 
         self.subnodes = (internal_bus, drive_power, vehicle_to_grid)
 
+    def build_compact_components(self):
+
+        # like the conversion factor of the input of the vehicle_to_grid Transformer
+        self.outflow_conversion_factor = sequence(
+            self.efficiency_discharging / self.efficiency_v2g
+        )
+
+        # drive power subtracted in the storage balance of BevBlock
+        self.drive_demand = [self.amount * value for value in self.drive_power]
+
+        self.inputs.update(
+            {
+                self.bus: Flow(
+                    nominal_value=self.capacity,
+                    max=self.availability,
+                    **self.input_parameters
+                )
+            }
+        )
+
+        self.outputs.update(
+            {
+                self.bus: Flow(
+                    nominal_value=self.capacity,
+                    max=self.availability,
+                    variable_costs=self.marginal_cost,
+                    **self.output_parameters
+                )
+            }
+        )
+
 
 class ReservoirWithPump(GenericStorage, Facade):
     r"""A Reservoir storage unit, that is initially half full.
@@ -414,6 +648,14 @@ class ReservoirWithPump(GenericStorage, Facade):
     The spillage of the reservoir is therefore defined by:
     :math:`c^{profile}(t) - x^{profile}(t)`.
 
+    The attribute `formulation` selects how the pump and the inflow are modelled:
+
+    * 'internal_bus' (default): The pump is a Transformer and the inflow a Source, both
+      feeding an internal Bus that is the input of the storage.
+    * 'compact': The pump is the input flow of the storage with the efficiency of the pump as
+      inflow conversion factor. The inflow is a variable of the storage balance, see
+      :class:`ReservoirWithPumpBlock`. There are no subnodes.
+
     Note
     ----
     As the ReservoirWithPump is a sub-class of `oemof.solph.GenericStorage` you also
@@ -445,6 +687,8 @@ class ReservoirWithPump(GenericStorage, Facade):
 
     """
 
+    FORMULATIONS = ["internal_bus", "compact"]
+
     def __init__(self, *args, **kwargs):
         kwargs.update(
             {
@@ -471,8 +715,23 @@ class ReservoirWithPump(GenericStorage, Facade):
 
         self.expandable = bool(kwargs.get("expandable", False))
 
+        self.formulation = kwargs.get("formulation") or "internal_bus"
+
+        if self.formulation not in self.FORMULATIONS:
+            raise ValueError(
+                "Formulation '{}' of {} is not one of {}.".format(
+                    self.formulation, self.label, self.FORMULATIONS
+                )
+            )
+
         self.build_solph_components()
 
+    def constraint_group(self):
+        if self.formulation == "compact":
+            return ReservoirWithPumpBlock
+
+        return super().constraint_group()
+
     def build_solph_components(self):
 
         self.nominal_storage_capacity = self.storage_capacity
@@ -484,6 +743,10 @@ class ReservoirWithPump(GenericStorage, Facade):
                 "Investment for reservoir class is not implemented."
             )
 
+        if self.formulation == "compact":
+            self.build_compact_components()
+            return
+
         internal_bus = Bus(label=self.label + "-internal_bus")
 
         pump = Transformer(
@@ -524,6 +787,27 @@ class ReservoirWithPump(GenericStorage, Facade):
 
         self.subnodes = (inflow, internal_bus, pump)
 
+    def build_compact_components(self):
+
+        self.inflow_conversion_factor = sequence(self.efficiency_pump)
+
+        # upper bound of the inflow variable of ReservoirWithPumpBlock
+        self.max_inflow = [self.capacity_turbine * value for value in self.profile]
+
+        self.inputs.update(
+            {self.bus: Flow(nominal_value=self.capacity_pump, **self.input_parameters)}
+        )
+
+        self.outputs.update(
+            {
+                self.bus: Flow(
+                    nominal_value=self.capacity_turbine,
+                    variable_costs=self.marginal_cost,
+                    **self.output_parameters
+                )
+            }
+        )
+
 
 class ExtractionTurbine(
     ExtractionTurbineCHP, Facade
@@ -1,13 +1,22 @@
+import hashlib
+import logging
 import os
+import resource
 import shutil
 import subprocess
+import time
+from contextlib import contextmanager
 
+import numpy as np
 import pandas as pd
 from oemof.tools.logger import define_logging
 from pandas.testing import assert_frame_equal
 import yaml
 
 
+SCALARS_CATEGORICAL_COLUMNS = ["Scenario", "Region", "Parameter", "Unit"]
+
+
 def setup_logging(log_path):
     define_logging(logpath=log_path, logfile="oemoflex.log")
 
@@ -46,7 +55,9 @@ def read_csv_file(filepath):
     return dataframe
 
 
-def read_scalar_input_data(path_to_dir, experiment_name, identifier_columns=None):
+def read_scalar_input_data(
+    path_to_dir, experiment_name, identifier_columns=None, cache_dir=None
+):
     r"""
     Reads all CSV files resembling a Scalars.csv file and concatenates them into a DataFrame.
     No check for duplicates.
@@ -65,6 +76,11 @@ def read_scalar_input_data(path_to_dir, experiment_name, identifier_columns=None
     identifier_columns : str
         List of column names to filter the proper type of CSV file
 
+    cache_dir : str or None
+        Directory where the parsed data is cached as Feather file. The cache is keyed by the
+        absolute path of `path_to_dir` and the names, sizes and modification times of the CSV
+        files. No caching if None.
+
     Returns
     -------
     DataFrame
@@ -87,16 +103,146 @@ def read_scalar_input_data(path_to_dir, experiment_name, identifier_columns=None
         """
         return set(identifier_columns).issubset(df.columns)
 
+    filepaths = sorted(find_csv_filenames(path_to_dir, pattern=experiment_name))
+
+    if cache_dir is not None:
+        # caches of other input directories are kept when this one gets stale
+        input_key = hashlib.sha1(os.path.abspath(path_to_dir).encode()).hexdigest()[:8]
+        cache_prefix = f"{experiment_name}_Scalars_{input_key}_"
+
+        fingerprint = get_files_fingerprint(filepaths, extra=identifier_columns)
+
+        cache_path = os.path.join(cache_dir, f"{cache_prefix}{fingerprint}.feather")
+
+        if os.path.exists(cache_path):
+            logging.info(f"Reading scalar input data from cache '{cache_path}'.")
+            return pd.read_feather(cache_path)
+
     scalars_df = pd.DataFrame()
 
-    for filepath in find_csv_filenames(path_to_dir, pattern=experiment_name):
+    for filepath in filepaths:
         next_csv_df = read_csv_file(filepath)
         if is_scalars_data(next_csv_df):
             scalars_df = pd.concat([scalars_df, next_csv_df])
 
+    if cache_dir is not None:
+        scalars_df = scalars_df.reset_index(drop=True)
+
+        for column in SCALARS_CATEGORICAL_COLUMNS:
+            if column in scalars_df.columns:
+                scalars_df[column] = scalars_df[column].astype("category")
+
+        write_cache_file(
+            scalars_df,
+            cache_path,
+            stale_pattern=cache_prefix,
+        )
+
     return scalars_df
 
 
+def get_files_fingerprint(filepaths, extra=None):
+    r"""
+    Returns a short hash of the names, sizes and modification times of the given files.
+
+    Parameters
+    ----------
+    filepaths : list
+        Paths of the files
+
+    extra : list
+        Further items to include in the hash, e.g. settings that change the parsed result
+
+    Returns
+    -------
+    str
+    """
+    file_hash = hashlib.sha1()
+
+    for filepath in sorted(filepaths):
+        stat = os.stat(filepath)
+        file_hash.update(
+            f"{os.path.basename(filepath)}:{stat.st_size}:{stat.st_mtime_ns};".encode()
+        )
+
+    if extra is not None:
+        file_hash.update(repr(list(extra)).encode())
+
+    return file_hash.hexdigest()[:16]
+
+
+def write_cache_file(df, cache_path, stale_pattern=None):
+    r"""
+    Writes a DataFrame to a Feather file. The file is written to a temporary path first and
+    moved into place afterwards, so that concurrent processes never read half-written files.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        DataFrame with default index
+
+    cache_path : str
+        Path of the cache file
+
+    stale_pattern : str
+        If given, other files in the cache directory starting with this pattern are removed.
+    """
+    cache_dir = os.path.dirname(cache_path)
+
+    os.makedirs(cache_dir, exist_ok=True)
+
+    if stale_pattern is not None:
+        for filename in os.listdir(cache_dir):
+            filepath = os.path.join(cache_dir, filename)
+            if filename.startswith(stale_pattern) and filepath != cache_path:
+                try:
+                    os.remove(filepath)
+                except OSError:
+                    pass
+
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+
+    df.to_feather(tmp_path)
+
+    os.replace(tmp_path, cache_path)
+
+    logging.info(f"Wrote cache file '{cache_path}'.")
+
+
+def link_file(source, destination):
+    r"""
+    Makes file 'source' available at path 'destination' by a hardlink. Falls back to a
+    symlink and, if that fails too, to a copy. An existing file at 'destination' is replaced.
+
+    Parameters
+    ----------
+    source : str
+        Path of existing file
+
+    destination : str
+        Path of the link
+    """
+    if os.path.lexists(destination):
+        os.remove(destination)
+
+    try:
+        os.link(source, destination)
+    except OSError:
+        try:
+            os.symlink(os.path.abspath(source), destination)
+        except OSError:
+            shutil.copyfile(source, destination)
+
+
+def get_hours_per_step(temporal_resolution):
+    r"""
+    Returns the length of a time step in hours for a pandas frequency string, e.g. '3H'.
+    """
+    return pd.Timedelta(pd.tseries.frequencies.to_offset(temporal_resolution)) / (
+        pd.Timedelta(hours=1)
+    )
+
+
 def find_csv_filenames(path_to_dir, pattern, suffix=".csv"):
     r"""
     Reads all CSV (or other) files in a directory (non-recursive)
@@ -176,7 +322,136 @@ def filter_scalar_input_data(scalars_in, scenario_select, scenario_overwrite):
     return scalars
 
 
-def load_scalar_input_data(scenario_specs, path_to_input_data):
+def filter_scalar_input_data_batch(scalars_in, scenario_specs_list):
+    r"""
+    Filters Scalars.csv DataFrame for several scenarios at once. Returns the same as
+    'filter_scalar_input_data' does for each of the scenarios, but selects and overwrites the
+    parameter values of all scenarios in one go. Afterwards, each scenario's data is checked
+    for duplicates.
+
+    (FlexMex-specific function)
+
+    Parameters
+    ----------
+    scalars_in : pandas.DataFrame
+        Scalars.csv DataFrame from input data
+
+    scenario_specs_list : list of dict
+        Special dicts with scenario settings. Keys 'scenario', 'scenario_select' and
+        'scenario_overwrite' are used.
+
+    Returns
+    -------
+    scalars : dict
+        Scalars.csv DataFrame per scenario name
+    """
+    index_columns = ["Region", "Parameter"]
+
+    scenario_names = [
+        scenario_specs["scenario"] for scenario_specs in scenario_specs_list
+    ]
+
+    if len(set(scenario_names)) < len(scenario_names):
+        raise ValueError(f"Scenario names are not unique: {scenario_names}.")
+
+    selection = pd.DataFrame(
+        [
+            (position, scenario_specs["scenario"], scenario)
+            for position, scenario_specs in enumerate(scenario_specs_list)
+            for scenario in scenario_specs["scenario_select"]
+        ],
+        columns=["position", "run", "Scenario"],
+    )
+
+    overwrite = pd.DataFrame(
+        [
+            (scenario_specs["scenario"], scenario_specs["scenario_overwrite"])
+            for scenario_specs in scenario_specs_list
+            if scenario_specs["scenario_overwrite"]
+        ],
+        columns=["run", "Scenario"],
+    )
+
+    # Cached data comes with categorical columns. Keep only the rows needed for filtering and
+    # continue with plain columns, as read from the raw CSVs.
+    scalars = scalars_in.loc[
+        scalars_in["Scenario"].isin(
+            pd.concat([selection["Scenario"], overwrite["Scenario"]]).unique()
+        )
+    ]
+
+    scalars = scalars.astype(
+        {
+            column: object
+            for column in scalars.columns
+            if pd.api.types.is_categorical_dtype(scalars[column])
+        }
+    )
+
+    columns = scalars.columns
+
+    update_columns = [column for column in columns if column not in index_columns]
+
+    scalars = scalars.reset_index(drop=True).rename_axis("row").reset_index()
+
+    # Select the rows of all scenarios, keeping the order of the input data
+    selected = (
+        selection.merge(scalars, on="Scenario")
+        .drop_duplicates(["run", "row"])
+        .sort_values(["position", "row"], kind="mergesort")
+    )
+
+    overwriting = overwrite.merge(scalars, on="Scenario")
+
+    overwrite_duplicates = overwriting.duplicated(["run"] + index_columns)
+
+    if overwrite_duplicates.any():
+        raise ValueError(
+            "Found duplicates in overwriting Scalars data of scenario(s) "
+            f"{list(overwriting.loc[overwrite_duplicates, 'run'].unique())}."
+            " Check input data and filtering."
+        )
+
+    # Overwrite values with non-NA values of the overwriting rows with the same index
+    selected = selected.merge(
+        overwriting.loc[:, ["run"] + index_columns + update_columns],
+        on=["run"] + index_columns,
+        how="left",
+        suffixes=("", "_overwrite"),
+    )
+
+    for column in update_columns:
+        overwrite_values = selected[column + "_overwrite"].values
+
+        keep = pd.isna(overwrite_values)
+
+        if keep.all():
+            continue
+
+        selected[column] = np.where(keep, selected[column].values, overwrite_values)
+
+    # After filtering there musn't be any duplicates left.
+    duplicates = selected.duplicated(["run", "Scenario", "Region", "Parameter"])
+
+    if duplicates.any():
+        raise ValueError(
+            "Found duplicates in Scalars data of scenario(s) "
+            f"{list(selected.loc[duplicates, 'run'].unique())}."
+            " Check input data and filtering."
+        )
+
+    scalars_per_scenario = {
+        scenario_specs["scenario"]: pd.DataFrame(columns=columns)
+        for scenario_specs in scenario_specs_list
+    }
+
+    for run, scalars_run in selected.groupby("run", sort=False):
+        scalars_per_scenario[run] = scalars_run.loc[:, columns].reset_index(drop=True)
+
+    return scalars_per_scenario
+
+
+def load_scalar_input_data(scenario_specs, path_to_input_data, cache_dir=None):
     r"""
     Reads, filters and checks FlexMex Scalars.csv input data
 
@@ -190,6 +465,9 @@ def load_scalar_input_data(scenario_specs, path_to_input_data):
     path_to_input_data : str
         Path to scalar input data
 
+    cache_dir : str or None
+        Directory to cache the parsed input data in. No caching if None.
+
     Returns
     -------
     Scalars.csv DataFrame
@@ -199,22 +477,63 @@ def load_scalar_input_data(scenario_specs, path_to_input_data):
     experiment_name = scenario_specs["scenario"].split("_")[0]
 
     # Load common input parameters
-    scalars = read_scalar_input_data(path_to_input_data, experiment_name)
-
-    # Filter out only scenario-related input parameters
-    scalars = filter_scalar_input_data(
-        scalars,
-        scenario_select=scenario_specs["scenario_select"],
-        scenario_overwrite=scenario_specs["scenario_overwrite"],
+    scalars = read_scalar_input_data(
+        path_to_input_data, experiment_name, cache_dir=cache_dir
     )
 
-    # After filtering there musn't be any duplicates left.
-    if has_duplicates(scalars, ["Scenario", "Region", "Parameter"]):
-        raise ValueError(
-            "Found duplicates in Scalars data. Check input data and filtering."
+    # Filter out only scenario-related input parameters and check for duplicates
+    scalars = filter_scalar_input_data_batch(scalars, [scenario_specs])
+
+    return scalars[scenario_specs["scenario"]]
+
+
+def load_scalar_input_data_batch(
+    scenario_yml_paths, path_to_input_data, cache_dir=None
+):
+    r"""
+    Reads, filters and checks FlexMex Scalars.csv input data for several scenarios. The raw
+    data of each experiment is read once and filtered for all its scenarios in one pass.
+
+    (FlexMex-specific function)
+
+    Parameters
+    ----------
+    scenario_yml_paths : list of str
+        Paths to the scenario yaml files, e.g. all files in 'scenarios/'
+
+    path_to_input_data : str
+        Path to scalar input data
+
+    cache_dir : str or None
+        Directory to cache the parsed input data in. No caching if None.
+
+    Returns
+    -------
+    scalars : dict
+        Scalars.csv DataFrame per scenario name
+    """
+    scenario_specs_list = [load_yaml(path) for path in scenario_yml_paths]
+
+    # Get experiment name - necessary as long as "Data_In" contains two versions of Scalars.csv
+    experiments = {}
+    for scenario_specs in scenario_specs_list:
+        experiment_name = scenario_specs["scenario"].split("_")[0]
+        experiments.setdefault(experiment_name, []).append(scenario_specs)
+
+    scalars_per_scenario = {}
+    for experiment_name, experiment_specs in experiments.items():
+        scalars = read_scalar_input_data(
+            path_to_input_data, experiment_name, cache_dir=cache_dir
         )
 
-    return scalars
+        scalars_per_scenario.update(
+            filter_scalar_input_data_batch(scalars, experiment_specs)
+        )
+
+    return {
+        scenario_specs["scenario"]: scalars_per_scenario[scenario_specs["scenario"]]
+        for scenario_specs in scenario_specs_list
+    }
 
 
 def get_all_file_paths(dir):
@@ -415,3 +734,92 @@ def load_elements(dir):
         name_dataframe_dict[name] = pd.read_csv(path)
 
     return name_dataframe_dict
+
+
+def get_cpu_time():
+    r"""
+    Returns the CPU time (user and system) used so far by this process and its terminated
+    child processes, e.g. the solver, in seconds.
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def get_peak_rss():
+    r"""
+    Returns the peak resident set size of this process and of its largest terminated child
+    process in MB. Both are maxima over the lifetime of the process so far, not of a phase.
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+
+    # ru_maxrss is given in kB on Linux
+    return own / 1024, children / 1024
+
+
+class PhaseProfile:
+    r"""
+    Records wall time and CPU time of the phases of a processing step.
+
+    The peak resident set size is only available as maximum since the start of the process.
+    So it is recorded as 'peak_rss_cumulative' at the end of each phase: it shows the phase
+    in which the peak was reached, not the peak of each phase.
+
+    Examples
+    --------
+    >>> profile = PhaseProfile()
+    >>> with profile.phase("load"):
+    ...     pass
+    >>> list(profile.to_dataframe()["phase"])
+    ['load']
+    """
+
+    def __init__(self):
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        start_wall_time = time.perf_counter()
+        start_cpu_time = get_cpu_time()
+
+        try:
+            yield
+
+        finally:
+            peak_rss, peak_rss_children = get_peak_rss()
+
+            self.phases.append(
+                {
+                    "phase": name,
+                    "wall_time": time.perf_counter() - start_wall_time,
+                    "cpu_time": get_cpu_time() - start_cpu_time,
+                    "peak_rss_cumulative": peak_rss,
+                    "peak_rss_children_cumulative": peak_rss_children,
+                }
+            )
+
+            logging.info(
+                f"Phase '{name}' took {self.phases[-1]['wall_time']:.2f} s "
+                f"(CPU: {self.phases[-1]['cpu_time']:.2f} s, "
+                f"peak RSS of the run so far: {peak_rss:.0f} MB)"
+            )
+
+    def to_dataframe(self):
+        return pd.DataFrame(
+            self.phases,
+            columns=[
+                "phase",
+                "wall_time",
+                "cpu_time",
+                "peak_rss_cumulative",
+                "peak_rss_children_cumulative",
+            ],
+        )
+
+    def to_csv(self, path):
+        r"""
+        Writes the profile to a CSV file. Times are given in s, peak RSS in MB.
+        """
+        self.to_dataframe().to_csv(path, index=False)
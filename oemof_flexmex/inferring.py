@@ -1,7 +1,11 @@
+import json
 import os
 
+import pandas as pd
+
 from oemof.tabular.datapackage import building
 from oemof_flexmex.helpers import load_yaml
+from oemof_flexmex.model_structure import load_component_attrs
 
 
 # Path definitions
@@ -14,9 +18,25 @@ FOREIGN_KEYS = "foreign_keys.yml"
 
 all_foreign_keys = load_yaml(os.path.join(module_path, MODEL_STRUCTURE, FOREIGN_KEYS))
 
+# Field types of the attribute types used in component_attrs
+ATTR_TYPES = {
+    "str": "string",
+    "float": "number",
+    "boolean": "boolean",
+    "dict": "object",
+}
+
+
+# Keys of foreign_keys.yml for fields that reference the bus resource, in the order in which
+# infer_metadata() of oemof.tabular checks them
+BUS_FOREIGN_KEYS = {
+    "bus": ["bus"],
+    "from_to_bus": ["from_bus", "to_bus"],
+    "chp": ["fuel_bus", "electricity_bus", "heat_bus"],
+}
 
-def infer(select_components, package_name, path):
 
+def select_foreign_keys(select_components):
     foreign_keys = {}
 
     for key, lst in all_foreign_keys.items():
@@ -26,6 +46,198 @@ def infer(select_components, package_name, path):
         if selected_lst:
             foreign_keys[key] = selected_lst
 
+    return foreign_keys
+
+
+def infer(select_components, package_name, path):
+
+    foreign_keys = select_foreign_keys(select_components)
+
     building.infer_metadata(
         package_name=package_name, foreign_keys=foreign_keys, path=path
     )
+
+    # infer_metadata() only knows the keys 'bus', 'profile', 'from_to_bus' and 'chp'
+    set_foreign_keys(os.path.join(path, "datapackage.json"), foreign_keys)
+
+
+def set_foreign_keys(datapackage_json, foreign_keys):
+    r"""
+    Sets the foreign keys of the element resources in a datapackage.json, see
+    get_foreign_keys().
+    """
+    with open(datapackage_json) as f:
+        datapackage = json.load(f)
+
+    for resource in datapackage["resources"]:
+        if not resource["path"].startswith("data/elements"):
+            continue
+
+        resource_foreign_keys = get_foreign_keys(resource["name"], foreign_keys)
+
+        if resource_foreign_keys:
+            resource["schema"]["foreignKeys"] = resource_foreign_keys
+        else:
+            resource["schema"].pop("foreignKeys", None)
+
+    with open(datapackage_json, "w") as f:
+        json.dump(datapackage, f, indent=4)
+
+
+def get_field_type(series, attr_type=None):
+    r"""
+    Returns the datapackage field type of an element's column.
+
+    Numeric and boolean columns get their type from the dtype. Other columns get it from the
+    attribute type defined in component_attrs, strings by default.
+    """
+    if pd.api.types.is_bool_dtype(series):
+        return "boolean"
+
+    if pd.api.types.is_integer_dtype(series):
+        return "integer"
+
+    if pd.api.types.is_float_dtype(series):
+        return "number"
+
+    return ATTR_TYPES.get(attr_type, "string")
+
+
+def get_foreign_keys(name, foreign_keys):
+    r"""
+    Returns the foreign keys of an element resource, following the rules of
+    oemof.tabular's infer_metadata() for the keys in BUS_FOREIGN_KEYS and 'profile'.
+
+    The fields of BUS_FOREIGN_KEYS reference the bus resource, the field 'profile' the
+    resource '<name>_profile'. Any other key of foreign_keys.yml is a field referencing the
+    resource '<key>_profile'.
+
+    Parameters
+    ----------
+    name : str
+        Name of the element resource
+    foreign_keys : dict
+        Foreign keys of the selected components, see select_foreign_keys()
+
+    Returns
+    -------
+    resource_foreign_keys : list
+    """
+    resource_foreign_keys = []
+
+    for key, fields in BUS_FOREIGN_KEYS.items():
+        if name in foreign_keys.get(key, []):
+            resource_foreign_keys.extend(
+                {"fields": field, "reference": {"resource": "bus", "fields": "name"}}
+                for field in fields
+            )
+
+            # like infer_metadata(), only one group of bus foreign keys per resource
+            break
+
+    for key, lst in foreign_keys.items():
+        if key in BUS_FOREIGN_KEYS or name not in lst:
+            continue
+
+        # as in infer_metadata(), 'profile' references a profile of the resource itself
+        resource = name + "_profile" if key == "profile" else key + "_profile"
+
+        resource_foreign_keys.append(
+            {"fields": key, "reference": {"resource": resource}}
+        )
+
+    return resource_foreign_keys
+
+
+def get_resource(path, name, fields):
+    r"""
+    Returns the descriptor of a tabular data resource.
+    """
+    return {
+        "path": path,
+        "profile": "tabular-data-resource",
+        "name": name,
+        "format": "csv",
+        "mediatype": "text/csv",
+        "encoding": "utf-8",
+        "schema": {
+            "fields": [
+                {"name": field, "type": field_type, "format": "default"}
+                for field, field_type in fields
+            ],
+            "missingValues": [""],
+        },
+    }
+
+
+def create_datapackage_json(
+    select_components, package_name, path, element_set, sequences
+):
+    r"""
+    Writes the datapackage.json of a preprocessed datapackage without reading its data again.
+
+    The schema of the elements is derived from the in-memory elements and the attribute
+    definitions in 'model_structure/component_attrs', the foreign keys from
+    'model_structure/foreign_keys.yml'. It replaces infer().
+
+    Parameters
+    ----------
+    select_components : list
+        Selected components
+    package_name : str
+        Name of the datapackage
+    path : str
+        Path to the datapackage, i.e. the directory containing 'data'
+    element_set : oemof_flexmex.model_structure.ElementSet
+        Elements of the datapackage
+    sequences : dict
+        Names of the sequences resources and their fields, see create_profiles()
+    """
+    foreign_keys = select_foreign_keys(select_components)
+
+    resources = []
+
+    for name in element_set:
+        element_df = element_set[name].reset_index()
+
+        if name == "bus":
+            attr_types = {}
+        else:
+            attr_types = load_component_attrs(name)["type"].to_dict()
+
+        resource = get_resource(
+            path="data/elements/" + name + ".csv",
+            name=name,
+            fields=[
+                (column, get_field_type(element_df[column], attr_types.get(column)))
+                for column in element_df.columns
+            ],
+        )
+
+        resource["schema"]["primaryKey"] = "name"
+
+        resource_foreign_keys = get_foreign_keys(name, foreign_keys)
+
+        if resource_foreign_keys:
+            resource["schema"]["foreignKeys"] = resource_foreign_keys
+
+        resources.append(resource)
+
+    for name, columns in sequences.items():
+        resources.append(
+            get_resource(
+                path="data/sequences/" + name + ".csv",
+                name=name,
+                fields=[(columns[0], "string")]
+                + [(column, "number") for column in columns[1:]],
+            )
+        )
+
+    datapackage = {
+        "profile": "tabular-data-package",
+        "name": package_name,
+        "resources": resources,
+    }
+
+    with open(os.path.join(path, "datapackage.json"), "w") as f:
+        json.dump(datapackage, f, indent=4)
@@ -1,4 +1,6 @@
+import io
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 
@@ -29,34 +31,115 @@ link_list = list(
 )
 
 
-def create_default_elements(
-    dir,
+class ElementSet:
+    r"""
+    In-memory collection of oemof.tabular element DataFrames, keyed by the element name, which
+    is the name of the CSV file without suffix, e.g. 'electricity-demand' or 'bus'.
+
+    The DataFrames are indexed by 'region', like the element CSV files read with
+    `pd.read_csv(index_col="region")`.
+
+    Parameters
+    ----------
+    elements : dict
+        Dictionary of element name and DataFrame
+    """
+
+    def __init__(self, elements=None):
+        self.elements = {} if elements is None else dict(elements)
+
+    def __getitem__(self, name):
+        return self.elements[name]
+
+    def __setitem__(self, name, element_df):
+        self.elements[name] = element_df
+
+    def __contains__(self, name):
+        return name in self.elements
+
+    def __iter__(self):
+        return iter(self.elements)
+
+    def __len__(self):
+        return len(self.elements)
+
+    def to_csv(self, dir, max_workers=None):
+        r"""
+        Writes all elements as CSV files to dir.
+
+        Parameters
+        ----------
+        dir : str (dir path)
+            Target directory
+        max_workers : int
+            Number of threads writing in parallel. If None, the files are written one after
+            another.
+        """
+        if not os.path.exists(dir):
+            os.makedirs(dir)
+
+        def write(name):
+            self.elements[name].to_csv(os.path.join(dir, name + ".csv"))
+
+        if max_workers is None:
+            for name in self.elements:
+                write(name)
+
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                # list() to raise exceptions of the threads
+                list(executor.map(write, self.elements))
+
+
+def convert_dtypes_like_csv(element_df):
+    r"""
+    Returns an element DataFrame with the values and dtypes it gets when it is written to a CSV
+    file and read again with `pd.read_csv(index_col="region")`: e.g. "True" and "False" become
+    booleans, empty strings NaN and columns with numbers and strings stay strings.
+
+    The round trip goes through an in-memory buffer, so pandas' own parser decides.
+
+    Parameters
+    ----------
+    element_df : pd.DataFrame
+        Element indexed by 'region'
+
+    Returns
+    -------
+    element_df : pd.DataFrame
+    """
+    buffer = io.StringIO()
+    element_df.to_csv(buffer)
+    buffer.seek(0)
+
+    return pd.read_csv(buffer, index_col="region")
+
+
+def create_element_set(
     busses_file=os.path.join(module_path, "model_structure", "busses.csv"),
     components_file=os.path.join(module_path, "model_structure", "components.csv"),
     select_components=None,
 ):
     r"""
-    Prepares oemoef.tabluar input CSV files:
-    * includes headers according to definitions in CSVs in directory 'component_attrs_dir'
-    * pre-define all oemof elements (along CSV rows) without actual dimensions/values
+    Prepares oemoef.tabluar elements in memory:
+    * includes columns according to definitions in CSVs in directory 'component_attrs_dir'
+    * pre-define all oemof elements (along rows) without actual dimensions/values
 
     Parameters
     ----------
-    dir : str (dir path)
-        target directory where to put the prepared CSVs
+    busses_file : str (file path)
+        CSV where to read the busses from
 
     components_file : str (file path)
         CSV where to read the components from
 
-    component_attrs_dir : str (dir path)
-        CSV where to read the components' attributes from
-
     select_components : list
         List of default elements to create
 
     Returns
     -------
-    None
+    element_set : ElementSet
+        Default elements of the selected components and the busses
     """
     components_data = pd.read_csv(components_file).set_index("name")
 
@@ -68,6 +151,8 @@ def create_default_elements(
     if select_components is None:
         select_components = defined_components_names
 
+    element_set = ElementSet()
+
     for component_name in select_components:
 
         if component_name not in defined_components_names:
@@ -81,13 +166,76 @@ def create_default_elements(
 
         component_attrs_file = os.path.join(components_dirname, component_path)
 
-        df = create_component_element(component_attrs_file)
+        element_set[component_name] = create_component_element(component_attrs_file)
 
-        # Write to target directory
-        df.to_csv(os.path.join(dir, component_name + ".csv"))
+    element_set["bus"] = create_bus_element(busses_file)
+
+    return element_set
+
+
+def load_component_attrs(
+    component_name,
+    components_file=os.path.join(module_path, "model_structure", "components.csv"),
+):
+    r"""
+    Loads the attribute specifications of a component.
+
+    Parameters
+    ----------
+    component_name : str
+        Name of the component as defined in components_file
+
+    components_file : str (file path)
+        CSV where to read the components from
+
+    Returns
+    -------
+    component_attrs : pd.DataFrame
+        Attribute specifications indexed by 'attribute'
+    """
+    components_data = pd.read_csv(components_file).set_index("name")
+
+    component_path = components_data.loc[component_name, "path"]
+
+    return pd.read_csv(
+        os.path.join(os.path.dirname(components_file), component_path), index_col=0
+    )
+
+
+def create_default_elements(
+    dir,
+    busses_file=os.path.join(module_path, "model_structure", "busses.csv"),
+    components_file=os.path.join(module_path, "model_structure", "components.csv"),
+    select_components=None,
+):
+    r"""
+    Prepares oemoef.tabluar input CSV files, see create_element_set().
+
+    Parameters
+    ----------
+    dir : str (dir path)
+        target directory where to put the prepared CSVs
+
+    busses_file : str (file path)
+        CSV where to read the busses from
+
+    components_file : str (file path)
+        CSV where to read the components from
+
+    select_components : list
+        List of default elements to create
+
+    Returns
+    -------
+    None
+    """
+    element_set = create_element_set(
+        busses_file=busses_file,
+        components_file=components_file,
+        select_components=select_components,
+    )
 
-    bus_df = create_bus_element(busses_file)
-    bus_df.to_csv(os.path.join(dir, "bus.csv"))
+    element_set.to_csv(dir)
 
 
 def create_bus_element(busses_file):
@@ -121,7 +269,7 @@ def create_bus_element(busses_file):
 
     bus_df = bus_df.set_index("region")
 
-    return bus_df
+    return convert_dtypes_like_csv(bus_df)
 
 
 def create_component_element(component_attrs_file):
@@ -184,4 +332,6 @@ def create_component_element(component_attrs_file):
 
     component_df = pd.DataFrame(comp_data).set_index("region")
 
-    return component_df
+    # Default values are read as strings. Convert them like pd.read_csv() would, so that the
+    # element can be updated without writing and reading it again.
+    return convert_dtypes_like_csv(component_df)
@@ -1,51 +1,489 @@
+import copy
 import logging
 import os
 
+import yaml
 from oemof.outputlib import processing
-from oemof.solph import EnergySystem, Model
+from oemof.solph import Model
+from pyomo.opt import SolverFactory
 
 # DONT REMOVE THIS LINE!
 # pylint: disable=unused-import
 from oemof.tabular import datapackage  # noqa
 from oemof_flexmex.facades import TYPEMAP
+from oemof_flexmex.helpers import PhaseProfile, load_yaml
+from oemof_flexmex.reading import load_energysystem
+from oemof_flexmex.reduction import add_zero_results, reduce_energysystem
+from oemof_flexmex.representative_periods import (
+    STORAGE_CONTENT_FILE,
+    add_inter_period_storage_linking,
+    get_inter_period_storage_content,
+    get_objective_weighting,
+    load_periods,
+)
+from oemof_flexmex.results_array import extract_results
+from oemof_flexmex.results_store import write_results
+from oemof_flexmex.rolling_horizon import optimize_rolling_horizon
+from oemof_flexmex.sweep import (
+    SWEEP_DIR,
+    set_flow_bounds,
+    update_energysystem,
+)
+from oemof_flexmex.warm_start import (
+    is_warm_start_capable,
+    load_reference_results,
+    log_solver_statistics_vs_reference,
+    set_primal_start,
+    set_warm_start_values,
+)
 
+module_path = os.path.dirname(os.path.abspath(__file__))
 
-def optimize(data_preprocessed, results_optimization, solver="cbc", save_lp=False):
+PROFILE_FILE = "optimize_profile.csv"
+
+SOLVER_PROFILES_FILE = os.path.join(module_path, "model_config", "solver_profiles.yml")
+
+SOLVER_SETTINGS_FILE = "solver_settings.yml"
+
+# Names of the solver options setting the number of threads and the time limit
+THREADS_OPTIONS = {"cbc": "threads", "gurobi": "Threads", "cplex": "threads"}
+TIME_LIMIT_OPTIONS = {
+    "cbc": "sec",
+    "gurobi": "TimeLimit",
+    "cplex": "timelimit",
+    "glpk": "tmlim",
+}
+
+
+def get_solver_settings(solver_specs=None, solver_profiles_file=SOLVER_PROFILES_FILE):
+    r"""
+    Returns the solver settings of a scenario.
+
+    The settings of the solver profile named in the 'solver' section of the scenario are
+    updated by the other entries of the section. The options are merged.
+
+    Parameters
+    ----------
+    solver_specs : dict or str
+        'solver' section of the scenario yaml, with the optional keys 'profile', 'name',
+        'threads', 'time_limit' and 'options', or the name of a solver profile. Defaults to
+        the profile 'default'.
+    solver_profiles_file : str
+        Path to the yaml file defining the solver profiles
+
+    Returns
+    -------
+    solver_settings : dict
+        Solver settings with the keys 'name' and 'options' and optionally 'threads' and
+        'time_limit'
+    """
+    if solver_specs is None:
+        solver_specs = {}
+
+    elif isinstance(solver_specs, str):
+        solver_specs = {"profile": solver_specs}
+
+    solver_profiles = load_yaml(solver_profiles_file)
+
+    profile_name = solver_specs.get("profile", "default")
+
+    if profile_name not in solver_profiles:
+        raise ValueError(
+            f"Solver profile '{profile_name}' is not defined in {solver_profiles_file}. "
+            f"Defined profiles are: {list(solver_profiles)}"
+        )
+
+    solver_settings = copy.deepcopy(solver_profiles[profile_name])
+
+    options = solver_settings.get("options") or {}
+    options.update(solver_specs.get("options") or {})
+
+    solver_settings.update(
+        {
+            key: value
+            for key, value in solver_specs.items()
+            if key not in ["profile", "options"]
+        }
+    )
+    solver_settings["options"] = options
+
+    return solver_settings
+
+
+def get_solver_options(solver_settings):
+    r"""
+    Returns the options passed to the solver, including the solver specific options for the
+    number of threads and the time limit.
+    """
+    name = solver_settings["name"]
+
+    solver_options = dict(solver_settings.get("options") or {})
+
+    for key, option_names in [
+        ("threads", THREADS_OPTIONS),
+        ("time_limit", TIME_LIMIT_OPTIONS),
+    ]:
+        value = solver_settings.get(key)
+
+        if value is None:
+            continue
+
+        if name not in option_names:
+            raise ValueError(
+                f"Setting '{key}' is not supported for solver '{name}'. "
+                "Pass the solver's own option in 'options' instead."
+            )
+
+        solver_options[option_names[name]] = value
+
+    return solver_options
+
+
+def is_persistent(solver):
+    return solver.endswith("_persistent")
+
+
+def get_persistent_solver(m, solver, solver_options):
+    r"""
+    Returns a persistent solver interface (e.g. 'gurobi_persistent') holding the model.
+    """
+    persistent_solver = SolverFactory(solver)
+    persistent_solver.options.update(solver_options)
+    persistent_solver.set_instance(m)
+
+    return persistent_solver
+
+
+def solve_model(m, solver, solver_options, persistent_solver=None, warm_start=False):
+    r"""
+    Solves the model, using the persistent solver interface if given. With `warm_start`, the
+    current values of the variables are passed to the solver as a start.
+    """
+    solve_kwargs = {"tee": True}
+
+    if warm_start:
+        solve_kwargs["warmstart"] = True
+
+    if persistent_solver is None:
+        m.solve(
+            solver=solver,
+            solve_kwargs=solve_kwargs,
+            cmdline_options=solver_options,
+        )
+        return
+
+    solver_results = persistent_solver.solve(**solve_kwargs)
+
+    termination_condition = solver_results["Solver"][0]["Termination condition"].key
+    if termination_condition != "optimal":
+        logging.warning(
+            f"Optimization ended with termination condition {termination_condition}"
+        )
+
+    # like oemof.solph.Model.solve()
+    m.es.results = solver_results
+    m.solver_results = solver_results
+
+
+def optimize_sweep(
+    m,
+    data_preprocessed,
+    results_optimization,
+    sweep,
+    solver,
+    solver_options,
+    persistent_solver=None,
+    profile=None,
+):
+    r"""
+    Solves the points of a parameter sweep with a model that has been built once.
+
+    For each point, the objective coefficients and flow bounds of the model are updated from
+    the point's datapackage, see oemof_flexmex.sweep.update_energysystem(), and the model is
+    solved again. The results of each point are written to the results store in
+    'sweep/<point>' in `results_optimization` with the node metadata of the point's
+    EnergySystem.
+
+    Parameters
+    ----------
+    m : oemof.solph.Model
+        Solved model of the scenario
+    data_preprocessed : str
+        Path to the scenario's datapackage
+    results_optimization : str
+        Path to the optimization results of the scenario
+    sweep : list
+        Names of the sweep points
+    solver : str
+        Solver name
+    solver_options : dict
+        Options passed to the solver
+    persistent_solver : pyomo.solvers.plugins.solvers.persistent_solver.PersistentSolver
+        Persistent solver interface holding the model. Only the changes are passed to it.
+    profile : oemof_flexmex.helpers.PhaseProfile
+        Profile to record the phases of each point in
+    """
+    if profile is None:
+        profile = PhaseProfile()
+
+    for point in sweep:
+        logging.info(f"Solving sweep point '{point}'")
+
+        with profile.phase(f"sweep_update_{point}"):
+            es_point = load_energysystem(
+                os.path.join(
+                    data_preprocessed, "data", SWEEP_DIR, point, "datapackage.json"
+                ),
+                typemap=TYPEMAP,
+            )
+
+            bound_flows = update_energysystem(m.es, es_point)
+            variables = set_flow_bounds(m, bound_flows)
+            m._add_objective(update=True)
+
+            if persistent_solver is not None:
+                persistent_solver.set_objective(m.objective)
+                for variable in variables:
+                    persistent_solver.update_var(variable)
+
+        with profile.phase(f"sweep_solve_{point}"):
+            solve_model(m, solver, solver_options, persistent_solver)
+
+        with profile.phase(f"sweep_results_{point}"):
+            es_point.meta_results = processing.meta_results(m)
+            es_point.results = extract_results(m)
+
+            point_results = os.path.join(results_optimization, SWEEP_DIR, point)
+            os.makedirs(point_results, exist_ok=True)
+            write_results(es_point, point_results)
+
+
+def optimize(
+    data_preprocessed,
+    results_optimization,
+    solver="cbc",
+    save_lp=False,
+    rolling_horizon=None,
+    logging_path=None,
+    solver_options=None,
+    sweep=None,
+    warm_start=None,
+    pre_reduction=True,
+):
     r"""
     Takes the specified datapackage, creates an energysystem and solves the
     optimization problem.
+
+    If `rolling_horizon` is given as a dictionary with the keys 'window' and 'look_ahead'
+    (in hours), the problem is solved in overlapping windows instead, see
+    oemof_flexmex.rolling_horizon.optimize_rolling_horizon().
+
+    Wall time and CPU time of each phase and the peak RSS of the run so far, see
+    oemof_flexmex.helpers.PhaseProfile, are written to 'optimize_profile.csv' in
+    `logging_path`, if given.
+
+    The solver and its options, see get_solver_options(), are recorded in
+    'solver_settings.yml' in `results_optimization`.
+
+    If `sweep` lists the names of sweep points, the model is solved again for each point
+    after the scenario itself, see optimize_sweep(). With a persistent solver interface, e.g.
+    'gurobi_persistent', the model is passed to the solver only once.
+
+    If `warm_start` is the path to the optimization results of a reference scenario, the
+    variables of the model are set to the reference values of the same flows, nodes and
+    timestamps and passed to the solver as a start, see oemof_flexmex.warm_start. The share
+    of variables set (hit rate) and the solve time next to that of the reference are logged.
+
+    With `pre_reduction`, components that cannot have any flow, e.g. non-expandable
+    components with zero capacity, are removed before the model is built and their zero
+    results are added to the results, see oemof_flexmex.reduction. It is skipped for
+    parameter sweeps, as the points may change the capacities.
     """
+    if solver_options is None:
+        solver_options = {}
+
+    with open(os.path.join(results_optimization, SOLVER_SETTINGS_FILE), "w") as f:
+        yaml.safe_dump({"solver": solver, "options": solver_options}, f)
+
+    profile = PhaseProfile()
+
     # create energy system object
     logging.info("Creating EnergySystem from datapackage")
-    es = EnergySystem.from_datapackage(
-        os.path.join(data_preprocessed, "datapackage.json"),
-        attributemap={},
-        typemap=TYPEMAP,
-    )
+    with profile.phase("load_datapackage"):
+        es = load_energysystem(
+            os.path.join(data_preprocessed, "datapackage.json"), typemap=TYPEMAP
+        )
+
+    # time increment in hours, matching the temporal resolution of the sequences
+    timeincrement = es.timeindex.freq.nanos / 3.6e12
+    logging.info(f"Time increment of the model: {timeincrement} h")
+
+    periods = load_periods(os.path.join(data_preprocessed, "data"))
 
-    # create model from energy system (this is just oemof.solph)
-    logging.info("Creating the optimization model")
-    m = Model(es)
+    if sweep and (rolling_horizon is not None or periods is not None):
+        raise ValueError(
+            "Parameter sweeps cannot be combined with rolling horizon optimization or "
+            "representative periods."
+        )
 
-    # if you want dual variables / shadow prices uncomment line below
-    # m.receive_duals()
+    if is_persistent(solver) and (rolling_horizon is not None or save_lp):
+        raise ValueError(
+            f"The persistent solver interface '{solver}' cannot be used with rolling "
+            "horizon optimization or when saving the lp-file."
+        )
 
-    # save lp file together with optimization results
-    if save_lp:
-        lp_file_dir = os.path.join(results_optimization, "model.lp")
-        logging.info(f"Saving the lp-file to {lp_file_dir}")
-        m.write(lp_file_dir, io_options={"symbolic_solver_labels": True})
+    if warm_start is not None and rolling_horizon is not None:
+        raise ValueError(
+            "Warm starts cannot be combined with rolling horizon optimization."
+        )
 
-    # select solver 'gurobi', 'cplex', 'glpk' etc
-    logging.info(f"Solving the problem using {solver}")
-    m.solve(solver=solver, solve_kwargs={"tee": True})
+    # the full EnergySystem is kept for the node metadata of the results
+    es_model = es
+    zero_results = None
 
-    # get the results from the the solved model(still oemof.solph)
-    es.meta_results = processing.meta_results(m)
-    es.results = processing.results(m)
-    es.params = processing.parameter_as_dict(es)
+    if pre_reduction and sweep:
+        logging.info("Pre-reduction is skipped for parameter sweeps.")
 
-    # now we use the write results method to write the results in oemof-tabular
-    # format
+    elif pre_reduction:
+        with profile.phase("pre_reduction"):
+            es_model, zero_results = reduce_energysystem(es)
+
+    if rolling_horizon is not None:
+        if periods is not None:
+            raise ValueError(
+                "Rolling horizon optimization cannot be combined with representative periods."
+            )
+
+        if save_lp:
+            logging.warning("The lp-file is not saved in rolling horizon optimization.")
+
+        logging.info(f"Solving the problem in rolling horizon windows using {solver}")
+        # building, solving and processing the windows alternate
+        with profile.phase("rolling_horizon"):
+            es.results, es.meta_results = optimize_rolling_horizon(
+                es_model,
+                timeincrement,
+                solver=solver,
+                solve_kwargs={"tee": True},
+                solver_options=solver_options,
+                **rolling_horizon,
+            )
+
+    else:
+        # create model from energy system (this is just oemof.solph)
+        logging.info("Creating the optimization model")
+        with profile.phase("build_model"):
+            if periods is None:
+                m = Model(es_model, timeincrement=[timeincrement] * len(es.timeindex))
+
+            else:
+                period_weights, period_mapping = periods
+                timesteps_per_period = len(es.timeindex) // len(period_weights)
+
+                logging.info(
+                    f"Optimizing {len(period_weights)} representative periods "
+                    f"of {timesteps_per_period} time steps"
+                )
+                m = Model(
+                    es_model,
+                    timeincrement=[timeincrement] * len(es.timeindex),
+                    objective_weighting=get_objective_weighting(
+                        period_weights, timesteps_per_period, timeincrement
+                    ),
+                )
+
+                add_inter_period_storage_linking(
+                    m, period_mapping, timesteps_per_period
+                )
+
+        # if you want dual variables / shadow prices uncomment line below
+        # m.receive_duals()
+
+        # save lp file together with optimization results
+        if save_lp:
+            lp_file_dir = os.path.join(results_optimization, "model.lp")
+            logging.info(f"Saving the lp-file to {lp_file_dir}")
+            with profile.phase("write_lp"):
+                m.write(lp_file_dir, io_options={"symbolic_solver_labels": True})
+
+        # select solver 'gurobi', 'cplex', 'glpk' etc
+        logging.info(
+            f"Solving the problem using {solver} with options {solver_options}"
+        )
+        if warm_start is not None:
+            logging.info(f"Warm-starting from the results in {warm_start}")
+            with profile.phase("warm_start"):
+                reference_results, reference_meta_results = load_reference_results(
+                    warm_start
+                )
+                warm_start_variables, n_variables = set_warm_start_values(
+                    m, reference_results
+                )
+
+            logging.info(
+                f"Warm start hit rate: {len(warm_start_variables)} of {n_variables} "
+                f"variables ({len(warm_start_variables) / max(n_variables, 1):.1%})"
+            )
+
+        with profile.phase("solve"):
+            if is_persistent(solver):
+                persistent_solver = get_persistent_solver(m, solver, solver_options)
+            else:
+                persistent_solver = None
+
+            use_warm_start = warm_start is not None and is_warm_start_capable(
+                solver, persistent_solver
+            )
+
+            if warm_start is not None and not use_warm_start:
+                logging.warning(f"Solver {solver} does not support warm starts.")
+
+            if use_warm_start and persistent_solver is not None:
+                set_primal_start(persistent_solver, warm_start_variables)
+
+            solve_model(
+                m, solver, solver_options, persistent_solver, warm_start=use_warm_start
+            )
+
+        # get the results from the the solved model(still oemof.solph)
+        with profile.phase("process_results"):
+            es.meta_results = processing.meta_results(m)
+
+            if warm_start is not None:
+                log_solver_statistics_vs_reference(
+                    es.meta_results, reference_meta_results
+                )
+
+            if periods is not None:
+                # the linking variables are not indexed by time step and cannot be processed
+                # by oemof
+                storage_content = get_inter_period_storage_content(m, es.timeindex)
+                storage_content.to_csv(
+                    os.path.join(results_optimization, STORAGE_CONTENT_FILE)
+                )
+                m.del_component(m.inter_period_storage_linking)
+
+            es.results = extract_results(m)
+
+    if zero_results is not None:
+        es.results = add_zero_results(es.results, zero_results)
+
+    # write the results to the results store, see oemof_flexmex.results_store
     logging.info(f"Writing the results to {results_optimization}")
-    es.dump(results_optimization)
+    with profile.phase("write_results"):
+        write_results(es, results_optimization)
+
+    if sweep:
+        optimize_sweep(
+            m,
+            data_preprocessed,
+            results_optimization,
+            sweep,
+            solver,
+            solver_options,
+            persistent_solver=persistent_solver,
+            profile=profile,
+        )
+
+    if logging_path is not None:
+        profile.to_csv(os.path.join(logging_path, PROFILE_FILE))
@@ -5,19 +5,54 @@ import pandas as pd
 
 from oemof.tools.economics import annuity
 
+from oemof_flexmex.helpers import get_hours_per_step
+from oemof_flexmex.model_structure import ElementSet
 
-def get_parameter_values(scalars_df, parameter_name):
+
+class ScalarsIndex:
     r"""
-    Selects rows from common input file "Scalars.csv" by column=='parameter_name'
-    and maintains the relation 'Region' -> 'Value' at external assignment
+    Lookup table for the parameters in common input file "Scalars.csv".
+
+    The (filtered) scalars DataFrame is split up by 'Parameter' once. Afterwards, each
+    parameter's values are returned without scanning the whole DataFrame again.
 
     Parameters
     ----------
     scalars_df : DataFrame
         DataFrame of "Scalars.csv"
+    """
 
-    parameter_name : str
-        Specifies the rows to select by the name in column "Parameter"
+    def __init__(self, scalars_df):
+        self.scalars_df = scalars_df
+
+        self._empty = select_parameter_values(scalars_df.iloc[:0])
+
+        self._parameter_values = {
+            parameter_name: select_parameter_values(query_result)
+            for parameter_name, query_result in scalars_df.groupby(
+                "Parameter", sort=False
+            )
+        }
+
+    def __contains__(self, parameter_name):
+        return parameter_name in self._parameter_values
+
+    def __len__(self):
+        return len(self._parameter_values)
+
+    def __getitem__(self, parameter_name):
+        return self._parameter_values.get(parameter_name, self._empty)
+
+
+def select_parameter_values(query_result):
+    r"""
+    Turns the 'Scalars.csv' rows of one parameter into a single value or a 'Region'-indexed
+    Series.
+
+    Parameters
+    ----------
+    query_result : DataFrame
+        Rows of "Scalars.csv" belonging to one parameter
 
     Returns
     -------
@@ -25,11 +60,6 @@ def get_parameter_values(scalars_df, parameter_name):
         The parameter's values (column 'Value') as a single value (float)
         or as a 'Region'-indexed Series
     """
-
-    is_parameter_name = scalars_df["Parameter"] == parameter_name
-
-    query_result = scalars_df.loc[is_parameter_name, :]
-
     # The query result DataFrame can either be multi-row or single-row
     if len(query_result["Region"]) == 1 and query_result["Region"].item() == "ALL":
 
@@ -44,6 +74,35 @@ def get_parameter_values(scalars_df, parameter_name):
     return parameter_value
 
 
+def get_parameter_values(scalars_df, parameter_name):
+    r"""
+    Selects rows from common input file "Scalars.csv" by column=='parameter_name'
+    and maintains the relation 'Region' -> 'Value' at external assignment
+
+    Parameters
+    ----------
+    scalars_df : DataFrame or ScalarsIndex
+        DataFrame of "Scalars.csv" or a ScalarsIndex built from it
+
+    parameter_name : str
+        Specifies the rows to select by the name in column "Parameter"
+
+    Returns
+    -------
+    parameter_values : float / pd.Series
+        The parameter's values (column 'Value') as a single value (float)
+        or as a 'Region'-indexed Series
+    """
+    if isinstance(scalars_df, ScalarsIndex):
+        return scalars_df[parameter_name]
+
+    is_parameter_name = scalars_df["Parameter"] == parameter_name
+
+    query_result = scalars_df.loc[is_parameter_name, :]
+
+    return select_parameter_values(query_result)
+
+
 def update_electricity_shortage(component_df, scalars):
 
     # Fill column 'marginal_cost' with a fixed value for ALL the elements
@@ -936,7 +995,37 @@ update_dict = {
 }
 
 
-def update_scalars(select_components, destination, scalars):
+def scale_loss_rate(component_df, temporal_resolution):
+    r"""
+    Converts hourly storage loss rates to loss rates per time step of the given temporal
+    resolution, as the storage balance applies the loss rate once per time step.
+    """
+    hours_per_step = get_hours_per_step(temporal_resolution)
+
+    component_df["loss_rate"] = 1 - (1 - component_df["loss_rate"]) ** hours_per_step
+
+    return component_df
+
+
+def update_scalars(select_components, destination, scalars, temporal_resolution=None):
+    r"""
+    Fills the elements of the selected components with values from scalars.
+
+    Parameters
+    ----------
+    select_components : dict
+        Selected components and keyword arguments of their update functions
+    destination : ElementSet or str
+        Elements to update in memory, or path to a datapackage's 'data' directory whose
+        element CSV files are read and written again
+    scalars : ScalarsIndex or pd.DataFrame
+        Scalars of the scenario
+    temporal_resolution : str
+        Temporal resolution of the model, e.g. '3H', to convert storage loss rates
+    """
+    if not isinstance(scalars, ScalarsIndex):
+        scalars = ScalarsIndex(scalars)
+
     for component, kwargs in select_components.items():
         logging.info(f"Updating '{component}'")
 
@@ -950,10 +1039,26 @@ def update_scalars(select_components, destination, scalars):
         if not kwargs:
             kwargs = {}
 
-        component_df_path = os.path.join(destination, "elements", component + ".csv")
+        if isinstance(destination, ElementSet):
+            component_df = destination[component]
 
-        component_df = pd.read_csv(component_df_path, index_col="region")
+        else:
+            component_df_path = os.path.join(
+                destination, "elements", component + ".csv"
+            )
+            component_df = pd.read_csv(component_df_path, index_col="region")
 
         component_df = function(component_df, scalars=scalars, **kwargs)
 
-        component_df.to_csv(component_df_path)
+        if (
+            temporal_resolution is not None
+            and get_hours_per_step(temporal_resolution) != 1
+            and "loss_rate" in component_df.columns
+        ):
+            component_df = scale_loss_rate(component_df, temporal_resolution)
+
+        if isinstance(destination, ElementSet):
+            destination[component] = component_df
+
+        else:
+            component_df.to_csv(component_df_path)
@@ -1,9 +1,16 @@
+import hashlib
 import logging
 import os
 
+import numpy as np
 import pandas as pd
 
-from oemof_flexmex.helpers import load_yaml
+from oemof_flexmex.helpers import (
+    get_files_fingerprint,
+    get_hours_per_step,
+    link_file,
+    load_yaml,
+)
 
 
 # Path definitions
@@ -32,13 +39,30 @@ datetimeindex = pd.date_range(start="2019-01-01", freq="H", periods=8760)
 mapping = load_yaml(path_mapping_input_timeseries)
 
 
-def combine_profiles(raw_profile_path, column_name):
+def get_profile_file_list(raw_profile_path):
     profile_file_list = sorted(os.listdir(raw_profile_path))
 
     profile_file_list = [file for file in profile_file_list if file.endswith("csv")]
 
+    return profile_file_list
+
+
+def read_profiles(raw_profile_path):
+    r"""
+    Reads the raw profiles of all regions found in a directory.
+
+    Parameters
+    ----------
+    raw_profile_path : str
+        Path to the directory with one CSV file per region
+
+    Returns
+    -------
+    profile_df : pd.DataFrame
+        Profiles with one column per region
+    """
     profile_list = []
-    for file in profile_file_list:
+    for file in get_profile_file_list(raw_profile_path):
         region = file.split("_")[1]
 
         raw_load_profile = pd.read_csv(
@@ -47,12 +71,136 @@ def combine_profiles(raw_profile_path, column_name):
 
         load_profile = raw_load_profile.iloc[:, 0]
 
-        load_profile.name = region + "-" + column_name
+        load_profile.name = region
 
         profile_list.append(load_profile)
 
     profile_df = pd.concat(profile_list, axis=1, sort=True)
 
+    return profile_df
+
+
+def load_profile_store(raw_profile_path, store_dir):
+    r"""
+    Loads the raw profiles of a directory as an array of shape (regions, timesteps).
+
+    At the first call, the CSV files are read and saved as a binary .npy file plus a region
+    index. Later calls memory-map the .npy file, so that processes reading the same profiles
+    share the pages through the OS page cache. The store is renewed if names, sizes or
+    modification times of the CSV files change.
+
+    Parameters
+    ----------
+    raw_profile_path : str
+        Path to the directory with one CSV file per region
+
+    store_dir : str
+        Directory of the profile store
+
+    Returns
+    -------
+    profiles : np.ndarray
+        Read-only memory-mapped float64 array with one row per region
+
+    region_index : pd.DataFrame
+        Region and original dtype of each row in 'profiles'
+    """
+    raw_profile_path = os.path.abspath(raw_profile_path)
+
+    path_hash = hashlib.sha1(raw_profile_path.encode()).hexdigest()[:16]
+
+    fingerprint = get_files_fingerprint(
+        [
+            os.path.join(raw_profile_path, file)
+            for file in get_profile_file_list(raw_profile_path)
+        ]
+    )
+
+    store_path = os.path.join(store_dir, f"{path_hash}_{fingerprint}")
+
+    array_path = store_path + ".npy"
+    index_path = store_path + "_regions.csv"
+
+    if not os.path.exists(array_path):
+        logging.info(f"Adding profiles in '{raw_profile_path}' to profile store.")
+
+        profile_df = read_profiles(raw_profile_path)
+
+        region_index = pd.DataFrame(
+            {
+                "region": profile_df.columns,
+                "dtype": [str(dtype) for dtype in profile_df.dtypes],
+            }
+        )
+
+        os.makedirs(store_dir, exist_ok=True)
+
+        # Remove outdated versions of the same directory's profiles
+        for filename in os.listdir(store_dir):
+            if filename.startswith(path_hash) and not filename.startswith(
+                os.path.basename(store_path)
+            ):
+                try:
+                    os.remove(os.path.join(store_dir, filename))
+                except OSError:
+                    pass
+
+        # Write to temporary files first. The array file is moved into place last, as its
+        # existence marks the store entry as complete.
+        tmp_suffix = f".{os.getpid()}.tmp"
+
+        region_index.to_csv(index_path + tmp_suffix, index=False)
+        os.replace(index_path + tmp_suffix, index_path)
+
+        with open(array_path + tmp_suffix, "wb") as array_file:
+            np.save(array_file, profile_df.values.T.astype(np.float64))
+        os.replace(array_path + tmp_suffix, array_path)
+
+    profiles = np.load(array_path, mmap_mode="r")
+
+    region_index = pd.read_csv(index_path, dtype=str, keep_default_na=False)
+
+    return profiles, region_index
+
+
+def combine_profiles(raw_profile_path, column_name, store_dir=None):
+    r"""
+    Combines the raw profiles of all regions found in a directory into one DataFrame.
+
+    Parameters
+    ----------
+    raw_profile_path : str
+        Path to the directory with one CSV file per region
+
+    column_name : str
+        Suffix for the column names, which are prefixed by the region
+
+    store_dir : str or None
+        Directory of the binary profile store. Reads the CSV files directly if None.
+
+    Returns
+    -------
+    profile_df : pd.DataFrame
+        Profiles with 'timeindex' and one column per region
+    """
+    if store_dir is None:
+        profile_df = read_profiles(raw_profile_path)
+
+    else:
+        profiles, region_index = load_profile_store(raw_profile_path, store_dir)
+
+        profile_df = pd.concat(
+            [
+                pd.Series(values, dtype=dtype)
+                for values, dtype in zip(profiles, region_index["dtype"])
+            ],
+            axis=1,
+        )
+
+        profile_df.columns = region_index["region"]
+
+    profile_df.columns = [region + "-" + column_name for region in profile_df.columns]
+
     profile_df = profile_df.set_index(datetimeindex, drop=True)
 
     profile_df.index.name = "timeindex"
@@ -60,7 +208,159 @@ def combine_profiles(raw_profile_path, column_name):
     return profile_df
 
 
-def create_profiles(data_raw_path, preprocessed_path, select_components):
+def get_content_hash(df):
+    r"""
+    Returns a hash of the content of a DataFrame, including its index, column names and dtypes.
+    """
+    content_hash = hashlib.sha1()
+
+    content_hash.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+
+    content_hash.update(
+        repr(
+            (
+                list(df.columns),
+                [str(dtype) for dtype in df.dtypes],
+                df.index.name,
+                str(df.index.dtype),
+            )
+        ).encode()
+    )
+
+    return content_hash.hexdigest()
+
+
+def save_sequences(profile_df, destination, sequence_store_dir=None):
+    r"""
+    Saves sequences as CSV file. With a sequence store, the file is saved to the
+    content-addressed store and linked to 'destination'. Sequences already found in the
+    store are not written again.
+
+    Files in the store are read-only, as they are shared by all scenarios' datapackages. An
+    existing file at 'destination' is replaced, not written to, so that saving edited sequences
+    never changes a file in the store.
+
+    Parameters
+    ----------
+    profile_df : pd.DataFrame
+        Sequences with 'timeindex'
+
+    destination : str
+        Path of the sequences' CSV file in the datapackage
+
+    sequence_store_dir : str or None
+        Directory of the sequence store. Writes to 'destination' directly if None.
+    """
+    if sequence_store_dir is None:
+        # break a link to the store before writing
+        if os.path.lexists(destination):
+            os.remove(destination)
+
+        profile_df.to_csv(destination)
+        return
+
+    store_path = os.path.join(sequence_store_dir, get_content_hash(profile_df) + ".csv")
+
+    if os.path.exists(store_path):
+        logging.info(
+            f"Found identical sequences in store. Linking '{store_path}' "
+            f"to '{destination}'."
+        )
+
+    else:
+        os.makedirs(sequence_store_dir, exist_ok=True)
+
+        tmp_path = f"{store_path}.{os.getpid()}.tmp"
+
+        profile_df.to_csv(tmp_path)
+
+        os.chmod(tmp_path, 0o444)
+
+        os.replace(tmp_path, store_path)
+
+    link_file(store_path, destination)
+
+
+def resample_profiles(profile_df, temporal_resolution, how="mean"):
+    r"""
+    Resamples hourly profiles to a coarser temporal resolution.
+
+    Profiles of rates, e.g. capacity factors or COPs, are averaged. Profiles of energy shares,
+    e.g. normalized demand, are summed up to keep the energy per time step. The sum is divided
+    by the step length, because flows in the model are powers. The model multiplies them with
+    the time increment, which gives back the energy of the time step.
+
+    Parameters
+    ----------
+    profile_df : pd.DataFrame
+        Hourly profiles with 'timeindex'
+
+    temporal_resolution : str
+        Pandas frequency string of the target resolution, e.g. '3H'
+
+    how : str
+        'mean' for rates, 'sum' for energy shares
+
+    Returns
+    -------
+    profile_df : pd.DataFrame
+        Resampled profiles
+    """
+    hours_per_step = get_hours_per_step(temporal_resolution)
+
+    if hours_per_step < 1:
+        raise ValueError(
+            f"Temporal resolution '{temporal_resolution}' is finer than the hourly input data."
+        )
+
+    resampler = profile_df.resample(temporal_resolution)
+
+    if how == "mean":
+        profile_df = resampler.mean()
+
+    elif how == "sum":
+        profile_df = resampler.sum() / hours_per_step
+
+    else:
+        raise ValueError(f"Resampling method '{how}' is not defined.")
+
+    profile_df.index.name = "timeindex"
+
+    return profile_df
+
+
+def create_profiles(
+    data_raw_path,
+    preprocessed_path,
+    select_components,
+    store_dir=None,
+    sequence_store_dir=None,
+    temporal_resolution=None,
+):
+    r"""
+    Creates the sequences of the selected components from the raw profiles.
+
+    Parameters
+    ----------
+    data_raw_path : str
+        Path to the raw input data
+    preprocessed_path : str
+        Path to the 'data' directory of the datapackage
+    select_components : list
+        Components to create sequences for
+    store_dir : str or None
+        Directory of the binary profile store, see combine_profiles(). No store if None.
+    sequence_store_dir : str or None
+        Directory of the sequence store, see save_sequences(). No store if None.
+    temporal_resolution : str or None
+        Temporal resolution of the model, e.g. '3H'. Hourly if None.
+
+    Returns
+    -------
+    sequences : dict
+        Names of the sequences resources and their fields
+    """
+
     def normalize_year(timeseries):
         r"""Normalizes the DataFrame 'timeseries' to values that add up to 1.0."""
         yearly_amount = timeseries.sum(axis=0)
@@ -73,6 +373,8 @@ def create_profiles(data_raw_path, preprocessed_path, select_components):
     profile_file_suffix = oemof_tabular_settings["profile-file-suffix"]
     profile_name_suffix = oemof_tabular_settings["profile-name-suffix"]
 
+    sequences = {}
+
     for component in select_components:
 
         try:
@@ -86,7 +388,9 @@ def create_profiles(data_raw_path, preprocessed_path, select_components):
                 profile_paths = os.path.join(data_raw_path, profile["input-path"])
 
                 profile_df = combine_profiles(
-                    profile_paths, profile_name + profile_name_suffix
+                    profile_paths,
+                    profile_name + profile_name_suffix,
+                    store_dir=store_dir,
                 )
 
                 if "apply-function" in profile:
@@ -94,15 +398,33 @@ def create_profiles(data_raw_path, preprocessed_path, select_components):
                     recalc = recalculation_functions[function_name]
                     profile_df = recalc(profile_df)
 
+                if (
+                    temporal_resolution is not None
+                    and get_hours_per_step(temporal_resolution) != 1
+                ):
+                    profile_df = resample_profiles(
+                        profile_df,
+                        temporal_resolution,
+                        how=profile.get("resample", "mean"),
+                    )
+
                 try:
                     output_filename_base = profile["output-name"]
                 except KeyError:
                     output_filename_base = profile_name
 
-                profile_df.to_csv(
+                save_sequences(
+                    profile_df,
                     os.path.join(
                         preprocessed_path,
                         sequences_dir,
                         output_filename_base + profile_file_suffix + ".csv",
-                    )
+                    ),
+                    sequence_store_dir=sequence_store_dir,
                 )
+
+                sequences[output_filename_base + profile_file_suffix] = [
+                    profile_df.index.name
+                ] + list(profile_df.columns)
+
+    return sequences
@@ -1,26 +1,63 @@
-import copy
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
-import oemof.tabular.tools.postprocessing as pp
 import pandas as pd
-from oemof.outputlib.views import convert_to_multiindex
-from oemof.solph import Bus, EnergySystem, Sink, Source
-from oemof.tools.economics import annuity
-from oemof_flexmex.helpers import (
-    delete_empty_subdirs,
-    load_elements,
-    load_scalar_input_data,
-    load_yaml,
+from oemof.solph import Bus, Sink, Source
+from oemof_flexmex.helpers import load_elements, load_scalar_input_data, load_yaml
+from oemof_flexmex.parametrization_scalars import ScalarsIndex, get_parameter_values
+from oemof_flexmex.representative_periods import (
+    STORAGE_CONTENT_FILE,
+    expand_periods,
+    load_periods,
+)
+from oemof_flexmex.results_store import (
+    get_node_class,
+    get_sequences_keys,
+    get_sequences_variables,
+    load_meta_results,
+    load_node_metadata,
+    load_results,
+    load_scalars,
 )
-from oemof_flexmex.parametrization_scalars import get_parameter_values
 
 from oemof_flexmex.facades import TYPEMAP
 
 
 basic_columns = ["region", "name", "type", "carrier", "tech"]
 
+CAPACITY_INDEX = ["region", "name", "type", "carrier", "tech", "var_name"]
+
+# Roles of nodes in postprocessing by class, see get_node_table()
+NODE_ROLES = {
+    "bus": Bus,
+    "sink": Sink,
+    "source": Source,
+    "shortage": TYPEMAP["shortage"],
+    "link": TYPEMAP["link"],
+    "chp": (TYPEMAP["extraction"], TYPEMAP["backpressure"]),
+}
+
+# Types of storages whose capacities are read
+STORAGE_ROLES = ["storage", "asymmetric storage"]
+
+# Columns of the preprocessed elements with cost factors, see get_cost_factors()
+COST_COLUMNS = ["marginal_cost", "carrier_cost", "expandable"]
+
+# Storages with separate investments in their charge, discharge and storage devices
+STORAGE_INVEST_TECHS = ["h2_cavern", "liion_battery"]
+
+# Invested capacities of other components and storages in STORAGE_INVEST_TECHS with the
+# parameters of their capex and lifetime and the scale of the capex
+INVEST_CAPACITIES = [
+    (False, "invest", "capex", "lifetime", 1),
+    (True, "capacity_charge_invest", "charge_capex", "charge_lifetime", 1),
+    (True, "capacity_discharge_invest", "discharge_capex", "discharge_lifetime", 1),
+    # €/MWh -> €/GWh
+    (True, "storage_capacity_invest", "storage_capex", "storage_lifetime", 1e-3),
+]
+
 # Path definitions
 module_path = os.path.abspath(os.path.dirname(__file__))
 
@@ -42,181 +79,391 @@ map_output_timeseries = load_yaml(path_map_output_timeseries)
 FlexMex_Parameter_Map = load_yaml(path_map_input_scalars)
 
 
-def create_postprocessed_results_subdirs(postprocessed_results_dir):
-    for parameters in map_output_timeseries.values():
-        for subdir in parameters.values():
-            path = os.path.join(postprocessed_results_dir, subdir)
-            if not os.path.exists(path):
-                os.makedirs(path)
+def get_node_classes(nodes):
+    r"""
+    Returns the classes of the nodes in the node metadata, see
+    oemof_flexmex.results_store.get_node_metadata().
+    """
+    classes = {name: get_node_class(name) for name in nodes["class"].unique()}
+
+    return nodes["class"].map(classes)
 
 
-def get_capacities(es):
+def is_instance(node_classes, label, cls):
     r"""
-    Calculates the capacities of all components.
+    Like isinstance() for the node with the given label. Returns False for None.
+    """
+    if label is None:
+        return False
+
+    return issubclass(node_classes[label], cls)
+
+
+def get_instance_mask(nodes, cls):
+    r"""
+    Like isinstance() for all nodes of the node metadata at once. Each class is checked
+    only once.
+
+    Returns
+    -------
+    mask : pd.Series
+        True for the nodes that are instances of 'cls', indexed by the labels
+    """
+    is_subclass = {
+        name: issubclass(get_node_class(name), cls) for name in nodes["class"].unique()
+    }
+
+    return nodes["class"].map(is_subclass).astype(bool)
 
-    Adapted from oemof.tabular.tools.postprocessing.write_results()
+
+def get_node_table(nodes):
+    r"""
+    Returns the node metadata with the roles of the nodes in postprocessing. The roles are
+    derived once per class, so that the results can be joined with the table instead of
+    checking the class of a node for every flow.
 
     Parameters
     ----------
-    es : oemof.solph.EnergySystem
-        EnergySystem containing the results.
+    nodes : pd.DataFrame
+        Node metadata, see oemof_flexmex.results_store.load_node_metadata(), with label,
+        region, type, carrier, tech and the label of the node a subnode belongs to ('parent')
 
     Returns
     -------
-    capacities : pd.DataFrame
-        DataFrame containing the capacities.
+    node_table : pd.DataFrame
+        Node metadata with the further columns 'position' (the order of the nodes in the
+        EnergySystem), 'is_<role>' for the roles in NODE_ROLES and 'storage_role', which is
+        the type of storages whose capacities are read ('storage' or 'asymmetric storage')
+        and None for all other nodes
     """
+    node_table = nodes.copy()
 
-    def get_facade_attr(attr):
-        # Function constructor for getting a specific property from
-        # the Facade object in bus_results() DataFrame columns "from" or "to"
-        def fnc(flow):
-            # Get property from the Storage object in "from" for the discharge device
-            if isinstance(
-                flow["from"], (TYPEMAP["storage"], TYPEMAP["asymmetric storage"])
-            ):
-                return getattr(flow["from"], attr, np.nan)
+    node_table["position"] = np.arange(len(nodes))
 
-            # Get property from the Storage object in "to" for the charge device
-            if isinstance(
-                flow["to"], (TYPEMAP["storage"], TYPEMAP["asymmetric storage"])
-            ):
-                return getattr(flow["to"], attr, np.nan)
+    for role, cls in NODE_ROLES.items():
+        node_table["is_" + role] = get_instance_mask(nodes, cls)
 
-            # Get property from other object in "from"
-            return getattr(flow["from"], attr, np.nan)
+    node_table["storage_role"] = None
 
-        return fnc
+    for role in STORAGE_ROLES:
+        node_table.loc[get_instance_mask(nodes, TYPEMAP[role]), "storage_role"] = role
 
-    def get_parameter_name(flow):
-        if isinstance(
-            flow["from"], (TYPEMAP["storage"], TYPEMAP["asymmetric storage"])
-        ):
-            return "capacity_discharge_invest"
+    return node_table
 
-        if isinstance(flow["to"], (TYPEMAP["storage"], TYPEMAP["asymmetric storage"])):
-            return "capacity_charge_invest"
 
-        return np.nan
+def get_node_results(results, label, select="sequences"):
+    r"""
+    Returns the sequences or scalars of all flows of a node like
+    oemof.outputlib.views.node(multiindex=True).
 
-    try:
-        flows = pp.bus_results(es, es.results, select="scalars", concat=True)
+    Parameters
+    ----------
+    results : oemof_flexmex.results_array.ResultsArray
+        Results, see oemof_flexmex.results_store.load_results()
+    label : str
+        Label of the node
+    select : str
+        'sequences' or 'scalars'
 
-        flows.name = "var_value"
+    Returns
+    -------
+    pd.DataFrame with MultiIndex columns ('from', 'to', 'type') or pd.Series with
+    MultiIndex ('from', 'to', 'type'). None if there are no results.
+    """
+    # like oemof, which compares nodes by their labels and replaces None by '_NONE_' to
+    # sort sequences, but compares None like the string 'None' when sorting scalars
+    if select == "sequences":
+        rows = results.get_rows(label=label)
 
-        endogenous = flows.reset_index()
+        if not len(rows):
+            return None
 
-        # Results already contain a column named "type". Call this "var_name" to
-        # preserve its content ("invest" for now)
-        endogenous.rename(columns={"type": "var_name"}, inplace=True)
+        def sort_key(row):
+            source, target, name = results.rows[row]
+            return (source, "_NONE_" if target is None else target), name
 
-        # Update "var_name" with Storage specific parameter names for charge and discharge devices
-        df = pd.DataFrame({"var_name": endogenous.apply(get_parameter_name, axis=1)})
-        endogenous.update(df)
+        return results.get_sequences(sorted(rows, key=sort_key))
 
-        endogenous["region"] = endogenous.apply(get_facade_attr("region"), axis=1)
-        endogenous["name"] = endogenous.apply(get_facade_attr("label"), axis=1)
-        endogenous["type"] = endogenous.apply(get_facade_attr("type"), axis=1)
-        endogenous["carrier"] = endogenous.apply(get_facade_attr("carrier"), axis=1)
-        endogenous["tech"] = endogenous.apply(get_facade_attr("tech"), axis=1)
+    scalars = results.scalars
+    scalars = scalars.loc[(scalars["source"] == label) | (scalars["target"] == label)]
 
-        endogenous.drop(["from", "to"], axis=1, inplace=True)
+    if scalars.empty:
+        return None
 
-        endogenous.set_index(
-            ["region", "name", "type", "carrier", "tech", "var_name"], inplace=True
-        )
+    order = sorted(
+        range(len(scalars)),
+        key=lambda i: (
+            (
+                scalars["source"].iat[i],
+                "None"
+                if scalars["target"].iat[i] is None
+                else scalars["target"].iat[i],
+            ),
+            scalars["var_name"].iat[i],
+        ),
+    )
+    scalars = scalars.iloc[order]
 
-    except ValueError:
-        endogenous = pd.DataFrame()
-
-    d = dict()
-    for node in es.nodes:
-        if not isinstance(node, (Bus, Sink, TYPEMAP["shortage"], TYPEMAP["link"])):
-            # Specify which parameters to read depending on the technology
-            parameters_to_read = []
-            if isinstance(node, TYPEMAP["storage"]):
-
-                # TODO for brownfield optimization
-                # parameters_to_read = ['capacity', 'storage_capacity']
-
-                # WORKAROUND Skip 'capacity' to safe some effort in aggregation and elsewhere
-                # possible because storages are greenfield optimized only: 'capacity' = 0
-                parameters_to_read = ["storage_capacity"]
-
-            elif isinstance(node, TYPEMAP["asymmetric storage"]):
-                parameters_to_read = [
-                    "capacity_charge",
-                    "capacity_discharge",
-                    "storage_capacity",
-                ]
-            elif getattr(node, "capacity", None) is not None:
-                parameters_to_read = ["capacity"]
-
-            # Update dict with values in oemof's parameter->value structure
-            for p in parameters_to_read:
-                key = (
-                    node.region,
-                    node.label,
-                    # [n for n in node.outputs.keys()][0],
-                    node.type,
-                    node.carrier,
-                    node.tech,  # tech & carrier are oemof-tabular specific
-                    p,
-                )  # for oemof logic
-                d[key] = {"var_value": getattr(node, p)}
-
-    exogenous = pd.DataFrame.from_dict(d).T  # .dropna()
-
-    if not exogenous.empty:
-        exogenous.index = exogenous.index.set_names(
-            ["region", "name", "type", "carrier", "tech", "var_name"]
-        )
+    index = pd.MultiIndex.from_arrays(
+        [scalars["source"], scalars["target"], scalars["var_name"]],
+        names=["from", "to", "type"],
+    )
 
-    # Read storage capacities (from oemof.heat)
-    # only component_results() knows about 'storage_capacity'
-    try:
-        components = pd.concat(pp.component_results(es, es.results, select="scalars"))
-        components.name = "var_value"
+    return pd.Series(scalars["var_value"].values, index=index)
 
-        storage = components.reset_index()
 
-        storage.drop("level_0", 1, inplace=True)
+def bus_results(results, nodes, select="sequences", concat=False):
+    r"""
+    Results of the flows of every bus, like oemof.tabular.tools.postprocessing.bus_results()
+    for results keyed by labels.
+    """
+    node_classes = get_node_classes(nodes)
 
-        storage.columns = ["name", "to", "var_name", "var_value"]
-        storage["region"] = [
-            getattr(t, "region", np.nan)
-            for t in components.index.get_level_values("from")
-        ]
-        storage["type"] = [
-            getattr(t, "type", np.nan)
-            for t in components.index.get_level_values("from")
-        ]
-        storage["carrier"] = [
-            getattr(t, "carrier", np.nan)
-            for t in components.index.get_level_values("from")
-        ]
-        storage["tech"] = [
-            getattr(t, "tech", np.nan)
-            for t in components.index.get_level_values("from")
-        ]
-        storage = storage.loc[storage["to"].isna()]
-        storage.drop("to", 1, inplace=True)
-        storage = storage[
-            ["region", "name", "type", "carrier", "tech", "var_name", "var_value"]
+    br = {}
+
+    for label in nodes.index:
+        if not is_instance(node_classes, label, Bus):
+            continue
+
+        data = get_node_results(results, label, select=select)
+
+        if select == "sequences" and data is None:
+            data = pd.DataFrame()
+
+        br[label] = data
+
+    if concat:
+        axis = 1 if select == "sequences" else 0
+        br = pd.concat(list(br.values()), axis=axis)
+
+    return br
+
+
+def component_results(results, nodes, select="sequences"):
+    r"""
+    Results of the components aggregated by type, like
+    oemof.tabular.tools.postprocessing.component_results() for results keyed by labels.
+    """
+    node_classes = get_node_classes(nodes)
+
+    c = {}
+
+    for key, cls in TYPEMAP.items():
+        if not isinstance(key, str):
+            continue
+
+        by_type = [
+            get_node_results(results, label, select=select)
+            for label in nodes.index
+            if is_instance(node_classes, label, cls)
+            and not is_instance(node_classes, label, Bus)
         ]
 
-        # Delete unused 'init_cap' rows - parameter name misleading! (oemof issue)
-        storage.drop(
-            storage.loc[storage["var_name"] == "init_cap"].index, axis=0, inplace=True
-        )
+        by_type = [data for data in by_type if data is not None]
+
+        if by_type:
+            c[key] = pd.concat(by_type, axis=1 if select == "sequences" else 0)
+
+    return c
+
+
+def get_endogenous_capacities(scalars, node_table):
+    r"""
+    Returns the invested capacities of the flows of all buses, like bus_results() with
+    select='scalars'. Flows from and to storages are the discharge and charge devices of
+    the storages.
+
+    Parameters
+    ----------
+    scalars : pd.DataFrame
+        Scalar results, see oemof_flexmex.results_array.ResultsArray
+    node_table : pd.DataFrame
+        Node metadata with roles, see get_node_table()
+
+    Returns
+    -------
+    endogenous : pd.DataFrame
+        Capacities with the index CAPACITY_INDEX
+    """
+    bus_positions = node_table.loc[node_table["is_bus"], "position"]
+
+    # each bus has the scalars of its inputs and outputs, sorted by the labels
+    flows = pd.concat(
+        [
+            scalars.assign(bus_position=scalars["source"].map(bus_positions)),
+            scalars.assign(bus_position=scalars["target"].map(bus_positions)),
+        ],
+        ignore_index=True,
+    )
+    flows = flows.loc[flows["bus_position"].notna()]
+
+    if flows.empty:
+        return pd.DataFrame()
+
+    flows = flows.assign(target_key=flows["target"].fillna("None")).sort_values(
+        ["bus_position", "source", "target_key", "var_name"]
+    )
+
+    storage_roles = node_table["storage_role"]
+    from_storage = flows["source"].map(storage_roles).notna().values
+    to_storage = flows["target"].map(storage_roles).notna().values & ~from_storage
+
+    # the properties of the charge device are those of the storage in 'to'
+    endogenous = pd.DataFrame(
+        {
+            "name": np.where(to_storage, flows["target"], flows["source"]),
+            "var_name": np.select(
+                [from_storage, to_storage],
+                ["capacity_discharge_invest", "capacity_charge_invest"],
+                flows["var_name"],
+            ),
+            "var_value": flows["var_value"].values,
+        }
+    )
+
+    endogenous = endogenous.merge(
+        node_table[["region", "type", "carrier", "tech"]],
+        how="left",
+        left_on="name",
+        right_index=True,
+    )
+
+    return endogenous.set_index(CAPACITY_INDEX)[["var_value"]]
+
+
+def get_exogenous_capacities(node_table):
+    r"""
+    Returns the exogenous capacities of all components but buses, sinks, shortages and
+    links: the storage capacity of storages, the charge, discharge and storage capacity of
+    asymmetric storages and the capacity of all other components that have one.
+
+    Parameters
+    ----------
+    node_table : pd.DataFrame
+        Node metadata with roles, see get_node_table()
+
+    Returns
+    -------
+    exogenous : pd.DataFrame
+        Capacities with the index CAPACITY_INDEX
+    """
+    is_component = ~node_table[["is_bus", "is_sink", "is_shortage", "is_link"]].any(
+        axis=1
+    )
+
+    storage_roles = node_table["storage_role"]
+
+    # WORKAROUND Skip 'capacity' of storages to safe some effort in aggregation and
+    # elsewhere, possible because storages are greenfield optimized only: 'capacity' = 0
+    parameters_to_read = [
+        (storage_roles == "storage", ["storage_capacity"]),
+        (
+            storage_roles == "asymmetric storage",
+            ["capacity_charge", "capacity_discharge", "storage_capacity"],
+        ),
+        (storage_roles.isna() & node_table["capacity"].notna(), ["capacity"]),
+    ]
 
-        storage.replace(["invest"], ["storage_capacity_invest"], inplace=True)
-        storage.set_index(
-            ["region", "name", "type", "carrier", "tech", "var_name"], inplace=True
+    columns = ["position", "region", "type", "carrier", "tech"]
+
+    exogenous = [
+        node_table.loc[is_component & is_selected, columns].assign(
+            parameter_position=i,
+            var_name=parameter,
+            var_value=node_table.loc[is_component & is_selected, parameter],
         )
+        for is_selected, parameters in parameters_to_read
+        for i, parameter in enumerate(parameters)
+    ]
+
+    exogenous = pd.concat(exogenous).sort_values(["position", "parameter_position"])
+
+    if exogenous.empty:
+        return pd.DataFrame()
+
+    exogenous = exogenous.rename_axis("name").reset_index()
+
+    return exogenous.set_index(CAPACITY_INDEX)[["var_value"]]
+
+
+def get_storage_capacities(scalars, node_table):
+    r"""
+    Returns the invested storage capacities, like component_results() with
+    select='scalars'. Only component_results() knows about 'storage_capacity' (adapted
+    from oemof.heat).
 
-    except ValueError:
-        storage = pd.DataFrame()
+    Parameters
+    ----------
+    scalars : pd.DataFrame
+        Scalar results, see oemof_flexmex.results_array.ResultsArray
+    node_table : pd.DataFrame
+        Node metadata with roles, see get_node_table()
+
+    Returns
+    -------
+    storage : pd.DataFrame
+        Capacities with the index CAPACITY_INDEX
+    """
+    # scalars of the nodes themselves, e.g. invest of storages
+    node_scalars = scalars.loc[scalars["target"].isna()]
+
+    # components by type in the order of TYPEMAP, a node may have several types
+    components = pd.concat(
+        [
+            node_table.loc[
+                get_instance_mask(node_table, cls) & ~node_table["is_bus"],
+                ["position", "region", "type", "carrier", "tech"],
+            ].assign(type_position=i)
+            for i, (key, cls) in enumerate(TYPEMAP.items())
+            if isinstance(key, str)
+        ]
+    )
+
+    storage = components.merge(
+        node_scalars[["source", "var_name", "var_value"]],
+        left_index=True,
+        right_on="source",
+    )
+
+    if storage.empty:
+        return pd.DataFrame()
+
+    storage = storage.sort_values(["type_position", "position", "var_name"])
+
+    # Delete unused 'init_cap' rows - parameter name misleading! (oemof issue)
+    storage = storage.loc[storage["var_name"] != "init_cap"]
+
+    storage = storage.rename(columns={"source": "name"})
+    storage["var_name"] = storage["var_name"].replace(
+        "invest", "storage_capacity_invest"
+    )
+
+    return storage.set_index(CAPACITY_INDEX)[["var_value"]]
+
+
+def get_capacities(results, nodes):
+    r"""
+    Calculates the capacities of all components.
+
+    Adapted from oemof.tabular.tools.postprocessing.write_results()
+
+    Parameters
+    ----------
+    results : oemof_flexmex.results_array.ResultsArray
+        Results, see oemof_flexmex.results_store.load_results()
+    nodes : pd.DataFrame
+        Node metadata, see oemof_flexmex.results_store.load_node_metadata()
+
+    Returns
+    -------
+    capacities : pd.DataFrame
+        DataFrame containing the capacities.
+    """
+    node_table = get_node_table(nodes)
+
+    endogenous = get_endogenous_capacities(results.scalars, node_table)
+    exogenous = get_exogenous_capacities(node_table)
+    storage = get_storage_capacities(results.scalars, node_table)
 
     capacities = pd.concat([endogenous, exogenous, storage])
 
@@ -238,138 +485,314 @@ def format_capacities(oemoflex_scalars, capacities):
     return df
 
 
-def get_sequences_by_tech(results):
+def classify_sequences(rows, node_table):
     r"""
-    Creates a dictionary with carrier-tech as keys with the sequences of the components
-    from optimization results.
+    Classifies the rows of the results by (region, carrier_tech, var_name), where var_name
+    is the role of the flow or variable for the component, e.g. 'flow_in' or
+    'storage_content'. The rows are joined with the node table instead of checking the
+    classes of their nodes one by one.
+
+    Sequences from and to the internal buses of 'ReservoirWithPump' and 'Bev' are left
+    out, except for the inflow of reservoirs.
 
     Parameters
     ----------
-    results : dict
-        Dictionary containing oemof.solph.Model results.
+    rows : list
+        Rows (source, target, variable) of the results, e.g.
+        oemof_flexmex.results_array.ResultsArray.rows
+    node_table : pd.DataFrame
+        Node metadata with roles, see get_node_table()
 
     Returns
     -------
-    sequences_by_tech : dict
-        Dictionary containing sequences with carrier-tech as keys.
+    columns : pd.DataFrame
+        Position in 'rows' ('row'), 'region', 'carrier_tech' and 'var_name'
     """
-    # copy to avoid manipulating the data in es.results
-    sequences = copy.deepcopy(
-        {key: value["sequences"] for key, value in results.items()}
+    rows = pd.DataFrame(rows, columns=["source", "target", "variable"])
+
+    internal_buses = get_subnodes_by_type(node_table, Bus)
+    reservoir_inflows = get_subnodes_by_type(node_table, Source)
+
+    def is_bus(labels):
+        return labels.map(node_table["is_bus"]).fillna(False).values.astype(bool)
+
+    source_is_bus = is_bus(rows["source"])
+    target_is_bus = is_bus(rows["target"])
+    is_node = rows["target"].isna().values
+
+    # each flow connects a component with a bus, nodes have no bus
+    component = np.where(source_is_bus, rows["target"], rows["source"])
+    bus = np.where(
+        target_is_bus, rows["target"], np.where(source_is_bus, rows["source"], None)
     )
 
-    sequences_by_tech = []
+    component_table = pd.DataFrame({"component": component}).merge(
+        node_table[
+            [
+                "carrier",
+                "tech",
+                "is_link",
+                "is_chp",
+                "from_bus",
+                "to_bus",
+                "electricity_bus",
+                "heat_bus",
+            ]
+        ],
+        how="left",
+        left_on="component",
+        right_index=True,
+    )
 
-    # Get internal busses for all 'ReservoirWithPump' and 'Bev' nodes to be ignored later
-    internal_busses = get_subnodes_by_type(sequences, Bus)
+    is_link = component_table["is_link"].fillna(False).values.astype(bool)
+    is_chp = component_table["is_chp"].fillna(False).values.astype(bool)
+    is_inflow = component_table["component"].isin(reservoir_inflows).values
 
-    # Get inflows for all 'ReservoirWithPump' nodes
-    reservoir_inflows = get_subnodes_by_type(sequences, Source)
+    # the bus is the one of the component with the given attribute, e.g. 'to_bus'
+    def bus_is(attr):
+        return bus == component_table[attr].values
 
-    for key, df in sequences.items():
-        if isinstance(key[0], Bus):
-            component = key[1]
-            bus = key[0]
+    var_name = np.select(
+        [
+            # inflow variable of the compact formulation of 'ReservoirWithPump'
+            is_node & (rows["variable"] == "inflow").values,
+            is_node,
+            target_is_bus & is_link & bus_is("to_bus"),
+            target_is_bus & is_link & bus_is("from_bus"),
+            target_is_bus & is_chp & bus_is("electricity_bus"),
+            target_is_bus & is_chp & bus_is("heat_bus"),
+            target_is_bus & is_inflow,
+            target_is_bus & ~is_link & ~is_chp,
+            source_is_bus & is_link & bus_is("from_bus"),
+            source_is_bus & is_link & bus_is("to_bus"),
+            source_is_bus & is_chp,
+            source_is_bus & ~is_link,
+        ],
+        [
+            "flow_inflow",
+            "storage_content",
+            "flow_net_forward",
+            "flow_net_backward",
+            "flow_electricity",
+            "flow_heat",
+            "flow_inflow",
+            "flow_out",
+            "flow_gross_forward",
+            "flow_gross_backward",
+            "flow_fuel",
+            "flow_in",
+        ],
+        None,
+    )
 
-            if isinstance(component, TYPEMAP["link"]):
-                if bus == component.from_bus:
-                    var_name = "flow_gross_forward"
-                elif bus == component.to_bus:
-                    var_name = "flow_gross_backward"
+    # Ignore sequences FROM internal busses (concerns ReservoirWithPump, Bev)
+    is_internal = pd.Series(bus).isin(internal_buses).values & ~is_inflow
 
-            elif isinstance(
-                component, (TYPEMAP["extraction"], TYPEMAP["backpressure"])
-            ):
-                var_name = "flow_fuel"
+    component = component_table["component"]
 
-            else:
-                var_name = "flow_in"
+    # Replace AT-DE by AT_DE to be ready to be merged with DataFrames from preprocessing.
+    # Take AT from AT-ch4-gt, string op since sub-nodes lack of a 'region' attribute
+    region = np.where(
+        is_link,
+        component.str.replace("-", "_", regex=False),
+        component.str.split("-").str[0],
+    )
 
-        if isinstance(key[1], Bus):
-            bus = key[1]
-            component = key[0]
+    columns = pd.DataFrame(
+        {
+            "row": np.arange(len(rows)),
+            "region": region,
+            "carrier_tech": (
+                component_table["carrier"] + "-" + component_table["tech"]
+            ).values,
+            "var_name": var_name,
+        }
+    )
 
-            if isinstance(component, TYPEMAP["link"]):
-                if bus == component.to_bus:
-                    var_name = "flow_net_forward"
-                elif bus == component.from_bus:
-                    var_name = "flow_net_backward"
+    return columns.loc[~is_internal & pd.notna(var_name)]
 
-            elif isinstance(
-                component, (TYPEMAP["extraction"], TYPEMAP["backpressure"])
-            ):
-                if bus == component.electricity_bus:
-                    var_name = "flow_electricity"
 
-                elif bus == component.heat_bus:
-                    var_name = "flow_heat"
+def get_required_keys(results_optimization, nodes):
+    r"""
+    Returns the keys of the results needed for the FlexMex results: those of the sequences
+    kept by classify_sequences() and those of all scalars. Only the column names of the
+    sequences are read.
 
-            elif component in reservoir_inflows:
-                var_name = "flow_inflow"
+    Parameters
+    ----------
+    results_optimization : str
+        Path to the optimization results
+    nodes : pd.DataFrame
+        Node metadata, see oemof_flexmex.results_store.load_node_metadata()
 
-            else:
-                var_name = "flow_out"
+    Returns
+    -------
+    keys : list
+        Keys (source, target) of flows and (node, None) of nodes
+    """
+    rows = [
+        (*key, variable)
+        for variable in get_sequences_variables(results_optimization)
+        for key in get_sequences_keys(results_optimization, variable)
+    ]
 
-        if key[1] is None:
-            component = key[0]
-            var_name = "storage_content"
+    columns = classify_sequences(rows, get_node_table(nodes))
 
-        # Ignore sequences FROM internal busses (concerns ReservoirWithPump, Bev)
-        if bus in internal_busses and component not in reservoir_inflows:
-            continue
+    keys = {rows[row][:2] for row in columns["row"]}
+
+    scalars = load_scalars(results_optimization)
+    keys.update(zip(scalars["source"], scalars["target"]))
+
+    return list(keys)
+
+
+def get_sequences_by_tech(results, nodes):
+    r"""
+    Creates a DataFrame with the sequences of the components from optimization results,
+    with the columns (region, carrier_tech, var_name), see classify_sequences().
+
+    The sequences are copied once from the results into a preallocated array.
+
+    Parameters
+    ----------
+    results : oemof_flexmex.results_array.ResultsArray
+        Results, see oemof_flexmex.results_store.load_results()
+    nodes : pd.DataFrame
+        Node metadata, see oemof_flexmex.results_store.load_node_metadata()
+
+    Returns
+    -------
+    sequences_by_tech : pd.DataFrame
+        Sequences with MultiIndex columns (region, carrier_tech, var_name)
+    """
+    columns = classify_sequences(results.rows, get_node_table(nodes))
+
+    values = np.empty((len(columns), len(results.timeindex)))
+    np.take(results.values, columns["row"].values, axis=0, out=values)
+
+    # the DataFrame is a view of the array
+    sequences_by_tech = pd.DataFrame(
+        values.T,
+        index=results.timeindex,
+        columns=pd.MultiIndex.from_arrays(
+            [columns["region"], columns["carrier_tech"], columns["var_name"]],
+            names=["region", "carrier_tech", "var_name"],
+        ),
+    )
+
+    return sequences_by_tech
+
+
+def expand_representative_periods(
+    sequences_by_tech, nodes, periods, results_optimization
+):
+    r"""
+    Expands the sequences of representative periods to the original periods. The storage
+    content is replaced by the absolute content saved in optimization.
+
+    Parameters
+    ----------
+    sequences_by_tech : pd.DataFrame
+        Sequences with MultiIndex columns (region, carrier_tech, var_name)
+    nodes : pd.DataFrame
+        Node metadata, see oemof_flexmex.results_store.load_node_metadata()
+    periods : tuple
+        Period weights and period mapping, see load_periods()
+    results_optimization : str
+        Path to the optimization results
+
+    Returns
+    -------
+    sequences_by_tech : pd.DataFrame
+        Sequences of the original periods
+    """
+    period_weights, period_mapping = periods
 
-        carrier_tech = component.carrier + "-" + component.tech
+    timesteps_per_period = len(sequences_by_tech.index) // len(period_weights)
 
-        if isinstance(component, TYPEMAP["link"]):
-            # Replace AT-DE by AT_DE to be ready to be merged with DataFrames from preprocessing
-            region = component.label.replace("-", "_")
-        else:
-            # Take AT from AT-ch4-gt, string op since sub-nodes lack of a 'region' attribute
-            region = component.label.split("-")[0]
+    sequences_by_tech = expand_periods(
+        sequences_by_tech, period_mapping, timesteps_per_period
+    )
 
-        df.columns = pd.MultiIndex.from_tuples([(region, carrier_tech, var_name)])
-        df.columns.names = ["region", "carrier_tech", "var_name"]
-        sequences_by_tech.append(df)
+    storage_content = pd.read_csv(
+        os.path.join(results_optimization, STORAGE_CONTENT_FILE), index_col=0
+    )
 
-    sequences_by_tech = pd.concat(sequences_by_tech, axis=1)
+    for label in storage_content.columns:
+        column = (
+            label.split("-")[0],
+            nodes.at[label, "carrier"] + "-" + nodes.at[label, "tech"],
+            "storage_content",
+        )
+        sequences_by_tech[column] = storage_content[label].values
 
     return sequences_by_tech
 
 
-def get_subnodes_by_type(sequences, cls):
+def upsample_sequences(sequences, freq="H"):
+    r"""
+    Up-samples sequences of a coarser temporal resolution, e.g. 3-hourly, to the given
+    frequency by repeating each value for all hours of its time step. As flows are powers, the
+    energy of each time step is kept.
+
+    Parameters
+    ----------
+    sequences : pd.DataFrame
+        Sequences with a regular DatetimeIndex
+    freq : str
+        Target frequency
+
+    Returns
+    -------
+    sequences : pd.DataFrame
+        Up-sampled sequences. Unchanged if they already have the target frequency.
+    """
+    if len(sequences.index) < 2:
+        return sequences
+
+    step = sequences.index[1] - sequences.index[0]
+
+    steps_per_step = step / pd.Timedelta(pd.tseries.frequencies.to_offset(freq))
+
+    if steps_per_step == 1:
+        return sequences
+
+    if steps_per_step < 1 or not steps_per_step.is_integer():
+        raise ValueError(
+            f"Cannot up-sample sequences with a time step of {step} to frequency '{freq}'."
+        )
+
+    index = pd.date_range(
+        sequences.index[0],
+        periods=len(sequences.index) * int(steps_per_step),
+        freq=freq,
+        name=sequences.index.name,
+    )
+
+    return sequences.reindex(index, method="ffill")
+
+
+def get_subnodes_by_type(nodes, cls):
     r"""
-    Get all the subnodes of type 'cls' in the <to> nodes of 'sequences'
+    Get all the subnodes of type 'cls', i.e. of the components of the results that consist
+    of several nodes. They are found in the node metadata, so that a selection of the
+    results, see oemof_flexmex.results_store.load_results(), finds the same subnodes.
 
     Parameters
     ----------
-    sequences : dict (special format, see get_sequences_by_tech() and before)
-        key: tuple of 'to' node and 'from' node: (from, to)
-        value: timeseries DataFrame
+    nodes : pd.DataFrame
+        Node metadata, see oemof_flexmex.results_store.load_node_metadata()
 
     cls : Class
         Class to check against
 
     Returns
     -------
-    A list of all subnodes of type 'cls'
+    A list of the labels of all subnodes of type 'cls'
     """
+    is_subnode = nodes["parent"].isin(nodes.index) & get_instance_mask(nodes, cls)
 
-    # Get a list of all the components
-    to_nodes = []
-    for k in sequences.keys():
-        # It's sufficient to look into one side of the flows ('to' node, k[1])
-        to_nodes.append(k[1])
-
-    subnodes_list = []
-    for component in to_nodes:
-        if hasattr(component, "subnodes"):
-            # Only get subnodes of type 'cls'
-            subnodes_per_component = [
-                n for n in component.subnodes if isinstance(n, cls)
-            ]
-            subnodes_list.extend(subnodes_per_component)
-
-    return subnodes_list
+    return list(nodes.index[is_subnode])
 
 
 def get_summed_sequences(sequences_by_tech, prep_elements):
@@ -588,453 +1011,367 @@ def map_link_direction(oemoflex_scalars):
 def map_to_flexmex_results(
     oemoflex_scalars, flexmex_scalars_template, mapping, scenario
 ):
-    mapping = mapping.set_index("Parameter")
-    flexmex_scalars = flexmex_scalars_template.copy()
-    oemoflex_scalars = oemoflex_scalars.set_index(
-        ["region", "carrier", "tech", "var_name"]
-    )
-    oemoflex_scalars.loc[
-        oemoflex_scalars["var_unit"] == "MWh", "var_value"
-    ] *= 1e-3  # MWh to GWh
-
-    for i, row in flexmex_scalars.loc[
-        flexmex_scalars["UseCase"] == scenario
-    ].iterrows():
-        try:
-            select = mapping.loc[row["Parameter"], :]
-        except KeyError:
-            continue
-
-        try:
-            value = oemoflex_scalars.loc[
-                (row["Region"], select["carrier"], select["tech"], select["var_name"]),
-                "var_value",
-            ]
-
-        except KeyError:
-            logging.info(
-                f"No key "
-                f"{(row['Region'], select['carrier'], select['tech'], select['var_name'])}"
-                f"found to be mapped to FlexMex."
-            )
-
-            continue
-
-        if isinstance(value, float):
-            flexmex_scalars.loc[i, "Value"] = np.around(value)
-
-    flexmex_scalars.loc[:, "Modell"] = "oemof"
-
-    return flexmex_scalars
-
-
-def get_varom_cost(oemoflex_scalars, prep_elements):
     r"""
-    Calculates the VarOM cost by multiplying consumption by marginal cost.
+    Maps the oemoflex scalars to the FlexMex scalars of the template with two merges: the
+    template with the mapping on 'Parameter' and the result with the oemoflex scalars on
+    (Region, carrier, tech, var_name). Energies are converted from MWh to GWh and all values
+    are rounded.
 
-    Which value is taken as consumption depends on the actual technology type.
+    Parameters of the template without a mapping are left empty. So are keys that are not
+    unique in the oemoflex scalars. Keys without a value are logged in one entry.
 
     Parameters
     ----------
-    oemoflex_scalars
-    prep_elements
+    oemoflex_scalars : pd.DataFrame
+        Scalar results with the columns 'region', 'carrier', 'tech', 'var_name', 'var_value'
+        and 'var_unit'
+    flexmex_scalars_template : pd.DataFrame
+        Template of the FlexMex scalars
+    mapping : pd.DataFrame
+        Mapping of the FlexMex parameters to (carrier, tech, var_name), see
+        'mapping-output-scalars.csv'
+    scenario : str
+        Name of the scenario ('UseCase')
 
     Returns
     -------
-
+    flexmex_scalars : pd.DataFrame
+        Template with the values
     """
-    varom_cost = []
-    for prep_el in prep_elements.values():
-        if "marginal_cost" in prep_el.columns:
-            df = prep_el[basic_columns]
-            if prep_el["type"][0] == "excess":
-                flow = oemoflex_scalars.loc[oemoflex_scalars["var_name"] == "flow_in"]
-            elif prep_el["type"][0] in ["backpressure", "extraction"]:
-                flow = oemoflex_scalars.loc[
-                    oemoflex_scalars["var_name"] == "flow_electricity"
-                ]
-            elif prep_el["type"][0] in ["link", "electrical line"]:
-                net_flows = ["flow_net_forward", "flow_net_backward"]
-                flow = oemoflex_scalars.loc[
-                    oemoflex_scalars["var_name"].isin(net_flows)
-                ]
-                flow = flow.groupby(basic_columns, as_index=False).sum()
-            else:
-                flow = oemoflex_scalars.loc[oemoflex_scalars["var_name"] == "flow_out"]
-            df = pd.merge(df, flow, on=basic_columns)
-            df["var_value"] = df["var_value"] * prep_el["marginal_cost"]
-            df["var_name"] = "cost_varom"
-
-            varom_cost.append(df)
-
-    varom_cost = pd.concat(varom_cost)
-    varom_cost["var_unit"] = "Eur"
-
-    return varom_cost
-
-
-def get_carrier_cost(oemoflex_scalars, prep_elements):
-    carrier_cost = []
-    for prep_el in prep_elements.values():
-        if "carrier_cost" in prep_el.columns:
-            df = prep_el[basic_columns]
-            if prep_el["type"][0] in ["backpressure", "extraction"]:
-                flow = oemoflex_scalars.loc[oemoflex_scalars["var_name"] == "flow_fuel"]
-            else:
-                flow = oemoflex_scalars.loc[oemoflex_scalars["var_name"] == "flow_in"]
-            df = pd.merge(df, flow, on=basic_columns)
-            df["var_value"] = df["var_value"] * prep_el["carrier_cost"]
-            df["var_name"] = "cost_carrier"
-
-            carrier_cost.append(df)
-
-    if carrier_cost:
-        carrier_cost = pd.concat(carrier_cost)
-    else:
-        carrier_cost = pd.DataFrame(carrier_cost)
-
-    carrier_cost["var_unit"] = "Eur"
-
-    return carrier_cost
-
+    keys = ["Region", "carrier", "tech", "var_name"]
 
-def get_fuel_cost(oemoflex_scalars, prep_elements, scalars_raw):
-    r"""
-    Re-calculates the fuel costs from the carrier costs if there are CO2 emissions.
-
-    Bypass for non-emission carriers (cost_carrier = cost_fuel).
-
-    Having emissions or not is determined by the parameter mapping dict (emission_factor).
-
-    TODO Let's think about using the 'flow' values as input because this way we could
-     generalize the structure with get_varom_cost() and get_emission_cost() into one function
-     for all 'flow'-derived values.
-
-    Parameters
-    ----------
-    oemoflex_scalars
-    prep_elements
-    scalars_raw
-
-    Returns
-    -------
-
-    """
-
-    fuel_cost = pd.DataFrame()
-
-    # Iterate over oemof.tabular components (technologies)
-    for prep_el in prep_elements.values():
-        if "carrier_cost" in prep_el.columns:
+    flexmex_scalars = flexmex_scalars_template.copy()
 
-            # Set up a list of the current technology's elements
-            df = prep_el.loc[:, basic_columns]
+    values = oemoflex_scalars.loc[:, ["region", "carrier", "tech", "var_name"]]
+    values.columns = keys
+    values["var_value"] = oemoflex_scalars["var_value"].values
+    values.loc[
+        (oemoflex_scalars["var_unit"] == "MWh").values, "var_value"
+    ] *= 1e-3  # MWh to GWh
 
-            # Select carriers from the parameter map
-            carrier_name = prep_el["carrier"][0]
-            parameters = FlexMex_Parameter_Map["carrier"][carrier_name]
+    values = values.loc[~values.duplicated(keys, keep=False)]
 
-            # Only re-calculate if there is a CO2 emission
-            if "emission_factor" in parameters.keys():
+    rows = flexmex_scalars.loc[
+        flexmex_scalars["UseCase"] == scenario, ["Region", "Parameter"]
+    ]
 
-                price_carrier = get_parameter_values(
-                    scalars_raw, parameters["carrier_price"]
-                )
+    rows = rows.reset_index().merge(mapping, on="Parameter")
 
-                price_emission = get_parameter_values(
-                    scalars_raw, parameters["co2_price"]
-                ) * get_parameter_values(scalars_raw, parameters["emission_factor"])
+    rows = rows.merge(values, how="left", on=keys, indicator=True)
 
-                factor = price_carrier / (price_carrier + price_emission)
+    is_missing = rows["_merge"] == "left_only"
 
-            # Otherwise take the carrier cost value for the fuel cost
-            else:
-                factor = 1.0
+    if is_missing.any():
+        missing_keys = rows.loc[is_missing, keys].drop_duplicates()
+        logging.info(
+            f"No unique keys found to be mapped to FlexMex for {is_missing.sum()} "
+            f"parameters: {list(missing_keys.itertuples(index=False, name=None))}"
+        )
 
-            df = get_calculated_parameters(df, oemoflex_scalars, "cost_carrier", factor)
+    rows = rows.loc[~is_missing]
 
-            # Update other columns
-            df["var_name"] = "cost_fuel"
-            df["var_unit"] = "Eur"
+    flexmex_scalars.loc[rows["index"].values, "Value"] = np.around(
+        rows["var_value"].values.astype(float)
+    )
 
-            # Append current technology elements to the return DataFrame
-            fuel_cost = pd.concat([fuel_cost, df])
+    flexmex_scalars.loc[:, "Modell"] = "oemof"
 
-    return fuel_cost
+    return flexmex_scalars
 
 
-def get_emission_cost(oemoflex_scalars, prep_elements, scalars_raw):
+def get_parameters(scalars_raw, parameter_names, regions):
     r"""
-    Re-calculates the emission costs from the carrier costs if there are CO2 emissions.
-
-    Structure only slightly different (+ else branch) from get_fuel_cost() because there are costs
-    of zero instead of the fuel costs (in get_fuel_cost()) if there are no emissions.
+    Looks up the values of 'Scalars.csv' for pairs of parameter names and regions. Each
+    parameter is queried once.
 
     Parameters
     ----------
-    oemoflex_scalars
-    prep_elements
-    scalars_raw
+    scalars_raw : DataFrame or ScalarsIndex
+        DataFrame of "Scalars.csv" or a ScalarsIndex built from it
+    parameter_names : pd.Series
+        Names of the parameters, NaN for none
+    regions : pd.Series
+        Regions, aligned with 'parameter_names'
 
     Returns
     -------
-
+    values : np.array
+        Values of the parameters, NaN if there is none
     """
+    values = np.full(len(parameter_names), np.nan)
 
-    emission_cost = pd.DataFrame()
-
-    # Iterate over oemof.tabular components (technologies)
-    for prep_el in prep_elements.values():
-        if "carrier_cost" in prep_el.columns:
+    for parameter_name in parameter_names.dropna().unique():
+        is_parameter = (parameter_names == parameter_name).values
 
-            # Set up a list of the current technology's elements
-            df = prep_el.loc[:, basic_columns]
+        parameter_values = get_parameter_values(scalars_raw, parameter_name)
 
-            # Select carriers from the parameter map
-            carrier_name = prep_el["carrier"][0]
-            parameters = FlexMex_Parameter_Map["carrier"][carrier_name]
+        if isinstance(parameter_values, pd.Series):
+            parameter_values = regions[is_parameter].map(parameter_values).values
 
-            # Only re-calculate if there is a CO2 emission
-            if "emission_factor" in parameters.keys():
-                price_carrier = get_parameter_values(
-                    scalars_raw, parameters["carrier_price"]
-                )
+        values[is_parameter] = parameter_values
 
-                price_emission = get_parameter_values(
-                    scalars_raw, parameters["co2_price"]
-                ) * get_parameter_values(scalars_raw, parameters["emission_factor"])
+    return values
 
-                factor = price_emission / (price_carrier + price_emission)
 
-                df = get_calculated_parameters(
-                    df, oemoflex_scalars, "cost_carrier", factor
-                )
+def get_parameter_names(keys, parameter_map, name):
+    r"""
+    Returns the names of the parameter 'name' of carriers or techs in a map of the input
+    parameters, see 'mapping-input-scalars.yml', or NaN if it has none.
+    """
+    parameter_names = {key: parameter_map[key].get(name) for key in keys.unique()}
 
-            else:
-                df["var_value"] = 0.0
+    return keys.map(parameter_names)
 
-            # Update other columns
-            df["var_name"] = "cost_emission"
-            df["var_unit"] = "Eur"
 
-            # Append current technology elements to the return DataFrame
-            emission_cost = pd.concat([emission_cost, df])
+def get_annuities(capex, lifetime, interest):
+    r"""
+    Calculates the annuities of single investments, as oemof.tools.economics.annuity(), for
+    arrays of capex, lifetimes and interest rates.
+    """
+    if (lifetime < 1).any() or (interest < 0).any() or (interest > 1).any():
+        raise ValueError("Input arguments for 'annuity' out of bounds!")
 
-    return emission_cost
+    return (
+        capex
+        * (interest * (1 + interest) ** lifetime)
+        / ((1 + interest) ** lifetime - 1)
+    )
 
 
-def get_calculated_parameters(df, oemoflex_scalars, parameter_name, factor):
+def get_cost_factors(prep_elements, scalars_raw):
     r"""
-    Takes the pre-calculated parameter 'parameter_name' from
-    'oemoflex_scalars' DataFrame and returns it multiplied by 'factor' (element-wise)
-    with 'df' as a template
+    Builds the table of cost factors of all components from the preprocessed elements and the
+    input parameters mapped in 'mapping-input-scalars.yml'.
+
+    Each row holds a cost ('cost_varom', 'cost_carrier', 'cost_fuel', 'cost_emission',
+    'cost_invest' or 'cost_fixom') of a component and the oemoflex scalar ('var_name') it is
+    proportional to. The cost is that scalar times 'factor' times 'share'.
+
+    * VarOM cost: 'marginal_cost' times the output flow of the component, the electricity
+      flow of CHPs, the input flow of excess components and the net flows of links.
+    * Carrier cost: 'carrier_cost' times the fuel flow of CHPs or the input flow of all
+      other components.
+    * Fuel and emission cost: the carrier cost split into the shares of the carrier price
+      and the emission price. Carriers without an emission factor have no emission cost (0).
+    * Invest cost: annuities of the invested capacities. Storages in STORAGE_INVEST_TECHS
+      have separate investments for their charge, discharge and storage devices.
+    * FixOM cost: FixOM (percent of the capex) of the invested capacities.
 
     Parameters
     ----------
-    df
-        output template DataFrame
-    oemoflex_scalars
-        DataFrame with pre-calculated parameters
-    parameter_name
-        parameter to manipulate
-    factor
-        factor to multiply parameter with
+    prep_elements : dict
+        Preprocessed elements
+    scalars_raw : DataFrame or ScalarsIndex
+        DataFrame of "Scalars.csv" or a ScalarsIndex built from it
 
     Returns
     -------
-
+    cost_factors : pd.DataFrame
+        Cost factors with the columns of 'basic_columns' and 'cost', 'var_name', 'factor'
+        and 'share', ordered by cost and component
     """
-    calculated_parameters = oemoflex_scalars.loc[
-        oemoflex_scalars["var_name"] == parameter_name
-    ].copy()
-
-    if calculated_parameters.empty:
-        logging.info(
-            "No key '{}' found as input"
-            "for postprocessing calculation.".format(parameter_name)
-        )
-
-    # Make sure that values in columns to merge on are strings
-    # See here:
-    # https://stackoverflow.com/questions/39582984/pandas-merging-on-string-columns-not-working-bug
-    calculated_parameters[basic_columns] = calculated_parameters[basic_columns].astype(
-        str
+    components = pd.concat(
+        [
+            prep_el.reindex(columns=basic_columns + COST_COLUMNS)
+            for prep_el in prep_elements.values()
+        ],
+        ignore_index=True,
     )
 
-    df = pd.merge(df, calculated_parameters, on=basic_columns)
-
-    df["var_value"] = df["var_value"] * factor
-
-    return df
+    components["position"] = np.arange(len(components))
 
+    def select(mask, cost, var_name, factor, share=1.0):
+        selected = components.loc[mask, basic_columns + ["position"]]
+        selected["cost"] = cost
+        selected["var_name"] = var_name
+        selected["factor"] = factor
+        selected["share"] = share
 
-def get_invest_cost(oemoflex_scalars, prep_elements, scalars_raw):
+        return selected
 
-    invest_cost = pd.DataFrame()
+    is_chp = components["type"].isin(["backpressure", "extraction"]).values
 
-    for prep_el in prep_elements.values():
-        # In the following line: Not 'is'! pandas overloads operators!
-        if (
-            "expandable" in prep_el.columns
-            and prep_el["expandable"][0] == True  # noqa: E712
-        ):  # noqa: E712, E501 # pylint: disable=C0121
-            # element is expandable --> 'invest' values exist
-            df = prep_el[basic_columns]
+    # VarOM cost
+    varom = components["marginal_cost"].notna().values
 
-            tech_name = prep_el["tech"][0]
-            parameters = FlexMex_Parameter_Map["tech"][tech_name]
+    varom_flow = np.select(
+        [
+            components["type"] == "excess",
+            is_chp,
+            components["type"].isin(["link", "electrical line"]),
+        ],
+        ["flow_in", "flow_electricity", "flow_net"],
+        "flow_out",
+    )
 
-            interest = (
-                get_parameter_values(scalars_raw, "EnergyConversion_InterestRate_ALL")
-                * 1e-2
-            )  # percent -> 0...1
+    # Carrier, fuel and emission cost
+    carrier = components["carrier_cost"].notna().values
 
-            # Special treatment for storages
-            if tech_name in ["h2_cavern", "liion_battery"]:
+    carrier_flow = np.where(is_chp, "flow_fuel", "flow_in")[carrier]
 
-                # Charge device
-                capex = get_parameter_values(scalars_raw, parameters["charge_capex"])
+    carrier_cost = components.loc[carrier, "carrier_cost"].values
 
-                lifetime = get_parameter_values(
-                    scalars_raw, parameters["charge_lifetime"]
-                )
+    carriers = components.loc[carrier, "carrier"]
+    regions = components.loc[carrier, "region"]
 
-                annualized_cost = annuity(capex=capex, n=lifetime, wacc=interest)
+    def get_carrier_parameters(name):
+        return get_parameters(
+            scalars_raw,
+            get_parameter_names(carriers, FlexMex_Parameter_Map["carrier"], name),
+            regions,
+        )
 
-                df_charge = get_calculated_parameters(
-                    df, oemoflex_scalars, "capacity_charge_invest", annualized_cost
-                )
+    price_carrier = get_carrier_parameters("carrier_price")
 
-                # Discharge device
-                capex = get_parameter_values(scalars_raw, parameters["discharge_capex"])
+    price_emission = get_carrier_parameters("co2_price") * get_carrier_parameters(
+        "emission_factor"
+    )
 
-                lifetime = get_parameter_values(
-                    scalars_raw, parameters["discharge_lifetime"]
-                )
+    has_emission = get_parameter_names(
+        carriers, FlexMex_Parameter_Map["carrier"], "emission_factor"
+    ).notna()
 
-                annualized_cost = annuity(capex=capex, n=lifetime, wacc=interest)
+    fuel_share = np.where(
+        has_emission, price_carrier / (price_carrier + price_emission), 1.0
+    )
 
-                df_discharge = get_calculated_parameters(
-                    df, oemoflex_scalars, "capacity_discharge_invest", annualized_cost
-                )
+    emission_share = np.where(
+        has_emission, price_emission / (price_carrier + price_emission), 0.0
+    )
 
-                # Storage cavern
-                capex = (
-                    get_parameter_values(scalars_raw, parameters["storage_capex"])
-                    * 1e-3
-                )  # €/MWh -> €/GWh
+    # Invest and FixOM cost
+    invest = components["expandable"].eq(True).values
 
-                lifetime = get_parameter_values(
-                    scalars_raw, parameters["storage_lifetime"]
-                )
+    techs = components.loc[invest, "tech"]
+    regions = components.loc[invest, "region"]
 
-                annualized_cost = annuity(capex=capex, n=lifetime, wacc=interest)
+    def get_tech_parameters(name):
+        return get_parameters(
+            scalars_raw,
+            get_parameter_names(techs, FlexMex_Parameter_Map["tech"], name),
+            regions,
+        )
 
-                df_storage = get_calculated_parameters(
-                    df, oemoflex_scalars, "storage_capacity_invest", annualized_cost
-                )
+    interest = (
+        get_parameters(
+            scalars_raw,
+            pd.Series("EnergyConversion_InterestRate_ALL", index=regions.index),
+            regions,
+        )
+        * 1e-2
+    )  # percent -> 0...1
 
-                df = pd.concat([df_charge, df_discharge, df_storage])
+    fix_cost_factor = get_tech_parameters("fixom") * 1e-2  # percent -> 0...1
 
-                # Sum the 3 amounts per storage, keep indexes as columns
-                df = df.groupby(by=basic_columns, as_index=False).sum()
+    is_storage = techs.isin(STORAGE_INVEST_TECHS).values
 
-            else:
-                capex = get_parameter_values(scalars_raw, parameters["capex"])
+    invest_cost = []
+    fixom_cost = []
 
-                lifetime = get_parameter_values(scalars_raw, parameters["lifetime"])
+    for storage, var_name, capex, lifetime, scale in INVEST_CAPACITIES:
+        selected = is_storage == storage
 
-                annualized_cost = annuity(capex=capex, n=lifetime, wacc=interest)
+        mask = invest.copy()
+        mask[invest] = selected
 
-                df = get_calculated_parameters(
-                    df, oemoflex_scalars, "invest", annualized_cost
-                )
+        capex = get_tech_parameters(capex)[selected] * scale
 
-            df["var_name"] = "cost_invest"
-            df["var_unit"] = "Eur"
+        annualized_cost = get_annuities(
+            capex, get_tech_parameters(lifetime)[selected], interest[selected]
+        )
 
-            invest_cost = pd.concat([invest_cost, df])
+        invest_cost.append(select(mask, "cost_invest", var_name, annualized_cost))
 
-    return invest_cost
+        fixom_cost.append(
+            select(mask, "cost_fixom", var_name, fix_cost_factor[selected] * capex)
+        )
 
+    def by_component(frames):
+        return pd.concat(frames).sort_values("position", kind="mergesort")
 
-def get_fixom_cost(oemoflex_scalars, prep_elements, scalars_raw):
+    cost_factors = pd.concat(
+        [
+            select(varom, "cost_varom", varom_flow[varom], components["marginal_cost"]),
+            select(carrier, "cost_carrier", carrier_flow, carrier_cost),
+            select(carrier, "cost_fuel", carrier_flow, carrier_cost, fuel_share),
+            select(
+                carrier, "cost_emission", carrier_flow, carrier_cost, emission_share
+            ),
+            by_component(invest_cost),
+            by_component(fixom_cost),
+        ],
+        ignore_index=True,
+    )
 
-    fixom_cost = pd.DataFrame()
+    return cost_factors.drop(columns="position")
 
-    for prep_el in prep_elements.values():
-        # not 'is'! pandas overloads operators!
-        if (
-            "expandable" in prep_el.columns
-            and prep_el["expandable"][0] == True  # noqa: E712
-        ):  # noqa: E712, E501 # pylint: disable=C0121
-            # element is expandable --> 'invest' values exist
-            df = prep_el[basic_columns]
 
-            tech_name = prep_el["tech"][0]
-            parameters = FlexMex_Parameter_Map["tech"][tech_name]
+def get_costs(oemoflex_scalars, prep_elements, scalars_raw):
+    r"""
+    Calculates the costs of all components with one join of the cost factors, see
+    get_cost_factors(), and the oemoflex scalars. Costs with several factors, e.g. the
+    invest cost of the devices of a storage, are summed per component.
 
-            # Special treatment for storages
-            if tech_name in ["h2_cavern", "liion_battery"]:
+    Parameters
+    ----------
+    oemoflex_scalars : pd.DataFrame
+        Oemoflex scalars with the summed flows and the capacities
+    prep_elements : dict
+        Preprocessed elements
+    scalars_raw : DataFrame or ScalarsIndex
+        DataFrame of "Scalars.csv" or a ScalarsIndex built from it
 
-                # One fix cost factor for all sub-components
-                fix_cost_factor = (
-                    get_parameter_values(scalars_raw, parameters["fixom"]) * 1e-2
-                )  # percent -> 0...1
+    Returns
+    -------
+    costs : pd.DataFrame
+        Costs in the format of the oemoflex scalars, ordered by cost and component
+    """
+    cost_factors = get_cost_factors(prep_elements, scalars_raw)
 
-                # Charge device
-                capex = get_parameter_values(scalars_raw, parameters["charge_capex"])
-                df_charge = get_calculated_parameters(
-                    df,
-                    oemoflex_scalars,
-                    "capacity_charge_invest",
-                    fix_cost_factor * capex,
-                )
+    keys = basic_columns + ["var_name"]
 
-                # Discharge device
-                capex = get_parameter_values(scalars_raw, parameters["discharge_capex"])
-                df_discharge = get_calculated_parameters(
-                    df,
-                    oemoflex_scalars,
-                    "capacity_discharge_invest",
-                    fix_cost_factor * capex,
-                )
+    quantities = oemoflex_scalars.loc[
+        oemoflex_scalars["var_name"].isin(cost_factors["var_name"].unique()),
+        keys + ["var_value"],
+    ]
 
-                # Storage cavern
-                capex = (
-                    get_parameter_values(scalars_raw, parameters["storage_capex"])
-                    * 1e-3
-                )  # €/MWh -> €/GWh
+    # The VarOM cost of links is proportional to the sum of their net flows
+    net_flows = oemoflex_scalars.loc[
+        oemoflex_scalars["var_name"].isin(["flow_net_forward", "flow_net_backward"])
+    ]
+    net_flows = net_flows.groupby(basic_columns, as_index=False)["var_value"].sum()
+    net_flows["var_name"] = "flow_net"
 
-                df_storage = get_calculated_parameters(
-                    df,
-                    oemoflex_scalars,
-                    "storage_capacity_invest",
-                    fix_cost_factor * capex,
-                )
+    quantities = pd.concat([quantities, net_flows], sort=False)
 
-                df = pd.concat([df_charge, df_discharge, df_storage])
+    missing = set(cost_factors["var_name"]) - set(quantities["var_name"])
 
-                # Sum the 3 amounts per storage, keep indexes as columns
-                df = df.groupby(by=basic_columns, as_index=False).sum()
+    if missing:
+        logging.info(
+            f"No keys {sorted(missing)} found as input for postprocessing calculation."
+        )
 
-            else:
-                capex = get_parameter_values(scalars_raw, parameters["capex"])
+    # a left merge keeps the order of the cost factors
+    costs = cost_factors.merge(quantities, how="left", on=keys, indicator=True)
+    costs = costs.loc[costs["_merge"] == "both"]
 
-                fix_cost_factor = (
-                    get_parameter_values(scalars_raw, parameters["fixom"]) * 1e-2
-                )  # percent -> 0...1
+    values = (
+        costs["var_value"].values.astype(float)
+        * costs["factor"].values.astype(float)
+        * costs["share"].values
+    )
 
-                df = get_calculated_parameters(
-                    df, oemoflex_scalars, "invest", fix_cost_factor * capex
-                )
+    # the factors of a cost of a component follow each other
+    is_first = ~costs.duplicated(["cost"] + basic_columns).values
+    first = np.flatnonzero(is_first)
 
-            df["var_name"] = "cost_fixom"
-            df["var_unit"] = "Eur"
+    costs = costs.loc[is_first, basic_columns + ["cost"]]
+    costs.columns = basic_columns + ["var_name"]
 
-            fixom_cost = pd.concat([fixom_cost, df])
+    costs["var_value"] = np.add.reduceat(values, first) if len(first) else values
+    costs["var_unit"] = "Eur"
 
-    return fixom_cost
+    return costs.reset_index(drop=True)
 
 
 def aggregate_by_country(df):
@@ -1067,36 +1404,132 @@ def get_total_system_cost(oemoflex_scalars):
     return total_system_cost
 
 
-def save_flexmex_timeseries(sequences_by_tech, scenario, model, year, dir):
+def get_flexmex_timeseries_files(sequences_by_tech, scenario, model, year, dir):
+    r"""
+    Plans the FlexMex timeseries files: one file per region, carrier-tech and variable that is
+    mapped to a subdirectory in 'mapping-output-timeseries.yml'. Carrier-techs without a
+    mapping are logged in one entry.
 
-    for carrier_tech in sequences_by_tech.columns.unique(level="carrier_tech"):
-        try:
-            components_paths = map_output_timeseries[carrier_tech]
-        except KeyError:
-            logging.info(
-                f"No entry found in {path_map_output_timeseries} for '{carrier_tech}'."
-            )
-            continue
+    Parameters
+    ----------
+    sequences_by_tech : pd.DataFrame
+        Sequences with the column levels 'region', 'carrier_tech' and 'var_name'
+    scenario : str
+        Name of the scenario
+    model : str
+        Name of the model
+    year : str
+        Year of the scenario
+    dir : str
+        Directory of the postprocessed results
 
-        idx = pd.IndexSlice
-        for var_name, subdir in components_paths.items():
-            df_var_value = sequences_by_tech.loc[:, idx[:, carrier_tech, var_name]]
-            for region in df_var_value.columns.get_level_values("region"):
-                filename = os.path.join(
-                    dir, subdir, "_".join([scenario, model, region, year]) + ".csv"
-                )
+    Returns
+    -------
+    files : pd.Series
+        Column positions in 'sequences_by_tech' indexed by the paths of the files. If several
+        columns map to the same path, the last one is kept.
+    """
+    columns = sequences_by_tech.columns.to_frame(index=False)
+    columns["position"] = np.arange(len(columns))
 
-                single_column = df_var_value.loc[:, region]
-                single_column = single_column.reset_index(drop=True)
-                single_column.columns = single_column.columns.droplevel("carrier_tech")
-                remaining_column_name = list(single_column)[0]
-                single_column.rename(
-                    columns={remaining_column_name: "value"}, inplace=True
-                )
-                single_column.index.name = "timeindex"
-                single_column.to_csv(filename, header=True)
+    mapping = pd.DataFrame(
+        [
+            (carrier_tech, var_name, subdir)
+            for carrier_tech, components_paths in map_output_timeseries.items()
+            for var_name, subdir in components_paths.items()
+        ],
+        columns=["carrier_tech", "var_name", "subdir"],
+    )
+
+    carrier_techs = pd.Series(columns["carrier_tech"].unique())
+    is_mapped = carrier_techs.isin(mapping["carrier_tech"])
+
+    if not is_mapped.all():
+        logging.info(
+            f"No entry found in {path_map_output_timeseries} for "
+            f"{list(carrier_techs[~is_mapped])}."
+        )
+
+    mapping["carrier_tech_order"] = mapping["carrier_tech"].map(
+        pd.Series(carrier_techs.index, index=carrier_techs.values)
+    )
+    mapping["var_name_order"] = np.arange(len(mapping))
+
+    files = mapping.merge(columns, on=["carrier_tech", "var_name"])
+
+    # order in which the files used to be written one after another
+    files = files.sort_values(["carrier_tech_order", "var_name_order", "position"])
+
+    paths = [
+        os.path.join(dir, subdir, "_".join([scenario, model, region, year]) + ".csv")
+        for subdir, region in zip(files["subdir"], files["region"])
+    ]
 
-    delete_empty_subdirs(dir)
+    files = pd.Series(files["position"].values, index=paths)
+
+    return files.loc[~files.index.duplicated(keep="last")]
+
+
+def format_values(values):
+    r"""
+    Formats an array of floats as pd.DataFrame.to_csv() does: shortest representation and
+    empty strings for NaN.
+    """
+    formatted = values.astype(str)
+    formatted[np.isnan(values)] = ""
+
+    return formatted
+
+
+def save_flexmex_timeseries(
+    sequences_by_tech, scenario, model, year, dir, max_workers=None
+):
+    r"""
+    Writes the FlexMex timeseries, one CSV file per region, carrier-tech and variable with
+    the columns 'timeindex' (0, 1, ...) and 'value', see get_flexmex_timeseries_files().
+
+    The files are planned up front, so that only their directories are created. The values
+    of a file are formatted at once and the files can be written by a pool of threads.
+
+    Parameters
+    ----------
+    sequences_by_tech : pd.DataFrame
+        Sequences with the column levels 'region', 'carrier_tech' and 'var_name'
+    scenario : str
+        Name of the scenario
+    model : str
+        Name of the model
+    year : str
+        Year of the scenario
+    dir : str
+        Directory of the postprocessed results
+    max_workers : int
+        Number of threads writing in parallel. If None, the files are written one after
+        another.
+    """
+    files = get_flexmex_timeseries_files(sequences_by_tech, scenario, model, year, dir)
+
+    for subdir in sorted({os.path.dirname(path) for path in files.index}):
+        os.makedirs(subdir, exist_ok=True)
+
+    values = sequences_by_tech.values
+
+    timeindex = [f"{timestep}," for timestep in range(len(sequences_by_tech))]
+
+    def write(path, position):
+        lines = map(str.__add__, timeindex, format_values(values[:, position]).tolist())
+
+        with open(path, "w") as file:
+            file.write("\n".join(["timeindex,value", *lines]) + "\n")
+
+    if max_workers is None:
+        for path, position in files.items():
+            write(path, position)
+
+    else:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # list() to raise exceptions of the threads
+            list(executor.map(write, files.index, files.values))
 
 
 def sum_transmission_flows(sequences_by_tech):
@@ -1145,35 +1578,23 @@ def aggregate_re_generation_timeseries(sequences_by_tech):
     return df_re_generation
 
 
-def get_seq_by_var(es, results):
-
-    # copy to avoid manipulating the data in es.results
-    sequences = copy.deepcopy(
-        {
-            key: value["sequences"]
-            for key, value in results.items()
-            if value["sequences"] is not None
-        }
-    )
-
-    sequences = convert_to_multiindex(sequences)
-
-    idx = pd.IndexSlice
-
-    variables = list(set(sequences.columns.get_level_values(2)))
+def get_seq_by_var(results, nodes):
+    # like oemof.outputlib.views.convert_to_multiindex(), which sorts the keys by the labels
+    # of the nodes, comparing None like the string 'None'
+    def sort_key(row):
+        return tuple("None" if label is None else label for label in results.rows[row])
 
     sequences_by_variable = {}
 
-    for variable in variables:
-
-        var_results = sequences.loc[:, idx[:, :, variable]]
+    for variable in results.get_variables():
+        rows = sorted(results.get_rows(variable=variable), key=sort_key)
 
-        sequences_by_variable[variable] = var_results
+        sequences_by_variable[variable] = results.get_sequences(rows)
 
     return sequences_by_variable
 
 
-def get_sequences(es, kind=("bus", "component", "variable")):
+def get_sequences(results, nodes, kind=("bus", "component", "variable")):
     def get_rel_paths(keys, *subdirs, file_ext=".csv"):
         return {key: os.path.join(*subdirs, key + file_ext) for key in keys}
 
@@ -1181,8 +1602,8 @@ def get_sequences(es, kind=("bus", "component", "variable")):
         return {key: value for key, value in dictionary.items() if not value.empty}
 
     methods = {
-        "bus": pp.bus_results,
-        "component": pp.component_results,
+        "bus": bus_results,
+        "component": component_results,
         "variable": get_seq_by_var,
     }
 
@@ -1192,7 +1613,7 @@ def get_sequences(es, kind=("bus", "component", "variable")):
     rel_paths_seq = {}
 
     for name, method in methods.items():
-        data = method(es, es.results)
+        data = method(results, nodes)
 
         data = drop_empty_dfs(data)
 
@@ -1205,20 +1626,26 @@ def get_sequences(es, kind=("bus", "component", "variable")):
     return data_seq, rel_paths_seq
 
 
-def export_sequences(es, destination, kind=("bus", "component", "variable")):
+def export_sequences(
+    results, nodes, destination, kind=("bus", "component", "variable")
+):
+
+    # one kind at a time, so that only the sequences of one kind are in memory at once
+    for name in kind:
+        data, rel_paths = get_sequences(results, nodes, kind=(name,))
 
-    data, rel_paths = get_sequences(es, kind)
+        for key, value in data.items():
 
-    for key, value in data.items():
+            full_path = os.path.join(destination, rel_paths[key])
 
-        full_path = os.path.join(destination, rel_paths[key])
+            root = os.path.split(full_path)[0]
 
-        root = os.path.split(full_path)[0]
+            if not os.path.exists(root):
+                os.makedirs(root)
 
-        if not os.path.exists(root):
-            os.makedirs(root)
+            value.to_csv(full_path)
 
-        value.to_csv(full_path)
+        del data
 
 
 def log_solver_time_to_file(meta_results, path):
@@ -1262,11 +1689,13 @@ def log_problem_metrics_to_file(meta_results, path):
     df.to_csv(output_path, index=False)
 
 
-def run_postprocessing(scenario_specs, exp_paths):
-    create_postprocessed_results_subdirs(exp_paths.results_postprocessed)
+def run_postprocessing(scenario_specs, exp_paths, cache_dir=None):
+    os.makedirs(exp_paths.results_postprocessed, exist_ok=True)
 
     # load raw data
-    scalars_raw = load_scalar_input_data(scenario_specs, exp_paths.data_raw)
+    scalars_raw = ScalarsIndex(
+        load_scalar_input_data(scenario_specs, exp_paths.data_raw, cache_dir=cache_dir)
+    )
 
     # load scalars templates
     flexmex_scalars_template = pd.read_csv(
@@ -1284,23 +1713,37 @@ def run_postprocessing(scenario_specs, exp_paths):
         os.path.join(exp_paths.data_preprocessed, "data", "elements")
     )
 
-    # restore EnergySystem with results
-    es = EnergySystem()
-    es.restore(exp_paths.results_optimization)
+    # load results
+    meta_results = load_meta_results(exp_paths.results_optimization)
+    log_solver_time_to_file(meta_results, exp_paths.logging_path)
+    log_problem_metrics_to_file(meta_results, exp_paths.logging_path)
 
-    log_solver_time_to_file(es.meta_results, exp_paths.logging_path)
-    log_problem_metrics_to_file(es.meta_results, exp_paths.logging_path)
+    nodes = load_node_metadata(exp_paths.results_optimization)
+    results = load_results(
+        exp_paths.results_optimization,
+        keys=get_required_keys(exp_paths.results_optimization, nodes),
+    )
 
     # format results sequences
-    sequences_by_tech = get_sequences_by_tech(es.results)
+    sequences_by_tech = get_sequences_by_tech(results, nodes)
 
-    flow_net_sum = sum_transmission_flows(sequences_by_tech)
+    periods = load_periods(os.path.join(exp_paths.data_preprocessed, "data"))
+    if periods is not None:
+        sequences_by_tech = expand_representative_periods(
+            sequences_by_tech, nodes, periods, exp_paths.results_optimization
+        )
+
+    # FlexMex templates expect hourly timeseries
+    sequences_by_tech = upsample_sequences(sequences_by_tech)
 
-    sequences_by_tech = pd.concat([sequences_by_tech, flow_net_sum], axis=1)
+    flow_net_sum = sum_transmission_flows(sequences_by_tech)
 
     df_re_generation = aggregate_re_generation_timeseries(sequences_by_tech)
 
-    sequences_by_tech = pd.concat([sequences_by_tech, df_re_generation], axis=1)
+    # one concatenation, which copies all sequences
+    sequences_by_tech = pd.concat(
+        [sequences_by_tech, flow_net_sum, df_re_generation], axis=1
+    )
 
     oemoflex_scalars = pd.DataFrame(
         columns=[
@@ -1332,29 +1775,17 @@ def run_postprocessing(scenario_specs, exp_paths):
     )
 
     # get capacities
-    capacities = get_capacities(es)
+    capacities = get_capacities(results, nodes)
     formatted_capacities = format_capacities(oemoflex_scalars, capacities)
     oemoflex_scalars = pd.concat([oemoflex_scalars, formatted_capacities])
 
-    # costs
-    varom_cost = get_varom_cost(oemoflex_scalars, prep_elements)
-    carrier_cost = get_carrier_cost(oemoflex_scalars, prep_elements)
-    fuel_cost = get_fuel_cost(carrier_cost, prep_elements, scalars_raw)
-    emission_cost = get_emission_cost(carrier_cost, prep_elements, scalars_raw)
-    aggregated_emission_cost = aggregate_by_country(emission_cost)
-    invest_cost = get_invest_cost(oemoflex_scalars, prep_elements, scalars_raw)
-    fixom_cost = get_fixom_cost(oemoflex_scalars, prep_elements, scalars_raw)
-    oemoflex_scalars = pd.concat(
-        [
-            oemoflex_scalars,
-            varom_cost,
-            carrier_cost,
-            fuel_cost,
-            aggregated_emission_cost,
-            invest_cost,
-            fixom_cost,
-        ]
-    )
+    # costs, of which the emission costs are aggregated by country
+    costs = get_costs(oemoflex_scalars, prep_elements, scalars_raw)
+    costs = [
+        aggregate_by_country(cost) if var_name == "cost_emission" else cost
+        for var_name, cost in costs.groupby("var_name", sort=False)
+    ]
+    oemoflex_scalars = pd.concat([oemoflex_scalars] + costs)
 
     # emissions
     emissions = get_emissions(oemoflex_scalars, scalars_raw)
@@ -1396,16 +1827,23 @@ def run_postprocessing(scenario_specs, exp_paths):
             index=False,
         )
 
-    save_oemoflex_timeseries = True
-    if save_oemoflex_timeseries:
-        export_sequences(
-            es, os.path.join(exp_paths.results_postprocessed, "oemoflex-timeseries")
-        )
-
     save_flexmex_timeseries(
         sequences_by_tech,
         scenario_specs["scenario"],
         "oemof",
         "2050",
         exp_paths.results_postprocessed,
+        max_workers=4,
     )
+
+    save_oemoflex_timeseries = True
+    if save_oemoflex_timeseries:
+        # the oemoflex timeseries include the flows of internal buses, so all results are
+        # loaded, after those for the FlexMex results are released
+        del results, sequences_by_tech
+
+        export_sequences(
+            load_results(exp_paths.results_optimization),
+            nodes,
+            os.path.join(exp_paths.results_postprocessed, "oemoflex-timeseries"),
+        )
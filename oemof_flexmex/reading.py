@@ -0,0 +1,312 @@
+import json
+import os
+import numbers
+
+import numpy as np
+import pandas as pd
+from oemof.network import Bus, Component, Node
+from oemof.solph import EnergySystem
+from oemof.solph.plumbing import _Sequence
+from oemof.tabular.datapackage.reading import DEFAULT, FLOW_TYPE
+from oemof.tabular.tools import HSN, remap
+
+from oemof_flexmex.facades import TYPEMAP
+
+# Values read as True by tableschema's boolean type
+TRUE_VALUES = ["true", "True", "TRUE", "1"]
+
+
+def is_sequences_resource(resource):
+    return resource["path"].startswith("data/sequences/")
+
+
+def is_elements_resource(resource):
+    return resource["path"].startswith("data/elements/")
+
+
+def cast_column(column, field_type):
+    r"""
+    Casts a column of strings read from a CSV file like tableschema does. Missing values
+    become None.
+
+    Parameters
+    ----------
+    column : pd.Series
+        Column read with dtype str and empty strings for missing values
+    field_type : str
+        Field type defined in the schema of the resource
+
+    Returns
+    -------
+    values : list
+    """
+    missing = (column == "").values
+
+    if field_type in ["number", "integer"]:
+        cast = float if field_type == "number" else int
+        return [None if m else cast(value) for m, value in zip(missing, column.values)]
+
+    if field_type == "boolean":
+        return [
+            None if m else value in TRUE_VALUES
+            for m, value in zip(missing, column.values)
+        ]
+
+    if field_type == "object":
+        return [
+            None if m else json.loads(value) for m, value in zip(missing, column.values)
+        ]
+
+    return [None if m else value for m, value in zip(missing, column.values)]
+
+
+def read_sequences(path):
+    r"""
+    Reads a sequences resource.
+
+    Returns
+    -------
+    timeindex : list
+        Time index as strings
+    sequences : dict
+        Columns of the resource as numpy arrays
+    """
+    # round_trip parses the values exactly like float() does
+    sequences_df = pd.read_csv(
+        path, index_col=0, dtype={0: str}, float_precision="round_trip"
+    )
+
+    sequences = {
+        column: sequences_df[column].values.astype(float)
+        for column in sequences_df.columns
+    }
+
+    return list(sequences_df.index), sequences
+
+
+def read_elements(path, resource):
+    r"""
+    Reads an elements resource into a list of records, with the values cast according to the
+    schema of the resource.
+    """
+    elements_df = pd.read_csv(path, dtype=str, keep_default_na=False)
+
+    field_types = {
+        field["name"]: field["type"] for field in resource["schema"]["fields"]
+    }
+
+    columns = [
+        cast_column(elements_df[name], field_types.get(name, "string"))
+        for name in elements_df.columns
+    ]
+
+    return [dict(zip(elements_df.columns, values)) for values in zip(*columns)]
+
+
+def load_energysystem(path, typemap=TYPEMAP):
+    r"""
+    Creates an EnergySystem from a datapackage by reading its CSV files with pandas.
+
+    The result equals EnergySystem.from_datapackage(path, attributemap={}, typemap=typemap),
+    but the data is not read row by row by the generic datapackage machinery: Foreign keys
+    to busses and sequences are resolved through dictionaries and the sequences are attached
+    as numpy arrays.
+
+    Parameters
+    ----------
+    path : str
+        Path to the datapackage.json
+    typemap : dict
+        Mapping of the element types to facade classes
+
+    Returns
+    -------
+    es : oemof.solph.EnergySystem
+    """
+    base_path = os.path.dirname(path)
+
+    with open(path) as datapackage_json:
+        resources = json.load(datapackage_json)["resources"]
+
+    typemap = dict(typemap)
+    for key, value in {
+        "bus": Bus,
+        "hub": Bus,
+        DEFAULT: Component,
+        FLOW_TYPE: HSN,
+    }.items():
+        typemap.setdefault(key, value)
+
+    attributemap = {object: {"name": "label"}}
+
+    timeindices = []
+    sequences = {}
+    for resource in filter(is_sequences_resource, resources):
+        timeindex, sequences[resource["name"]] = read_sequences(
+            os.path.join(base_path, resource["path"])
+        )
+        timeindices.append(timeindex)
+
+    if timeindices[1:] != timeindices[:-1]:
+        raise ValueError("Timeindices in resources differ!")
+
+    elements = {
+        resource["name"]: read_elements(
+            os.path.join(base_path, resource["path"]), resource
+        )
+        for resource in filter(is_elements_resource, resources)
+    }
+
+    records_by_name = {
+        name: {record["name"]: record for record in records}
+        for name, records in elements.items()
+    }
+
+    foreign_keys = {
+        resource["name"]: {
+            fk["fields"]: fk["reference"]
+            for fk in resource["schema"].get("foreignKeys", ())
+        }
+        for resource in filter(is_elements_resource, resources)
+    }
+
+    facades = {}
+
+    def create_facade(record, resource_name):
+        if record["name"] in facades:
+            return facades[record["name"]]
+
+        for field, reference in foreign_keys[resource_name].items():
+            if reference["resource"] in sequences:
+                record[field] = sequences[reference["resource"]].get(record[field])
+                continue
+
+            referenced = records_by_name.get(reference["resource"], {}).get(
+                record[field]
+            )
+            if referenced is None:
+                raise ValueError(
+                    f"Could not find '{record[field]}' of field '{field}' of "
+                    f"'{record['name']}' in resource '{reference['resource']}'."
+                )
+
+            # referenced elements are created from a copy, like the related rows of datapackage
+            record[field] = create_facade(dict(referenced), reference["resource"])
+
+        facade_type = typemap.get(record["type"].strip())
+        if facade_type is None:
+            raise ValueError(f"Typemap is missing a mapping for '{record['type']}'.")
+
+        attributes = remap(record, attributemap, facade_type)
+        facade = facade_type(**attributes)
+        for key, value in attributes.items():
+            if not hasattr(facade, key):
+                setattr(facade, key, value)
+
+        facades[record["name"]] = facade
+        return facade
+
+    for name, records in elements.items():
+        for record in records:
+            create_facade(record, name)
+
+    if timeindices:
+        timeindex = pd.DatetimeIndex(timeindices[0])
+        timeindex = pd.DatetimeIndex(
+            timeindex.values, freq=timeindex.inferred_freq, name="timeindex"
+        )
+        es = EnergySystem(timeindex=timeindex, temporal=None)
+    else:
+        es = EnergySystem()
+
+    es.add(
+        *facades.values(),
+        *[
+            subnode
+            for facade in facades.values()
+            if hasattr(facade, "subnodes")
+            for subnode in facade.subnodes
+        ],
+    )
+
+    es.typemap = typemap
+
+    return es
+
+
+def check_if_attributes_equal(a, b, where):
+    r"""
+    Compares two attribute values of nodes or flows and asserts that they are equal. Nodes
+    are compared by label, sequences element-wise, other objects by their attributes.
+
+    Parameters
+    ----------
+    a, b : object
+        Values to compare
+    where : str
+        Description of the attribute, used in the error message
+    """
+    if isinstance(a, Node) or isinstance(b, Node):
+        assert type(a) == type(b) and a.label == b.label, where
+
+    elif isinstance(a, _Sequence) and isinstance(b, _Sequence):
+        # the emulated sequences grow when indexed, only their values matter
+        check_if_attributes_equal(a.default, b.default, where)
+
+    elif isinstance(a, dict) and isinstance(b, dict):
+        keys_a = {str(getattr(key, "label", key)): key for key in a}
+        keys_b = {str(getattr(key, "label", key)): key for key in b}
+        assert sorted(keys_a) == sorted(keys_b), where
+        for key in keys_a:
+            check_if_attributes_equal(a[keys_a[key]], b[keys_b[key]], f"{where}.{key}")
+
+    elif isinstance(a, (set, frozenset)) and isinstance(b, (set, frozenset)):
+        assert sorted(map(str, a)) == sorted(map(str, b)), where
+
+    elif isinstance(a, (list, tuple, np.ndarray)) and isinstance(
+        b, (list, tuple, np.ndarray)
+    ):
+        assert len(a) == len(b), where
+        for i, (value_a, value_b) in enumerate(zip(a, b)):
+            check_if_attributes_equal(value_a, value_b, f"{where}[{i}]")
+
+    elif isinstance(a, numbers.Number) and isinstance(b, numbers.Number):
+        assert a == b or (np.isnan(a) and np.isnan(b)), where
+
+    elif hasattr(a, "__dict__") and hasattr(b, "__dict__"):
+        assert type(a) == type(b), where
+        check_if_attributes_equal(vars(a), vars(b), where)
+
+    else:
+        assert a == b, where
+
+
+def check_if_energysystems_equal(es_a, es_b):
+    r"""
+    Compares two EnergySystems and asserts that they are equal.
+
+    The function asserts that the time indices are equal and that the nodes come in the same
+    order, have the same types and the same attributes. Nodes referenced in attributes are
+    compared by label, sequences element-wise.
+
+    Parameters
+    ----------
+    es_a : oemof.solph.EnergySystem
+        First EnergySystem
+
+    es_b : oemof.solph.EnergySystem
+        Second EnergySystem
+    """
+    assert es_a.timeindex.equals(es_b.timeindex), "The time indices are not the same."
+    assert (
+        es_a.timeindex.freq == es_b.timeindex.freq
+    ), "The frequencies are not the same."
+
+    labels_a = [str(node.label) for node in es_a.nodes]
+    labels_b = [str(node.label) for node in es_b.nodes]
+
+    assert labels_a == labels_b, "The nodes are not the same."
+
+    for label, node_a, node_b in zip(labels_a, es_a.nodes, es_b.nodes):
+        assert type(node_a) == type(node_b), f"The types of '{label}' are not the same."
+        check_if_attributes_equal(vars(node_a), vars(node_b), label)
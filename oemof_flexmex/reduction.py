@@ -0,0 +1,305 @@
+import copy
+import logging
+import numbers
+
+import numpy as np
+import pandas as pd
+from oemof.solph import Bus, Transformer
+from oemof.solph.components import GenericStorage, GenericStorageBlock
+from oemof.solph.custom import Link
+
+from oemof_flexmex.results_array import ResultsArray
+
+
+def is_zero(value):
+    r"""
+    Returns True for a capacity of 0 or NaN. None means unbounded.
+    """
+    if not isinstance(value, numbers.Number):
+        return False
+
+    return value == 0 or np.isnan(value)
+
+
+def is_zero_sequence(sequence, n_timesteps):
+    return not any(sequence[t] != 0 for t in range(n_timesteps))
+
+
+def is_zero_flow(flow, n_timesteps):
+    r"""
+    Returns True if the bounds of a flow fix it to zero in all time steps: the flow has a
+    nominal value of zero, or a profile (fixed flows) or maximum that is zero everywhere.
+
+    Flows with investment, nonconvex or integer variables or gradient limits are never zero.
+    """
+    if (
+        flow.investment is not None
+        or flow.nonconvex is not None
+        or flow.integer
+        or flow.positive_gradient["ub"][0] is not None
+        or flow.negative_gradient["ub"][0] is not None
+    ):
+        return False
+
+    if flow.nominal_value is None:
+        return False
+
+    if is_zero(flow.nominal_value):
+        return True
+
+    if flow.fixed:
+        return is_zero_sequence(flow.actual_value, n_timesteps)
+
+    return is_zero_sequence(flow.max, n_timesteps)
+
+
+def get_inactive_nodes(es):
+    r"""
+    Returns the components of an EnergySystem that cannot have any flow: components whose
+    flows are all fixed to zero, e.g. non-expandable components with zero capacity or
+    volatile sources and loads with profiles that are zero everywhere.
+
+    The inputs of transformers (but not links) count as zero if their outputs are zero and
+    their conversion factors are positive. Storages have to have a zero storage capacity as
+    well and no investment or custom constraint block. Buses, components with subnodes
+    (e.g. 'ReservoirWithPump') and subnodes are kept.
+
+    Parameters
+    ----------
+    es : oemof.solph.EnergySystem
+
+    Returns
+    -------
+    nodes : list
+        Inactive components in the order of es.nodes
+    """
+    n_timesteps = len(es.timeindex)
+
+    nodes = list({id(node): node for node in es.nodes}.values())
+
+    subnodes = {
+        id(subnode) for node in nodes for subnode in getattr(node, "subnodes", [])
+    }
+
+    inactive = []
+
+    for node in nodes:
+        if (
+            isinstance(node, Bus)
+            or getattr(node, "subnodes", None)
+            or id(node) in subnodes
+            or getattr(node, "expandable", False)
+        ):
+            continue
+
+        if not is_inactive(node, n_timesteps):
+            continue
+
+        inactive.append(node)
+
+    return inactive
+
+
+def is_inactive(node, n_timesteps):
+    outputs = [is_zero_flow(flow, n_timesteps) for flow in node.outputs.values()]
+    inputs = [is_zero_flow(node.inputs[source], n_timesteps) for source in node.inputs]
+
+    if not outputs and not inputs:
+        return False
+
+    if isinstance(node, GenericStorage):
+        # the results of other storage blocks may have further variables
+        return (
+            node.constraint_group() is GenericStorageBlock
+            and is_zero(node.nominal_storage_capacity)
+            and all(outputs + inputs)
+        )
+
+    if not all(outputs):
+        return False
+
+    if all(inputs):
+        return True
+
+    # flow(input) * conversion_factor(output) = flow(output) * conversion_factor(input)
+    if isinstance(node, Transformer) and not isinstance(node, Link):
+        return all(
+            all(node.conversion_factors[target][t] > 0 for t in range(n_timesteps))
+            for target in node.outputs
+        )
+
+    return False
+
+
+def get_zero_results(nodes, timeindex):
+    r"""
+    Returns the results of inactive components: zero flows, zero storage content and zero
+    initial storage content.
+
+    Parameters
+    ----------
+    nodes : list
+        Inactive components, see get_inactive_nodes()
+    timeindex : pd.DatetimeIndex
+        Time index of the model
+
+    Returns
+    -------
+    zero_results : oemof_flexmex.results_array.ResultsArray
+    """
+    rows = []
+    scalars = []
+
+    for node in nodes:
+        label = str(node.label)
+
+        rows.extend((str(source.label), label, "flow") for source in node.inputs)
+        rows.extend((label, str(target.label), "flow") for target in node.outputs)
+
+        if isinstance(node, GenericStorage):
+            rows.append((label, None, "capacity"))
+            scalars.append((label, None, "init_cap", 0.0))
+
+    scalars = pd.DataFrame(
+        scalars, columns=["source", "target", "var_name", "var_value"]
+    )
+
+    return ResultsArray(np.zeros((len(rows), len(timeindex))), rows, timeindex, scalars)
+
+
+def copy_nodes(nodes):
+    r"""
+    Deep copies the nodes and all nodes connected to them.
+
+    copy.deepcopy() alone does not work here: The outputs and inputs of a node are keyed by
+    nodes, which hash their label, and a node can be put into them before its label is copied.
+    So the copies are created with their labels first and their state is copied afterwards.
+
+    Parameters
+    ----------
+    nodes : list
+        Nodes of an EnergySystem
+
+    Returns
+    -------
+    memo : dict
+        Maps the id of each node to its copy
+    """
+    connected = {}
+    stack = list(nodes)
+
+    while stack:
+        node = stack.pop()
+
+        if id(node) not in connected:
+            connected[id(node)] = node
+            stack.extend(node.inputs)
+            stack.extend(node.outputs)
+
+    memo = {}
+
+    for node_id, node in connected.items():
+        copied = type(node).__new__(type(node))
+        copied.label = node.label
+        memo[node_id] = copied
+
+    for node_id, node in connected.items():
+        state = copy.deepcopy(node.__reduce_ex__(4)[2], memo)
+        state, slots = state if isinstance(state, tuple) else (state, None)
+
+        copied = memo[node_id]
+        copied.__dict__.update(state or {})
+
+        for name, value in (slots or {}).items():
+            setattr(copied, name, value)
+
+    return memo
+
+
+def reduce_energysystem(es):
+    r"""
+    Removes the inactive components, see get_inactive_nodes(), from an EnergySystem before
+    the model is built, as each of them still adds variables and constraints for all time
+    steps. The number of variables saved is logged.
+
+    The inactive components are disconnected from their buses in a copy of `es`, so `es` itself
+    keeps its whole topology for writing the results afterwards.
+
+    Parameters
+    ----------
+    es : oemof.solph.EnergySystem
+
+    Returns
+    -------
+    reduced_es : oemof.solph.EnergySystem
+        EnergySystem with the active nodes only
+    zero_results : oemof_flexmex.results_array.ResultsArray
+        Results of the inactive components, see get_zero_results()
+    """
+    n_timesteps = len(es.timeindex)
+
+    inactive = get_inactive_nodes(es)
+
+    zero_results = get_zero_results(inactive, es.timeindex)
+
+    # flow and storage content variables per time step
+    def count_variables(nodes):
+        return n_timesteps * sum(
+            len(node.inputs) + len(node.outputs) + isinstance(node, GenericStorage)
+            for node in nodes
+        )
+
+    n_variables = count_variables({id(node): node for node in es.nodes}.values())
+    n_saved = count_variables(inactive)
+
+    logging.info(
+        f"Pre-reduction removes {len(inactive)} inactive components, saving {n_saved} of "
+        f"{n_variables} flow and storage variables ({n_saved / max(n_variables, 1):.1%})"
+    )
+
+    if not inactive:
+        return es, zero_results
+
+    memo = copy_nodes(es.nodes)
+    nodes = [memo[id(node)] for node in es.nodes]
+    inactive = [memo[id(node)] for node in inactive]
+
+    inactive_ids = {id(node) for node in inactive}
+
+    for node in inactive:
+        for source in list(node.inputs):
+            del source.outputs[node]
+
+        for target in list(node.outputs):
+            del node.outputs[target]
+
+    # buses without any flow left would get an empty balance
+    inactive_ids.update(
+        id(node)
+        for node in nodes
+        if isinstance(node, Bus) and not node.inputs and not node.outputs
+    )
+
+    reduced_es = type(es)(timeindex=es.timeindex, temporal=es.temporal)
+    reduced_es.add(*[node for node in nodes if id(node) not in inactive_ids])
+
+    if hasattr(es, "typemap"):
+        reduced_es.typemap = es.typemap
+
+    return reduced_es, zero_results
+
+
+def add_zero_results(results, zero_results):
+    r"""
+    Adds the results of inactive components, see reduce_energysystem(), to the results of the
+    reduced model, so that they have the shape of the results of the whole EnergySystem.
+    """
+    if not zero_results.rows and zero_results.scalars.empty:
+        return results
+
+    return ResultsArray(
+        np.concatenate([results.values, zero_results.values]),
+        results.rows + zero_results.rows,
+        results.timeindex,
+        pd.concat([results.scalars, zero_results.scalars], ignore_index=True),
+    )
@@ -0,0 +1,494 @@
+import logging
+import os
+
+import pandas as pd
+from pyomo.environ import Block, Constraint, NonNegativeReals, Reals, Set, Var
+
+from oemof_flexmex.parametrization_sequences import save_sequences
+
+
+PERIODS_DIR = "periods"
+
+PERIOD_WEIGHTS_FILE = "period_weights.csv"
+
+PERIOD_MAPPING_FILE = "period_mapping.csv"
+
+STORAGE_CONTENT_FILE = "storage_content_inter_period.csv"
+
+CLUSTER_METHODS = ["k_means", "k_medoids"]
+
+
+def cluster_sequences(
+    preprocessed_path,
+    n_periods,
+    hours_per_period=24,
+    cluster_method="k_means",
+    solver="cbc",
+    sequence_store_dir=None,
+):
+    r"""
+    Clusters the periods of all sequences of a datapackage into representative periods.
+
+    All profiles are stacked and clustered together, so that the representative periods keep
+    the correlation between them. The sequences are overwritten by the representative periods,
+    which are put one after another. The weight of each representative period (the number of
+    original periods it represents, a shorter last period counted by its length) and the
+    mapping of original to representative periods are saved in the sub-directory 'periods'.
+
+    Parameters
+    ----------
+    preprocessed_path : str
+        Path to the 'data' directory of the datapackage
+    n_periods : int
+        Number of representative periods
+    hours_per_period : int
+        Length of a period in hours, e.g. 24 for typical days or 168 for typical weeks
+    cluster_method : str
+        'k_means' or 'k_medoids'
+    solver : str
+        Solver used for k-medoids clustering
+    sequence_store_dir : str or None
+        Directory of the sequence store, see save_sequences(). No store if None.
+    """
+    import tsam.timeseriesaggregation as tsam
+
+    if cluster_method not in CLUSTER_METHODS:
+        raise ValueError(
+            f"Cluster method '{cluster_method}' is not defined. "
+            f"Choose one of {CLUSTER_METHODS}."
+        )
+
+    sequences_path = os.path.join(preprocessed_path, "sequences")
+
+    sequences = {
+        filename: pd.read_csv(
+            os.path.join(sequences_path, filename), index_col=0, parse_dates=True
+        )
+        for filename in sorted(os.listdir(sequences_path))
+        if filename.endswith(".csv")
+    }
+
+    stacked = pd.concat(sequences, axis=1)
+
+    timeindex = stacked.index
+    hours_per_step = (timeindex[1] - timeindex[0]) / pd.Timedelta(hours=1)
+
+    if hours_per_period % hours_per_step != 0:
+        raise ValueError(
+            f"A period of {hours_per_period} hours cannot be split into time steps of "
+            f"{hours_per_step} hours."
+        )
+
+    timesteps_per_period = int(hours_per_period / hours_per_step)
+
+    # tsam expects plain column names
+    columns = stacked.columns
+    stacked.columns = range(len(columns))
+
+    logging.info(
+        f"Clustering {len(timeindex)} time steps into {n_periods} representative periods "
+        f"of {hours_per_period} hours using {cluster_method}."
+    )
+
+    aggregation = tsam.TimeSeriesAggregation(
+        stacked,
+        resolution=hours_per_step,
+        noTypicalPeriods=n_periods,
+        hoursPerPeriod=hours_per_period,
+        clusterMethod=cluster_method,
+        solver=solver,
+    )
+
+    typical_periods = aggregation.createTypicalPeriods()
+    typical_periods.columns = columns
+
+    typical_periods.index = pd.date_range(
+        timeindex[0],
+        periods=len(typical_periods),
+        freq=pd.Timedelta(hours=hours_per_step),
+        name="timeindex",
+    )
+
+    for filename in sequences:
+        save_sequences(
+            typical_periods[filename],
+            os.path.join(sequences_path, filename),
+            sequence_store_dir=sequence_store_dir,
+        )
+
+    cluster_order = list(aggregation.clusterOrder)
+
+    # The last period may be shorter than the others
+    timesteps = [timesteps_per_period] * len(cluster_order)
+    timesteps[-1] = len(timeindex) - timesteps_per_period * (len(cluster_order) - 1)
+
+    period_mapping = pd.DataFrame(
+        {
+            "period": range(len(cluster_order)),
+            "typical_period": cluster_order,
+            "timesteps": timesteps,
+        }
+    )
+
+    # tsam pads a shorter last period and counts it as a whole one. Here, each period counts
+    # by its length, so that the weights add up to the length of the horizon in periods.
+    weights = (
+        period_mapping.groupby("typical_period")["timesteps"].sum()
+        / timesteps_per_period
+    )
+
+    period_weights = pd.DataFrame(
+        {
+            "typical_period": range(n_periods),
+            "weight": weights.reindex(range(n_periods), fill_value=0).values,
+        }
+    )
+
+    periods_path = os.path.join(preprocessed_path, PERIODS_DIR)
+
+    if not os.path.exists(periods_path):
+        os.makedirs(periods_path)
+
+    period_weights.to_csv(os.path.join(periods_path, PERIOD_WEIGHTS_FILE), index=False)
+    period_mapping.to_csv(os.path.join(periods_path, PERIOD_MAPPING_FILE), index=False)
+
+
+def load_periods(data_path):
+    r"""
+    Loads the weights and the period mapping of representative periods.
+
+    Parameters
+    ----------
+    data_path : str
+        Path to the 'data' directory of the datapackage
+
+    Returns
+    -------
+    periods : tuple or None
+        pd.Series of weights indexed by 'typical_period' and pd.DataFrame with the columns
+        'period', 'typical_period' and 'timesteps'. None if the datapackage has no
+        representative periods.
+    """
+    periods_path = os.path.join(data_path, PERIODS_DIR)
+
+    if not os.path.exists(os.path.join(periods_path, PERIOD_WEIGHTS_FILE)):
+        return None
+
+    period_weights = pd.read_csv(
+        os.path.join(periods_path, PERIOD_WEIGHTS_FILE), index_col="typical_period"
+    )["weight"]
+
+    period_mapping = pd.read_csv(os.path.join(periods_path, PERIOD_MAPPING_FILE))
+
+    return period_weights, period_mapping
+
+
+def get_objective_weighting(period_weights, timesteps_per_period, timeincrement):
+    r"""
+    Returns the objective weighting of every time step, i.e. the time increment times the
+    number of original periods the time step's representative period stands for.
+    """
+    return [
+        weight * timeincrement
+        for weight in period_weights.sort_index()
+        for _ in range(timesteps_per_period)
+    ]
+
+
+def get_storage_blocks(m):
+    r"""
+    Returns a list of tuples of the storage blocks of the model and their storages.
+    """
+    storage_blocks = []
+
+    if hasattr(m, "GenericStorageBlock"):
+        storage_blocks.append(
+            (m.GenericStorageBlock, list(m.GenericStorageBlock.STORAGES))
+        )
+
+    if hasattr(m, "GenericInvestmentStorageBlock"):
+        storage_blocks.append(
+            (
+                m.GenericInvestmentStorageBlock,
+                list(m.GenericInvestmentStorageBlock.INVESTSTORAGES),
+            )
+        )
+
+    # compact formulations of oemof_flexmex.facades.ReservoirWithPump and Bev
+    for name in ["ReservoirWithPumpBlock", "BevBlock"]:
+        if hasattr(m, name):
+            storage_block = getattr(m, name)
+            storage_blocks.append((storage_block, list(storage_block.STORAGES)))
+
+    return storage_blocks
+
+
+def add_inter_period_storage_linking(m, period_mapping, timesteps_per_period):
+    r"""
+    Links the storage levels of representative periods over the whole year.
+
+    The storage content of the storage blocks becomes the content relative to the start of the
+    representative period. An additional level variable holds the absolute content at the start
+    of each original period. It is carried from one period to the next by the change of content
+    within the representative period the original period is mapped to [1]_. The bounds of the
+    storage content are applied to the sum of both, using the extreme values of the content
+    within each representative period.
+
+    This works for all sub-classes of `GenericStorage`, i.e. also for `AsymmetricStorage`,
+    `ReservoirWithPump` and `Bev`, also in their compact formulations.
+
+    Parameters
+    ----------
+    m : oemof.solph.Model
+        Model built on the representative periods
+    period_mapping : pd.DataFrame
+        Mapping of original periods to representative periods, see load_periods()
+    timesteps_per_period : int
+        Number of time steps of each representative period
+
+    Returns
+    -------
+    block : pyomo.Block
+        Block holding the variables and constraints of the linking
+
+    References
+    ----------
+    .. [1] L. Kotzur, P. Markewitz, M. Robinius, D. Stolten: Time series aggregation for
+        energy system design: Modeling seasonal storage. Applied Energy 213 (2018).
+    """
+    block = Block()
+    m.inter_period_storage_linking = block
+
+    n_typical_periods = len(m.TIMESTEPS) // timesteps_per_period
+
+    typical_periods = range(n_typical_periods)
+    periods = list(period_mapping["period"])
+    typical_period_of = dict(
+        zip(period_mapping["period"], period_mapping["typical_period"])
+    )
+    timesteps_of = dict(zip(period_mapping["period"], period_mapping["timesteps"]))
+
+    def get_timesteps(c):
+        return range(c * timesteps_per_period, (c + 1) * timesteps_per_period)
+
+    storages = []
+    storage_capacity = {}
+    storage_content = {}
+    balance_terms = {}
+
+    for storage_block, group in get_storage_blocks(m):
+        for n in group:
+            storages.append(n)
+
+            # Content at the start of each representative period is zero
+            storage_block.balance_first[n].deactivate()
+
+            for c in typical_periods[1:]:
+                storage_block.balance[n, c * timesteps_per_period].deactivate()
+
+            if n in storage_block.balanced_cstr:
+                storage_block.balanced_cstr[n].deactivate()
+
+            # The relative content may become negative, its bounds are set below
+            for t in m.TIMESTEPS:
+                storage_block.capacity[n, t].setlb(None)
+                storage_block.capacity[n, t].setub(None)
+                storage_block.capacity[n, t].domain = Reals
+
+            if hasattr(storage_block, "invest"):
+                for t in m.TIMESTEPS:
+                    storage_block.max_capacity[n, t].deactivate()
+
+                    if n in storage_block.MIN_INVESTSTORAGES:
+                        storage_block.min_capacity[n, t].deactivate()
+
+                storage_capacity[n] = n.investment.existing + storage_block.invest[n]
+
+            else:
+                storage_capacity[n] = n.nominal_storage_capacity
+
+            storage_content[n] = storage_block.capacity
+
+            if hasattr(storage_block, "balance_term"):
+                balance_terms[n] = storage_block.balance_term
+
+    block.STORAGES = Set(initialize=storages)
+    block.TYPICAL_PERIODS = Set(initialize=list(typical_periods))
+    block.PERIODS = Set(initialize=periods)
+    block.PERIOD_BORDERS = Set(initialize=periods + [len(periods)])
+
+    block.level = Var(block.STORAGES, block.PERIOD_BORDERS, within=NonNegativeReals)
+    block.intra_max = Var(block.STORAGES, block.TYPICAL_PERIODS, bounds=(0, None))
+    block.intra_min = Var(block.STORAGES, block.TYPICAL_PERIODS, bounds=(None, 0))
+
+    def flow_balance(n, t):
+        i = [i for i in n.inputs][0]
+        o = [o for o in n.outputs][0]
+        balance_term = balance_terms[n](n, t) if n in balance_terms else 0
+        return (
+            m.flow[i, n, t] * n.inflow_conversion_factor[t]
+            - m.flow[n, o, t] / n.outflow_conversion_factor[t]
+            + balance_term
+        ) * m.timeincrement[t]
+
+    def loss_factor(n, c, timesteps):
+        return (1 - n.loss_rate[c * timesteps_per_period]) ** timesteps
+
+    def _period_start_rule(block, n, c):
+        t = c * timesteps_per_period
+        return storage_content[n][n, t] == flow_balance(n, t)
+
+    block.period_start = Constraint(
+        block.STORAGES, block.TYPICAL_PERIODS, rule=_period_start_rule
+    )
+
+    def _intra_max_rule(block, n, t):
+        c = t // timesteps_per_period
+        return block.intra_max[n, c] >= storage_content[n][n, t]
+
+    block.intra_max_cstr = Constraint(block.STORAGES, m.TIMESTEPS, rule=_intra_max_rule)
+
+    def _intra_min_rule(block, n, t):
+        c = t // timesteps_per_period
+        return block.intra_min[n, c] <= storage_content[n][n, t]
+
+    block.intra_min_cstr = Constraint(block.STORAGES, m.TIMESTEPS, rule=_intra_min_rule)
+
+    def _level_balance_rule(block, n, p):
+        c = typical_period_of[p]
+        timesteps = timesteps_of[p]
+        return block.level[n, p + 1] == (
+            block.level[n, p] * loss_factor(n, c, timesteps)
+            + storage_content[n][n, c * timesteps_per_period + timesteps - 1]
+        )
+
+    block.level_balance = Constraint(
+        block.STORAGES, block.PERIODS, rule=_level_balance_rule
+    )
+
+    def _level_max_rule(block, n, p):
+        c = typical_period_of[p]
+        max_storage_level = min(n.max_storage_level[t] for t in get_timesteps(c))
+        return (
+            block.level[n, p] + block.intra_max[n, c]
+            <= storage_capacity[n] * max_storage_level
+        )
+
+    block.level_max = Constraint(block.STORAGES, block.PERIODS, rule=_level_max_rule)
+
+    def _level_min_rule(block, n, p):
+        c = typical_period_of[p]
+        min_storage_level = max(n.min_storage_level[t] for t in get_timesteps(c))
+        return (
+            block.level[n, p] * loss_factor(n, c, timesteps_of[p])
+            + block.intra_min[n, c]
+            >= storage_capacity[n] * min_storage_level
+        )
+
+    block.level_min = Constraint(block.STORAGES, block.PERIODS, rule=_level_min_rule)
+
+    def _level_cyclic_rule(block, n):
+        if n.initial_storage_level is not None:
+            return block.level[n, 0] == storage_capacity[n] * n.initial_storage_level
+
+        if not n.balanced:
+            return Constraint.Skip
+
+        return block.level[n, len(periods)] == block.level[n, 0]
+
+    block.level_cyclic = Constraint(block.STORAGES, rule=_level_cyclic_rule)
+
+    block.storage_content = storage_content
+    block.period_mapping = period_mapping
+    block.timesteps_per_period = timesteps_per_period
+
+    return block
+
+
+def get_inter_period_storage_content(m, timeindex):
+    r"""
+    Returns the absolute storage content of all linked storages over the original periods.
+
+    Parameters
+    ----------
+    m : oemof.solph.Model
+        Solved model with inter-period storage linking
+    timeindex : pd.DatetimeIndex
+        Time index of the representative periods
+
+    Returns
+    -------
+    storage_content : pd.DataFrame
+        Storage content with one column per storage label
+    """
+    block = m.inter_period_storage_linking
+
+    timesteps_per_period = block.timesteps_per_period
+
+    storage_content = {}
+
+    for n in block.STORAGES:
+        values = []
+
+        for p, c, timesteps in block.period_mapping[
+            ["period", "typical_period", "timesteps"]
+        ].itertuples(index=False):
+            level = block.level[n, p].value
+
+            for h in range(timesteps):
+                t = c * timesteps_per_period + h
+                values.append(
+                    level * (1 - n.loss_rate[t]) ** (h + 1)
+                    + block.storage_content[n][n, t].value
+                )
+
+        storage_content[n.label] = values
+
+    storage_content = pd.DataFrame(storage_content)
+
+    storage_content.index = pd.date_range(
+        timeindex[0],
+        periods=len(storage_content),
+        freq=timeindex[1] - timeindex[0],
+        name="timeindex",
+    )
+
+    return storage_content
+
+
+def expand_periods(sequences, period_mapping, timesteps_per_period):
+    r"""
+    Expands sequences of representative periods to the original periods.
+
+    Parameters
+    ----------
+    sequences : pd.DataFrame
+        Sequences of the representative periods, put one after another
+    period_mapping : pd.DataFrame
+        Mapping of original periods to representative periods, see load_periods()
+    timesteps_per_period : int
+        Number of time steps of each representative period
+
+    Returns
+    -------
+    sequences : pd.DataFrame
+        Sequences of the original periods
+    """
+    positions = [
+        c * timesteps_per_period + h
+        for c, timesteps in period_mapping[["typical_period", "timesteps"]].itertuples(
+            index=False
+        )
+        for h in range(timesteps)
+    ]
+
+    expanded = sequences.iloc[positions]
+
+    expanded.index = pd.date_range(
+        sequences.index[0],
+        periods=len(positions),
+        freq=sequences.index[1] - sequences.index[0],
+        name=sequences.index.name,
+    )
+
+    return expanded
@@ -0,0 +1,274 @@
+import collections.abc
+
+import numpy as np
+import pandas as pd
+from pyomo.environ import Var
+
+# Names of the levels of the index of the rows, like in oemof.outputlib.views
+INDEX_NAMES = ["from", "to", "type"]
+
+
+def split_index(index):
+    r"""
+    Splits the index of a variable, e.g. (source, target, timestep), into the labels of its
+    nodes, e.g. (source, target) or (node, None), and the timestep (None for scalars).
+    """
+    if not isinstance(index, tuple):
+        index = (index,)
+
+    timestep = None
+    if isinstance(index[-1], int):
+        index, timestep = index[:-1], index[-1]
+
+    labels = tuple(str(node) for node in index)
+    if len(labels) == 1:
+        labels = (labels[0], None)
+
+    return labels, timestep
+
+
+def get_sort_key(key):
+    # oemof nodes compare by their labels and the keys (node, None) of nodes come before those
+    # of their flows
+    return key[:1] if key[1] is None else key
+
+
+def sort_keys(keys):
+    r"""
+    Sorts results keys like oemof.outputlib.processing.results() does.
+    """
+    return sorted(keys, key=get_sort_key)
+
+
+def get_row_order(rows):
+    r"""
+    Returns the positions of the rows (source, target, variable) in the order of a
+    ResultsArray: by their keys like oemof.outputlib.processing.results() and then by the
+    variable.
+    """
+    return sorted(
+        range(len(rows)), key=lambda i: (get_sort_key(rows[i][:2]), rows[i][2])
+    )
+
+
+class ResultsArray(collections.abc.Mapping):
+    r"""
+    Results of a solved model with the sequences of all flows and nodes in one 2-D array.
+
+    The array has one row per flow or node and variable, e.g. ('AT-ch4-gt',
+    'AT-electricity', 'flow') or ('AT-h2-cavern', None, 'capacity'), and one column per time
+    step. The rows are in the order of the keys of oemof.outputlib.processing.results().
+
+    The results can also be read like those of oemof.outputlib.processing.results(), but keyed
+    by labels: results[('AT-ch4-gt', 'AT-electricity')] returns a dict with the 'sequences'
+    (pd.DataFrame) and the 'scalars' (pd.Series) of the flow. They are built when they are
+    first accessed.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Sequences with one row per flow or node and variable and one column per time step
+    rows : list
+        (source, target, variable) of the rows, where target is None for nodes
+    timeindex : pd.DatetimeIndex
+        Time index of the sequences
+    scalars : pd.DataFrame
+        Scalar variables, e.g. invest, with the columns 'source', 'target', 'var_name' and
+        'var_value'
+    """
+
+    def __init__(self, values, rows, timeindex, scalars):
+        order = get_row_order(rows)
+
+        # the rows are usually sorted already, then the values are not copied
+        self.values = values if order == list(range(len(rows))) else values[order]
+        self.rows = [rows[i] for i in order]
+        self.timeindex = timeindex
+
+        self.index = pd.MultiIndex.from_arrays(
+            [list(level) for level in zip(*self.rows)] or [[], [], []],
+            names=INDEX_NAMES,
+        )
+
+        self._sources = np.array([row[0] for row in self.rows], dtype=object)
+        self._targets = np.array([row[1] for row in self.rows], dtype=object)
+        self._variables = np.array([row[2] for row in self.rows], dtype=object)
+
+        scalars = scalars.copy()
+        scalars["target"] = [
+            None if pd.isnull(target) else target for target in scalars["target"]
+        ]
+        scalars["var_value"] = scalars["var_value"].astype(float)
+        scalars_order = sorted(
+            range(len(scalars)),
+            key=lambda i: (
+                get_sort_key((scalars["source"].iat[i], scalars["target"].iat[i])),
+                scalars["var_name"].iat[i],
+            ),
+        )
+        self.scalars = scalars.iloc[scalars_order].reset_index(drop=True)
+
+        self._rows_by_key = {}
+        for i, (source, target, _) in enumerate(self.rows):
+            self._rows_by_key.setdefault((source, target), []).append(i)
+
+        self._scalars_by_key = {}
+        for i, (source, target) in enumerate(
+            zip(self.scalars["source"], self.scalars["target"])
+        ):
+            self._scalars_by_key.setdefault((source, target), []).append(i)
+
+        self._keys = sort_keys(set(self._rows_by_key) | set(self._scalars_by_key))
+        self._key_set = set(self._keys)
+
+        self._views = {}
+
+    def __getitem__(self, key):
+        if key not in self._key_set:
+            raise KeyError(key)
+
+        if key not in self._views:
+            rows = self._rows_by_key.get(key, [])
+            sequences = pd.DataFrame(
+                self.values[rows].T,
+                index=self.timeindex,
+                columns=self._variables[rows],
+            )
+
+            scalars = self.scalars.iloc[self._scalars_by_key.get(key, [])]
+            scalars = pd.Series(
+                scalars["var_value"].values, index=scalars["var_name"].values
+            )
+
+            self._views[key] = {"sequences": sequences, "scalars": scalars}
+
+        return self._views[key]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._key_set
+
+    def get_rows(self, label=None, variable=None):
+        r"""
+        Returns the positions of the rows of the flows and nodes of a node and of a variable.
+
+        Parameters
+        ----------
+        label : str
+            Label of a node. Rows of flows from or to the node and of the node itself are
+            selected. Defaults to all nodes.
+        variable : str
+            Name of a variable, e.g. 'flow'. Defaults to all variables.
+
+        Returns
+        -------
+        rows : np.ndarray
+        """
+        selected = np.ones(len(self.rows), dtype=bool)
+
+        if label is not None:
+            selected &= (self._sources == label) | (self._targets == label)
+
+        if variable is not None:
+            selected &= self._variables == variable
+
+        return np.flatnonzero(selected)
+
+    def get_variables(self):
+        r"""
+        Returns the names of the variables with sequences.
+        """
+        return sorted(set(self._variables))
+
+    def get_sequences(self, rows):
+        r"""
+        Returns the sequences of the given rows as a pd.DataFrame with the time index and
+        MultiIndex columns ('from', 'to', 'type').
+        """
+        return pd.DataFrame(
+            self.values[rows].T, index=self.timeindex, columns=self.index[rows]
+        )
+
+
+def extract_results(m):
+    r"""
+    Reads the values of all variables of a solved model into a ResultsArray.
+
+    Replaces oemof.outputlib.processing.results(), which collects all values in a DataFrame
+    indexed by the Pyomo indices and pivots it flow by flow. Here, the values of each
+    variable are read once and written into a preallocated array.
+
+    Like in oemof, values of None are left out: sequences without any value are dropped.
+
+    Parameters
+    ----------
+    m : oemof.solph.Model
+        Solved model
+
+    Returns
+    -------
+    results : ResultsArray
+    """
+    n_timesteps = len(m.es.timeindex)
+
+    labels = {}
+
+    def get_labels(nodes):
+        if nodes not in labels:
+            labels[nodes] = split_index(nodes)[0]
+
+        return labels[nodes]
+
+    values = [np.empty((0, n_timesteps))]
+    rows = []
+    scalars = []
+
+    for component in m.component_objects(Var):
+        name = component.local_name
+        indices = list(component.keys())
+
+        if not indices or indices[0] is None:
+            continue
+
+        component_values = np.array(
+            [variable.value for variable in component.values()], dtype=float
+        )
+
+        _, timestep = split_index(indices[0])
+
+        if timestep is None:
+            for index, value in zip(indices, component_values):
+                if not np.isnan(value):
+                    scalars.append((*get_labels(index), name, value))
+
+            continue
+
+        component_rows = {}
+        row_positions = [
+            component_rows.setdefault(index[:-1], len(component_rows))
+            for index in indices
+        ]
+        timesteps = [index[-1] for index in indices]
+
+        component_array = np.full((len(component_rows), n_timesteps), np.nan)
+        component_array[row_positions, timesteps] = component_values
+
+        has_values = ~np.isnan(component_array).all(axis=1)
+
+        values.append(component_array[has_values])
+        rows.extend(
+            (*get_labels(nodes), name)
+            for nodes, has_value in zip(component_rows, has_values)
+            if has_value
+        )
+
+    scalars = pd.DataFrame(
+        scalars, columns=["source", "target", "var_name", "var_value"]
+    )
+
+    return ResultsArray(np.concatenate(values), rows, m.es.timeindex, scalars)
@@ -0,0 +1,357 @@
+import importlib
+import numbers
+import os
+
+import numpy as np
+import pandas as pd
+import yaml
+from pyarrow import feather, ipc
+
+from oemof_flexmex.results_array import ResultsArray, get_row_order
+
+# Files of the results store in the optimization results
+NODES_FILE = "nodes.feather"
+SCALARS_FILE = "scalars.feather"
+META_RESULTS_FILE = "meta_results.yml"
+
+# Files of the sequences by variable name. Sequences of other variables are written to
+# '<variable>_sequences.feather'.
+SEQUENCES_FILES = {
+    "flow": "flow_sequences.feather",
+    "capacity": "storage_content.feather",
+}
+
+TIMEINDEX = "timeindex"
+
+# Separates the labels of source and target in the column names of the sequences
+KEY_SEPARATOR = "|"
+
+# Attributes of the nodes written to the node metadata
+NODE_ATTRIBUTES = ["region", "carrier", "tech", "type"]
+
+NODE_BUS_ATTRIBUTES = ["from_bus", "to_bus", "electricity_bus", "heat_bus"]
+
+NODE_CAPACITY_ATTRIBUTES = [
+    "capacity",
+    "storage_capacity",
+    "capacity_charge",
+    "capacity_discharge",
+]
+
+
+def get_sequences_file(variable):
+    return SEQUENCES_FILES.get(variable, f"{variable}_sequences.feather")
+
+
+def key_to_column(key):
+    r"""
+    Returns the column name of a results key (source, target) or (node, None).
+    """
+    labels = [label for label in key if label is not None]
+
+    if any(KEY_SEPARATOR in label for label in labels):
+        raise ValueError(
+            f"Labels of nodes must not contain '{KEY_SEPARATOR}' to be written to the "
+            f"results store: {labels}"
+        )
+
+    return KEY_SEPARATOR.join(labels)
+
+
+def column_to_key(column):
+    labels = column.split(KEY_SEPARATOR)
+
+    if len(labels) == 1:
+        return labels[0], None
+
+    return tuple(labels)
+
+
+def get_node_class_name(node):
+    return f"{type(node).__module__}.{type(node).__qualname__}"
+
+
+def get_node_class(class_name):
+    module_name, name = class_name.rsplit(".", 1)
+    return getattr(importlib.import_module(module_name), name)
+
+
+def get_label(node):
+    return None if node is None else str(node.label)
+
+
+def get_capacity(value):
+    if value is None:
+        return np.nan
+
+    if not isinstance(value, numbers.Number):
+        return np.nan
+
+    return float(value)
+
+
+def get_node_metadata(es):
+    r"""
+    Returns the metadata of the nodes of an EnergySystem in the order of es.nodes.
+
+    Subnodes of facades may be in es.nodes twice. They are only kept once.
+
+    Parameters
+    ----------
+    es : oemof.solph.EnergySystem
+
+    Returns
+    -------
+    nodes : pd.DataFrame
+        Label, class, region, carrier, tech and type of the nodes, the label of the node a
+        subnode belongs to ('parent'), the labels of the buses a node connects by name,
+        e.g. 'from_bus', and its exogenous capacities
+    """
+    es_nodes = list({id(node): node for node in es.nodes}.values())
+
+    parents = {}
+    for node in es_nodes:
+        for subnode in getattr(node, "subnodes", []):
+            parents[id(subnode)] = get_label(node)
+
+    nodes = pd.DataFrame(
+        {
+            "label": [get_label(node) for node in es_nodes],
+            "class": [get_node_class_name(node) for node in es_nodes],
+            "parent": [parents.get(id(node)) for node in es_nodes],
+        }
+    )
+
+    if nodes["label"].duplicated().any():
+        raise ValueError(
+            "Labels of nodes must be unique to be written to the results store: "
+            f"{list(nodes.loc[nodes['label'].duplicated(), 'label'])}"
+        )
+
+    for attribute in NODE_ATTRIBUTES:
+        nodes[attribute] = [getattr(node, attribute, None) for node in es_nodes]
+
+    for attribute in NODE_BUS_ATTRIBUTES:
+        nodes[attribute] = [
+            get_label(getattr(node, attribute, None)) for node in es_nodes
+        ]
+
+    for attribute in NODE_CAPACITY_ATTRIBUTES:
+        nodes[attribute] = [
+            get_capacity(getattr(node, attribute, None)) for node in es_nodes
+        ]
+
+    return nodes
+
+
+def to_builtin(value):
+    r"""
+    Converts meta results to builtin types that can be written to yaml. Enums of the solver
+    results become strings.
+    """
+    if isinstance(value, dict):
+        # items() of pyomo's result containers return the data objects, not the values
+        return {str(k): to_builtin(value[k]) for k in value}
+
+    if value is None or isinstance(value, (bool, str)):
+        return value
+
+    if isinstance(value, numbers.Integral):
+        return int(value)
+
+    if isinstance(value, numbers.Number):
+        return float(value)
+
+    return str(value)
+
+
+def write_results(es, results_optimization):
+    r"""
+    Writes the results of an EnergySystem to the results store, a set of Feather files that
+    can be read column by column:
+
+    * 'nodes.feather': node metadata, see get_node_metadata()
+    * 'flow_sequences.feather': flows of all flows (columns 'source|target')
+    * 'storage_content.feather': storage content of all storages (columns 'node')
+    * 'scalars.feather': scalar variables, e.g. invest, with the columns 'source', 'target',
+      'var_name' and 'var_value'
+    * 'meta_results.yml': meta results of the solver
+
+    Parameters
+    ----------
+    es : oemof.solph.EnergySystem
+        EnergySystem with results (oemof_flexmex.results_array.ResultsArray) and meta results
+    results_optimization : str
+        Path to the optimization results
+    """
+    get_node_metadata(es).to_feather(os.path.join(results_optimization, NODES_FILE))
+
+    results = es.results
+
+    for variable in results.get_variables():
+        rows = results.get_rows(variable=variable)
+
+        df = pd.DataFrame(
+            results.values[rows].T,
+            columns=[key_to_column(results.rows[row][:2]) for row in rows],
+        )
+        df.insert(0, TIMEINDEX, results.timeindex)
+        df.to_feather(os.path.join(results_optimization, get_sequences_file(variable)))
+
+    # an empty DataFrame has no RangeIndex, which Feather requires
+    results.scalars.reset_index(drop=True).to_feather(
+        os.path.join(results_optimization, SCALARS_FILE)
+    )
+
+    with open(os.path.join(results_optimization, META_RESULTS_FILE), "w") as f:
+        yaml.safe_dump(to_builtin(es.meta_results), f)
+
+
+def get_sequences_variables(results_optimization):
+    r"""
+    Returns the names of the variables with sequences in the results store.
+    """
+    variables = {file: variable for variable, file in SEQUENCES_FILES.items()}
+
+    suffix = "_sequences.feather"
+
+    for filename in sorted(os.listdir(results_optimization)):
+        if filename in variables:
+            yield variables[filename]
+
+        elif filename.endswith(suffix):
+            yield filename[: -len(suffix)]
+
+
+def get_sequences_keys(results_optimization, variable="flow"):
+    r"""
+    Returns the keys of the sequences of a variable without reading the data.
+    """
+    path = os.path.join(results_optimization, get_sequences_file(variable))
+
+    names = ipc.open_file(path).schema.names
+
+    return [column_to_key(name) for name in names if name != TIMEINDEX]
+
+
+def load_sequences(results_optimization, variable="flow", keys=None):
+    r"""
+    Loads the sequences of a variable from the results store. Only the columns of the given
+    keys are read.
+
+    Parameters
+    ----------
+    results_optimization : str
+        Path to the optimization results
+    variable : str
+        Name of the variable, e.g. 'flow' or 'capacity'
+    keys : list
+        Keys (source, target) of flows or (node, None) of nodes. Defaults to all.
+
+    Returns
+    -------
+    sequences : pd.DataFrame
+        Sequences with a DatetimeIndex and the keys as columns
+    """
+    columns = None
+    if keys is not None:
+        columns = [TIMEINDEX] + [key_to_column(key) for key in keys]
+
+    table = feather.read_table(
+        os.path.join(results_optimization, get_sequences_file(variable)),
+        columns=columns,
+        memory_map=True,
+    )
+
+    sequences = table.to_pandas().set_index(TIMEINDEX)
+    sequences.index = pd.DatetimeIndex(sequences.index, freq="infer")
+    sequences.columns = [column_to_key(column) for column in sequences.columns]
+
+    return sequences
+
+
+def load_scalars(results_optimization):
+    return pd.read_feather(os.path.join(results_optimization, SCALARS_FILE))
+
+
+def load_node_metadata(results_optimization, columns=None):
+    r"""
+    Loads the node metadata, see get_node_metadata(), with the labels as index.
+    """
+    if columns is not None:
+        columns = ["label"] + [column for column in columns if column != "label"]
+
+    nodes = pd.read_feather(
+        os.path.join(results_optimization, NODES_FILE), columns=columns
+    )
+
+    return nodes.set_index("label")
+
+
+def load_meta_results(results_optimization):
+    with open(os.path.join(results_optimization, META_RESULTS_FILE)) as f:
+        return yaml.safe_load(f)
+
+
+def load_results(results_optimization, keys=None):
+    r"""
+    Loads the results from the results store.
+
+    Parameters
+    ----------
+    results_optimization : str
+        Path to the optimization results
+    keys : list
+        Keys (source, target) of flows or (node, None) of nodes to load. Defaults to all.
+
+    Returns
+    -------
+    results : oemof_flexmex.results_array.ResultsArray
+        Results keyed by (source, target) and (node, None)
+    """
+    if keys is not None:
+        keys = set(keys)
+
+    variables = list(get_sequences_variables(results_optimization))
+
+    rows = []
+
+    for variable in variables:
+        rows.extend(
+            (*key, variable)
+            for key in get_sequences_keys(results_optimization, variable)
+            if keys is None or key in keys
+        )
+
+    # the sequences are written to their rows in the order of the ResultsArray, which
+    # then uses the array as it is
+    order = get_row_order(rows)
+    rows = [rows[i] for i in order]
+    positions = {row: position for position, row in enumerate(rows)}
+
+    values = None
+    timeindex = None
+
+    for variable in variables:
+        variable_keys = [row[:2] for row in rows if row[2] == variable]
+
+        df = load_sequences(results_optimization, variable, variable_keys)
+
+        if values is None:
+            values = np.empty((len(rows), len(df.index)))
+            timeindex = df.index
+
+        values[[positions[(*key, variable)] for key in df.columns]] = df.values.T
+
+    # results without sequences, e.g. of an EnergySystem without flows
+    if values is None:
+        values = np.empty((0, 0))
+        timeindex = pd.DatetimeIndex([], name=TIMEINDEX)
+
+    scalars = load_scalars(results_optimization)
+
+    if keys is not None:
+        is_selected = [key in keys for key in zip(scalars["source"], scalars["target"])]
+        scalars = scalars.loc[is_selected]
+
+    return ResultsArray(values, rows, timeindex, scalars)
@@ -0,0 +1,332 @@
+import copy
+import logging
+import numbers
+
+import numpy as np
+import pandas as pd
+from oemof.outputlib import processing
+from oemof.solph import Model
+from oemof.solph.components import GenericStorage
+from pyomo.environ import Constraint
+from pyomo.repn import generate_standard_repn
+
+from oemof_flexmex.representative_periods import get_storage_blocks
+from oemof_flexmex.results_array import ResultsArray, extract_results
+
+
+def is_time_series(value, n_timesteps):
+    r"""
+    Returns True if value is a numeric sequence with one value per time step.
+    """
+    if not isinstance(value, (list, np.ndarray, pd.Series)):
+        return False
+
+    if len(value) != n_timesteps or n_timesteps == 0:
+        return False
+
+    first = value.iloc[0] if isinstance(value, pd.Series) else value[0]
+
+    return isinstance(first, numbers.Number)
+
+
+def get_time_series_attributes(es):
+    r"""
+    Finds all time series attributes of the nodes and flows of an EnergySystem.
+
+    Parameters
+    ----------
+    es : oemof.solph.EnergySystem
+        EnergySystem
+
+    Returns
+    -------
+    time_series_attributes : list
+        List of tuples (container, key, values), where container is the attribute dictionary
+        of a node or flow or a dictionary within it, e.g. 'conversion_factors'.
+    """
+    n_timesteps = len(es.timeindex)
+
+    time_series_attributes = []
+
+    for obj in list(es.nodes) + list(es.flows().values()):
+        for key, value in vars(obj).items():
+            if is_time_series(value, n_timesteps):
+                time_series_attributes.append((vars(obj), key, value))
+
+            elif isinstance(value, dict):
+                for sub_key, sub_value in value.items():
+                    if is_time_series(sub_value, n_timesteps):
+                        time_series_attributes.append((value, sub_key, sub_value))
+
+    return time_series_attributes
+
+
+def set_window(time_series_attributes, start, end):
+    r"""
+    Cuts all time series attributes to the time steps of a window.
+    """
+    for container, key, values in time_series_attributes:
+        container[key] = list(np.asarray(values)[start:end])
+
+
+def reset_time_series(time_series_attributes):
+    r"""
+    Resets all time series attributes to their original values.
+    """
+    for container, key, values in time_series_attributes:
+        container[key] = values
+
+
+def check_dispatch_only(es):
+    r"""
+    Raises a ValueError if the EnergySystem has expandable components.
+    """
+    expandable = [
+        node.label
+        for node in es.nodes
+        if getattr(node, "expandable", False)
+        or getattr(node, "investment", None) is not None
+    ]
+
+    expandable += [
+        f"{source.label}-{target.label}"
+        for (source, target), flow in es.flows().items()
+        if flow.investment is not None
+    ]
+
+    if expandable:
+        raise ValueError(
+            "Rolling horizon optimization is possible for dispatch scenarios only. "
+            f"Found expandable components: {expandable}"
+        )
+
+
+def get_kept_objective(m, keep, with_constant=True):
+    r"""
+    Returns the part of the objective of a window that falls on its first `keep` time steps,
+    i.e. without the look-ahead.
+
+    Parameters
+    ----------
+    m : oemof.solph.Model
+        Solved model of a window
+    keep : int
+        Number of time steps kept
+    with_constant : bool
+        If False, the constant part of the objective is left out, so that it is not counted
+        again for every window.
+
+    Returns
+    -------
+    objective : float
+    """
+    repn = generate_standard_repn(m.objective.expr, compute_values=True)
+
+    objective = repn.constant if with_constant else 0
+
+    for var, coef in zip(repn.linear_vars, repn.linear_coefs):
+        index = var.index()
+
+        # variables per time step are indexed by the time step last
+        timestep = index[-1] if isinstance(index, tuple) else index
+
+        if isinstance(timestep, int) and timestep >= keep:
+            continue
+
+        objective += coef * var.value
+
+    return objective
+
+
+def combine_meta_results(meta_results_windows):
+    r"""
+    Combines the meta results of all windows. Objective and solver times are summed up, the
+    problem metrics are those of the largest window. The objective of each window has to
+    cover its kept time steps only, see get_kept_objective(), so that the time steps of the
+    look-ahead are not counted twice.
+    """
+    meta_results = copy.deepcopy(meta_results_windows[0])
+
+    meta_results["objective"] = sum(
+        meta_results_window["objective"] for meta_results_window in meta_results_windows
+    )
+
+    for key, value in meta_results["solver"].items():
+        if isinstance(value, numbers.Number) and not isinstance(value, bool):
+            meta_results["solver"][key] = sum(
+                meta_results_window["solver"][key]
+                for meta_results_window in meta_results_windows
+            )
+
+    return meta_results
+
+
+def optimize_rolling_horizon(
+    es,
+    timeincrement,
+    window,
+    look_ahead,
+    solver="cbc",
+    solve_kwargs=None,
+    solver_options=None,
+):
+    r"""
+    Optimizes a dispatch scenario in overlapping windows.
+
+    Each window covers `window` hours plus `look_ahead` hours. Only the results of the first
+    `window` hours are kept, the storage content at their end is the initial storage content
+    of the next window. Balanced storages return to their content at the start of the first
+    window, at the end of the first window (including look-ahead) and at the end of the last
+    window, like the balanced storages of a model of the whole year. The results of all
+    windows are stitched together.
+
+    Parameters
+    ----------
+    es : oemof.solph.EnergySystem
+        EnergySystem without expandable components
+    timeincrement : float
+        Length of a time step in hours
+    window : int
+        Length of the window in hours, e.g. 168 for one week
+    look_ahead : int
+        Length of the look-ahead in hours, e.g. 48 for two days
+    solver : str
+        Solver name
+    solve_kwargs : dict
+        Keyword arguments passed to the solver
+    solver_options : dict
+        Options passed to the solver, see oemof_flexmex.optimization.get_solver_options()
+
+    Returns
+    -------
+    results : oemof_flexmex.results_array.ResultsArray
+        Stitched results of all windows
+    meta_results : dict
+        Combined meta results of all windows, see combine_meta_results(). The objective is
+        that of the stitched results, without the look-ahead of the windows.
+    """
+    check_dispatch_only(es)
+
+    if solve_kwargs is None:
+        solve_kwargs = {}
+
+    if solver_options is None:
+        solver_options = {}
+
+    timeindex = es.timeindex
+    n_timesteps = len(timeindex)
+
+    window_steps = int(window / timeincrement)
+    look_ahead_steps = int(look_ahead / timeincrement)
+
+    if window_steps < 1:
+        raise ValueError(
+            f"The window of {window} hours is shorter than a time step of {timeincrement} h."
+        )
+
+    storages = [node for node in es.nodes if isinstance(node, GenericStorage)]
+    storage_attributes = {
+        storage: (storage.initial_storage_level, storage.balanced)
+        for storage in storages
+    }
+
+    time_series_attributes = get_time_series_attributes(es)
+
+    starts = list(range(0, n_timesteps, window_steps))
+
+    def _end_level_rule(model, n):
+        return storage_blocks[n].capacity[n, model.TIMESTEPS.last()] == start_levels[n]
+
+    stitched_values = []
+    results_first = None
+    meta_results_windows = []
+    start_levels = {}
+
+    try:
+        for i, start in enumerate(starts):
+            end = min(start + window_steps + look_ahead_steps, n_timesteps)
+            keep = min(window_steps, n_timesteps - start)
+
+            is_first = i == 0
+            is_last = i == len(starts) - 1
+
+            logging.info(
+                f"Optimizing window {i + 1}/{len(starts)}: {timeindex[start]} to "
+                f"{timeindex[end - 1]}"
+            )
+
+            es.timeindex = timeindex[start:end]
+            set_window(time_series_attributes, start, end)
+
+            # Balanced storages of the first window choose a start level that they can reach
+            # again at the end of the window. All later windows start at the carried level.
+            if not is_first:
+                for storage in storages:
+                    storage.balanced = False
+
+            m = Model(es, timeincrement=[timeincrement] * (end - start))
+
+            if is_last and not is_first:
+                storage_blocks = {
+                    n: storage_block
+                    for storage_block, group in get_storage_blocks(m)
+                    for n in group
+                }
+                m.rolling_horizon_end_level = Constraint(
+                    list(start_levels), rule=_end_level_rule
+                )
+
+            m.solve(
+                solver=solver, solve_kwargs=solve_kwargs, cmdline_options=solver_options
+            )
+
+            meta_results_window = processing.meta_results(m)
+            meta_results_window["objective"] = get_kept_objective(
+                m, keep, with_constant=is_first
+            )
+            meta_results_windows.append(meta_results_window)
+            results = extract_results(m)
+
+            if is_first:
+                results_first = results
+
+            elif results.rows != results_first.rows:
+                raise ValueError(
+                    f"The variables of window {i + 1} differ from those of the first window."
+                )
+
+            stitched_values.append(results.values[:, :keep])
+
+            for storage in storages:
+                storage_results = results[(str(storage.label), None)]
+
+                if is_first and storage_attributes[storage][1]:
+                    start_levels[storage] = storage_results["scalars"]["init_cap"]
+
+                level = storage_results["sequences"]["capacity"].iloc[keep - 1]
+
+                if storage.nominal_storage_capacity:
+                    storage.initial_storage_level = min(
+                        max(level / storage.nominal_storage_capacity, 0), 1
+                    )
+                else:
+                    storage.initial_storage_level = 0
+
+            del m
+
+    finally:
+        es.timeindex = timeindex
+        reset_time_series(time_series_attributes)
+
+        for storage, (initial_storage_level, balanced) in storage_attributes.items():
+            storage.initial_storage_level = initial_storage_level
+            storage.balanced = balanced
+
+    results = ResultsArray(
+        np.concatenate(stitched_values, axis=1),
+        results_first.rows,
+        timeindex,
+        results_first.scalars,
+    )
+
+    return results, combine_meta_results(meta_results_windows)
@@ -0,0 +1,283 @@
+import logging
+import os
+
+from oemof_flexmex.helpers import get_all_file_paths, link_file
+from oemof_flexmex.inferring import create_datapackage_json
+from oemof_flexmex.model_structure import create_element_set
+from oemof_flexmex.parametrization_scalars import update_scalars
+from oemof_flexmex.reading import check_if_attributes_equal
+
+# Directory of the sweep points' datapackages in the preprocessed datapackage and of their
+# results in the optimization results
+SWEEP_DIR = "sweep"
+
+# Flow attributes that set the bounds of the flow variables
+BOUND_ATTRIBUTES = ["nominal_value", "max", "min", "actual_value"]
+
+# Attributes of oemof.solph nodes that enter the constraints
+NODE_ATTRIBUTES = [
+    "conversion_factors",
+    "conversion_factor_full_condensation",
+    "nominal_storage_capacity",
+    "initial_storage_level",
+    "balanced",
+    "loss_rate",
+    "fixed_losses_relative",
+    "fixed_losses_absolute",
+    "inflow_conversion_factor",
+    "outflow_conversion_factor",
+    "min_storage_level",
+    "max_storage_level",
+    "max_inflow",
+    "drive_demand",
+]
+
+
+def overwrite_scalars(scalars, parameters):
+    r"""
+    Returns a copy of the scalars with the values of the given parameters set in all regions.
+
+    Parameters
+    ----------
+    scalars : pd.DataFrame
+        Scalars of the scenario
+    parameters : dict
+        Values by parameter name, e.g. {'Energy_Price_CO2': 150}
+    """
+    scalars = scalars.copy()
+
+    for parameter, value in parameters.items():
+        is_parameter = scalars["Parameter"] == parameter
+
+        if not is_parameter.any():
+            raise ValueError(
+                f"Parameter '{parameter}' of the sweep is not in the scalars."
+            )
+
+        scalars.loc[is_parameter, "Value"] = value
+
+    return scalars
+
+
+def create_sweep_datapackages(
+    select_components,
+    scenario_name,
+    sweep,
+    scalars,
+    preprocessed_path,
+    sequences,
+    temporal_resolution=None,
+):
+    r"""
+    Creates a datapackage for each point of a parameter sweep.
+
+    The elements of each point are parametrized with the scalars of the scenario, updated by
+    the parameter values of the point. Sequences are shared with the datapackage of the
+    scenario by links.
+
+    Parameters
+    ----------
+    select_components : dict
+        Selected components and keyword arguments of their update functions
+    scenario_name : str
+        Name of the scenario
+    sweep : dict
+        Parameter values by sweep point, e.g. {'co2-150': {'Energy_Price_CO2': 150}}
+    scalars : pd.DataFrame
+        Scalars of the scenario
+    preprocessed_path : str
+        Path to the 'data' directory of the scenario's datapackage
+    sequences : dict
+        Names of the sequences resources and their fields, see create_profiles()
+    temporal_resolution : str
+        Temporal resolution of the model
+    """
+    preprocessed_path = os.path.normpath(preprocessed_path)
+
+    for point, parameters in sweep.items():
+        logging.info(f"Creating datapackage of sweep point '{point}'")
+
+        point_path = os.path.join(preprocessed_path, SWEEP_DIR, point)
+
+        element_set = create_element_set(select_components=select_components)
+
+        update_scalars(
+            select_components,
+            element_set,
+            overwrite_scalars(scalars, parameters),
+            temporal_resolution=temporal_resolution,
+        )
+
+        element_set.to_csv(os.path.join(point_path, "data", "elements"))
+
+        for source in get_all_file_paths(preprocessed_path):
+            relative_path = os.path.relpath(source, preprocessed_path)
+
+            if relative_path.split(os.sep)[0] in ["elements", SWEEP_DIR]:
+                continue
+
+            destination = os.path.join(point_path, "data", relative_path)
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            link_file(source, destination)
+
+        create_datapackage_json(
+            select_components,
+            f"{scenario_name}-{point}",
+            point_path,
+            element_set,
+            sequences,
+        )
+
+
+def get_flows_by_label(es):
+    return {
+        (str(source.label), str(target.label)): flow
+        for (source, target), flow in es.flows().items()
+    }
+
+
+def has_variable_bounds(flow):
+    r"""
+    Returns True if the nominal value of a flow only enters the bounds of its variables.
+    """
+    return (
+        flow.investment is None
+        and not flow.nonconvex
+        and flow.summed_max is None
+        and flow.summed_min is None
+    )
+
+
+def is_equal(a, b):
+    try:
+        check_if_attributes_equal(a, b, "")
+    except AssertionError:
+        return False
+
+    return True
+
+
+def update_energysystem(es, es_point):
+    r"""
+    Transfers the objective coefficients and flow bounds of a sweep point to the
+    EnergySystem of a model.
+
+    Variable costs and investment costs of flows and investment costs of storages are
+    transferred. Nominal value, min, max and actual value are transferred for flows whose
+    nominal value only sets the bounds of their variables. All other attributes that enter
+    the model must be equal.
+
+    Parameters
+    ----------
+    es : oemof.solph.EnergySystem
+        EnergySystem of the model
+    es_point : oemof.solph.EnergySystem
+        EnergySystem of the sweep point
+
+    Returns
+    -------
+    bound_flows : list
+        Keys (source, target) of the flows of `es` with changed bounds
+    """
+    point_flows = get_flows_by_label(es_point)
+
+    if sorted(point_flows) != sorted(get_flows_by_label(es)):
+        raise ValueError("The flows of the sweep point differ from those of the model.")
+
+    bound_flows = []
+
+    for (source, target), flow in es.flows().items():
+        point_flow = point_flows[(str(source.label), str(target.label))]
+
+        flow.variable_costs = point_flow.variable_costs
+
+        if flow.investment is not None and point_flow.investment is not None:
+            flow.investment.ep_costs = point_flow.investment.ep_costs
+
+        bounds_equal = all(
+            is_equal(getattr(flow, key), getattr(point_flow, key))
+            for key in BOUND_ATTRIBUTES
+        )
+
+        if not bounds_equal and has_variable_bounds(flow):
+            for key in BOUND_ATTRIBUTES:
+                setattr(flow, key, getattr(point_flow, key))
+
+            bound_flows.append((source, target))
+
+        try:
+            check_if_attributes_equal(
+                vars(flow), vars(point_flow), f"{source.label}-{target.label}"
+            )
+        except AssertionError as e:
+            raise ValueError(
+                f"Flow attribute '{e}' changes in the sweep point, "
+                "which cannot be updated in the model."
+            )
+
+    point_nodes = {str(node.label): node for node in es_point.nodes}
+
+    for node in es.nodes:
+        point_node = point_nodes[str(node.label)]
+
+        # used by the investment storage blocks, e.g. of GenericStorage
+        if (
+            getattr(node, "investment", None) is not None
+            and getattr(point_node, "investment", None) is not None
+        ):
+            node.investment.ep_costs = point_node.investment.ep_costs
+
+        for key in NODE_ATTRIBUTES + ["investment"]:
+            if not hasattr(node, key):
+                continue
+
+            try:
+                check_if_attributes_equal(
+                    getattr(node, key), getattr(point_node, key), f"{node.label}.{key}"
+                )
+            except AssertionError as e:
+                raise ValueError(
+                    f"Node attribute '{e}' changes in the sweep point, "
+                    "which cannot be updated in the model."
+                )
+
+    return bound_flows
+
+
+def set_flow_bounds(m, bound_flows):
+    r"""
+    Sets the bounds of the flow variables of the given flows like oemof.solph.Model does.
+
+    Returns
+    -------
+    variables : list
+        Flow variables with updated bounds
+    """
+    variables = []
+
+    for (o, i) in bound_flows:
+        flow = m.flows[o, i]
+
+        for t in m.TIMESTEPS:
+            variable = m.flow[o, i, t]
+            variable.unfix()
+            variable.setlb(None)
+            variable.setub(None)
+
+            if (o, i) in m.UNIDIRECTIONAL_FLOWS:
+                variable.setlb(0)
+
+            if flow.nominal_value is not None:
+                variable.setub(flow.max[t] * flow.nominal_value)
+
+                if flow.actual_value[t] is not None:
+                    variable.value = flow.actual_value[t] * flow.nominal_value
+
+                    if flow.fixed:
+                        variable.fix()
+
+                variable.setlb(flow.min[t] * flow.nominal_value)
+
+            variables.append(variable)
+
+    return variables
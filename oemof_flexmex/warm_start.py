@@ -0,0 +1,179 @@
+import logging
+
+import numpy as np
+from pyomo.environ import Var
+from pyomo.opt import SolverFactory
+
+from oemof_flexmex.results_array import split_index
+from oemof_flexmex.results_store import load_meta_results, load_results
+
+
+def load_reference_results(results_optimization):
+    r"""
+    Loads the results of a reference scenario to warm-start a model with.
+
+    Parameters
+    ----------
+    results_optimization : str
+        Path to the optimization results of the reference scenario
+
+    Returns
+    -------
+    reference_results : dict
+        Results keyed by the labels (source, target) of flows and (node, None) of nodes
+    reference_meta_results : dict
+        Meta results of the reference scenario
+    """
+    return (
+        load_results(results_optimization),
+        load_meta_results(results_optimization),
+    )
+
+
+def set_warm_start_values(m, reference_results):
+    r"""
+    Sets the values of the variables of a model to those of the reference results.
+
+    Variables are mapped by their name, the labels of their nodes and their timestep's
+    timestamp, so that the reference may have been built from a different datapackage.
+    Fixed variables are skipped.
+
+    Parameters
+    ----------
+    m : oemof.solph.Model
+        Model to warm-start
+    reference_results : dict
+        Results of the reference scenario, see load_reference_results()
+
+    Returns
+    -------
+    variables : list
+        Variables whose values have been set
+    n_variables : int
+        Number of free variables of the model
+    """
+    timeindex = m.es.timeindex
+
+    # reference values by (labels, variable name), aligned to the model's time steps
+    reference_values = {}
+
+    def get_reference_values(labels, name, sequence):
+        key = (labels, name, sequence)
+
+        if key not in reference_values:
+            values = None
+
+            if labels in reference_results:
+                if sequence:
+                    sequences = reference_results[labels]["sequences"]
+                    if name in sequences.columns:
+                        values = sequences[name].reindex(timeindex).values
+                else:
+                    scalars = reference_results[labels]["scalars"]
+                    if name in scalars.index:
+                        values = scalars[name]
+
+            reference_values[key] = values
+
+        return reference_values[key]
+
+    variables = []
+    n_variables = 0
+
+    for component in m.component_objects(Var):
+        name = component.local_name
+
+        for index in component:
+            if index is None:
+                continue
+
+            variable = component[index]
+            if variable.fixed:
+                continue
+
+            n_variables += 1
+
+            labels, timestep = split_index(index)
+            values = get_reference_values(labels, name, timestep is not None)
+
+            if values is None:
+                continue
+
+            value = values if timestep is None else values[timestep]
+
+            if np.isnan(value):
+                continue
+
+            variable.value = float(value)
+            variables.append(variable)
+
+    return variables, n_variables
+
+
+def is_warm_start_capable(solver, persistent_solver=None):
+    r"""
+    Returns True if the solver accepts the values of the variables as a start.
+    """
+    if persistent_solver is not None:
+        return persistent_solver.warm_start_capable()
+
+    opt = SolverFactory(solver)
+
+    return opt.available(exception_flag=False) and opt.warm_start_capable()
+
+
+def set_primal_start(persistent_solver, variables):
+    r"""
+    Passes the values of the variables as a primal start for the simplex, where the
+    persistent solver interface supports it (gurobi_persistent). The warm start of the
+    solver interfaces only covers MIP starts.
+    """
+    if not hasattr(persistent_solver, "set_var_attr"):
+        return
+
+    for variable in variables:
+        persistent_solver.set_var_attr(variable, "PStart", variable.value)
+
+
+def get_solver_statistics(meta_results):
+    r"""
+    Returns the solve time and the number of iterations from the meta results of a model.
+    """
+    solver_meta_results = meta_results["solver"]
+
+    try:
+        iterations = solver_meta_results["Statistics"]["Black box"][
+            "Number of iterations"
+        ]
+    except (KeyError, TypeError):
+        iterations = None
+
+    return {
+        "solve time [s]": solver_meta_results.get("Time"),
+        "iterations": iterations,
+    }
+
+
+def log_solver_statistics_vs_reference(meta_results, reference_meta_results):
+    r"""
+    Logs the solve time and iterations of a warm-started model next to those of the reference
+    scenario it was started from.
+
+    The reference is a different model, so the differences are not the savings of the warm
+    start itself, which would need a cold solve of the same model.
+    """
+    reference_statistics = get_solver_statistics(reference_meta_results)
+
+    for key, value in get_solver_statistics(meta_results).items():
+        reference_value = reference_statistics[key]
+
+        if not isinstance(value, (int, float)) or not isinstance(
+            reference_value, (int, float)
+        ):
+            logging.info(f"Solver statistics vs. reference scenario: {key} unknown.")
+            continue
+
+        logging.info(
+            f"Solver statistics vs. reference scenario: {key} {value:.2f} "
+            f"(reference {reference_value:.2f})"
+        )
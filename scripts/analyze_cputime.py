@@ -16,27 +16,69 @@ infer_path = os.path.join(input_dir, "benchmark-infer.log")
 optimize_path = os.path.join(input_dir, "benchmark-optimize.log")
 postprocess_path = os.path.join(input_dir, "benchmark-postprocess.log")
 preprocess_path = os.path.join(input_dir, "benchmark-preprocess.log")
-solver_path = os.path.join(input_dir, "solver_time.csv")
+profile_path = os.path.join(input_dir, "optimize_profile.csv")
+
+# Phases of the optimization step, see oemof_flexmex.optimization.optimize(). The phases of
+# a parameter sweep are named after their sweep point, e.g. 'sweep_solve_<point>'.
+PHASE_GROUPS = {
+    "preprocessing": [
+        "load_datapackage",
+        "pre_reduction",
+        "build_model",
+        "write_lp",
+        "warm_start",
+        "sweep_update",
+    ],
+    "solving": ["solve", "rolling_horizon", "sweep_solve"],
+    "postprocessing": ["process_results", "write_results", "sweep_results"],
+}
+
+
+def get_phase_group(phase):
+    for group, group_phases in PHASE_GROUPS.items():
+        if any(
+            phase == group_phase or phase.startswith(group_phase + "_")
+            for group_phase in group_phases
+        ):
+            return group
+
+    return "other"
+
 
 # Read time values
 # Snakemake Benchmark results per processing step
-infer_time = pd.read_csv(infer_path, sep="\t")["cpu_time"][0]
+# Inferring is optional as preprocessing writes the datapackage.json itself
+if os.path.exists(infer_path):
+    infer_time = pd.read_csv(infer_path, sep="\t")["cpu_time"][0]
+else:
+    infer_time = 0
 optimize_time = pd.read_csv(optimize_path, sep="\t")["cpu_time"][0]
 postprocess_time = pd.read_csv(postprocess_path, sep="\t")["cpu_time"][0]
 preprocess_time = pd.read_csv(preprocess_path, sep="\t")["cpu_time"][0]
 
-# CBC meta results output from postprocessing
-# Use 'System time' for CPU time because it equals 'Total time (CPU seconds)' in CBC's stdout
-solver_time = pd.read_csv(solver_path, index_col=False)["system_time"][0]
+# CPU time of each phase of the optimization step, including the solver process
+optimize_profile = pd.read_csv(profile_path)
+
+optimize_phases = optimize_profile.groupby(
+    optimize_profile["phase"].map(get_phase_group)
+)["cpu_time"].sum()
+
+
+def sum_phases(group):
+    return float(optimize_phases.get(group, 0))
+
 
 # Calculate time values
-optimize_extra_time = (
-    optimize_time - solver_time
-)  # Energy model building AND dumping results
-# Assign extra time from optimization step to preprocessing time in lack of precision
-preprocessing = preprocess_time + infer_time + optimize_extra_time
-solving = solver_time
-postprocessing = postprocess_time
+preprocessing = preprocess_time + infer_time + sum_phases("preprocessing")
+solving = sum_phases("solving")
+postprocessing = postprocess_time + sum_phases("postprocessing")
+# Time of the optimization step outside of the grouped phases, e.g. start-up and imports
+other = (
+    optimize_time
+    - sum_phases("preprocessing")
+    - sum_phases("solving")
+    - sum_phases("postprocessing")
+)
 
 # Set up output DataFrame
 df = pd.DataFrame(
@@ -45,6 +87,7 @@ df = pd.DataFrame(
         "preprocessing": [preprocessing],
         "solving": [solving],
         "postprocessing": [postprocessing],
+        "other": [other],
     }
 )
 
@@ -0,0 +1,54 @@
+r"""
+Benchmark comparing EnergySystem.from_datapackage with the DataFrame-based
+load_energysystem.
+
+Usage:
+    python scripts/benchmark_loading.py <path to 01_preprocessed> [<repetitions>]
+
+Both EnergySystems are checked to be equal before the times are printed.
+"""
+import os
+import sys
+import timeit
+
+import pandas as pd
+from oemof.solph import EnergySystem
+
+# DONT REMOVE THIS LINE!
+# pylint: disable=unused-import
+from oemof.tabular import datapackage  # noqa
+from oemof_flexmex.facades import TYPEMAP
+from oemof_flexmex.reading import check_if_energysystems_equal, load_energysystem
+
+
+if __name__ == "__main__":
+    datapackage_path = os.path.join(sys.argv[1], "datapackage.json")
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    def from_datapackage():
+        return EnergySystem.from_datapackage(
+            datapackage_path, attributemap={}, typemap=TYPEMAP
+        )
+
+    def from_dataframes():
+        return load_energysystem(datapackage_path, typemap=TYPEMAP)
+
+    es = from_dataframes()
+    check_if_energysystems_equal(from_datapackage(), es)
+
+    time_datapackage = timeit.timeit(from_datapackage, number=repetitions)
+    time_dataframes = timeit.timeit(from_dataframes, number=repetitions)
+
+    df = pd.DataFrame(
+        {
+            "method": ["EnergySystem.from_datapackage", "load_energysystem"],
+            "time_per_repetition": [
+                time_datapackage / repetitions,
+                time_dataframes / repetitions,
+            ],
+        }
+    )
+
+    print(f"{len(es.nodes)} nodes, {repetitions} repetitions")
+    print(df.to_string(index=False))
+    print(f"Speed-up: {time_datapackage / time_dataframes:.1f}x")
@@ -0,0 +1,62 @@
+r"""
+Micro-benchmark comparing parameter lookups on a plain Scalars DataFrame with lookups
+on a ScalarsIndex.
+
+Usage:
+    python scripts/benchmark_scalars_index.py <path to Scalars.csv> [<repetitions>]
+
+Each repetition looks up every parameter found in the file once, which resembles the access
+pattern of the update functions in preprocessing and the cost functions in postprocessing.
+"""
+import sys
+import timeit
+
+import pandas as pd
+
+from oemof_flexmex.helpers import read_csv_file
+from oemof_flexmex.parametrization_scalars import ScalarsIndex, get_parameter_values
+
+
+def lookup_all(scalars, parameter_names):
+    for parameter_name in parameter_names:
+        get_parameter_values(scalars, parameter_name)
+
+
+if __name__ == "__main__":
+    scalars_path = sys.argv[1]
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    scalars = read_csv_file(scalars_path)
+    parameter_names = scalars["Parameter"].dropna().unique()
+
+    time_dataframe = timeit.timeit(
+        lambda: lookup_all(scalars, parameter_names), number=repetitions
+    )
+
+    time_build_index = timeit.timeit(lambda: ScalarsIndex(scalars), number=repetitions)
+
+    scalars_index = ScalarsIndex(scalars)
+    time_index = timeit.timeit(
+        lambda: lookup_all(scalars_index, parameter_names), number=repetitions
+    )
+
+    df = pd.DataFrame(
+        {
+            "method": ["DataFrame", "ScalarsIndex (build)", "ScalarsIndex (lookup)"],
+            "time_per_repetition": [
+                time_dataframe / repetitions,
+                time_build_index / repetitions,
+                time_index / repetitions,
+            ],
+        }
+    )
+
+    print(
+        f"{len(scalars)} rows, {len(parameter_names)} parameters, "
+        f"{repetitions} repetitions"
+    )
+    print(df.to_string(index=False))
+    print(
+        "Speed-up incl. building the index: "
+        f"{time_dataframe / (time_build_index + time_index):.1f}x"
+    )
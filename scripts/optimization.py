@@ -2,7 +2,11 @@ import os
 import sys
 
 from oemof_flexmex.helpers import load_yaml, setup_logging
-from oemof_flexmex.optimization import optimize
+from oemof_flexmex.optimization import (
+    get_solver_options,
+    get_solver_settings,
+    optimize,
+)
 
 if __name__ == "__main__":
     scenario_specs = load_yaml(sys.argv[1])
@@ -15,4 +19,16 @@ if __name__ == "__main__":
     if not os.path.exists(results_optimization):
         os.makedirs(results_optimization)
 
-    optimize(data_preprocessed, results_optimization)
+    solver_settings = get_solver_settings(scenario_specs.get("solver"))
+
+    optimize(
+        data_preprocessed,
+        results_optimization,
+        solver=solver_settings["name"],
+        solver_options=get_solver_options(solver_settings),
+        rolling_horizon=scenario_specs.get("rolling_horizon"),
+        logging_path=logging_path,
+        sweep=list(scenario_specs.get("sweep") or {}),
+        warm_start=scenario_specs.get("warm_start"),
+        pre_reduction=scenario_specs.get("pre_reduction", True),
+    )
@@ -19,12 +19,15 @@ if __name__ == "__main__":
     paths.results_postprocessed = sys.argv[6]
     paths.logging_path = sys.argv[7]
 
+    # directory with the parsed input data cached by preprocessing, no caching if not given
+    cache_dir = sys.argv[8] if len(sys.argv) > 8 else None
+
     setup_logging(paths.logging_path)
 
     if not os.path.exists(paths.results_postprocessed):
         os.makedirs(paths.results_postprocessed)
 
-    run_postprocessing(scenario_specs, paths)
+    run_postprocessing(scenario_specs, paths, cache_dir=cache_dir)
 
     # compare with previous data
     previous_path = paths.results_postprocessed.replace("results", "defaults")
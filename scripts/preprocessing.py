@@ -2,9 +2,12 @@ import os
 import logging
 import sys
 
-from oemof_flexmex.model_structure import create_default_elements
+from oemof_flexmex.inferring import create_datapackage_json
+from oemof_flexmex.model_structure import create_element_set
 from oemof_flexmex.parametrization_scalars import update_scalars
 from oemof_flexmex.parametrization_sequences import create_profiles
+from oemof_flexmex.representative_periods import cluster_sequences
+from oemof_flexmex.sweep import create_sweep_datapackages
 from oemof_flexmex.helpers import (
     check_if_csv_dirs_equal,
     load_yaml,
@@ -18,6 +21,16 @@ if __name__ == "__main__":
     data_raw_path = sys.argv[2]
     preprocessed_output_path = sys.argv[3]
     logging_path = sys.argv[4]
+    # directory to cache the parsed input data in, no caching if not given
+    cache_dir = sys.argv[5] if len(sys.argv) > 5 else None
+
+    # the profile and sequence stores lie in the cache directory. Sequences from the store are
+    # linked into the datapackage as read-only files.
+    if cache_dir is None:
+        profile_store_dir = sequence_store_dir = None
+    else:
+        profile_store_dir = os.path.join(cache_dir, "profiles")
+        sequence_store_dir = os.path.join(cache_dir, "sequences")
 
     setup_logging(logging_path)
 
@@ -25,24 +38,65 @@ if __name__ == "__main__":
         for subdir in ["elements", "sequences"]:
             os.makedirs(os.path.join(preprocessed_output_path, subdir))
 
-    scalars = load_scalar_input_data(scenario_specs, data_raw_path)
+    scalars = load_scalar_input_data(scenario_specs, data_raw_path, cache_dir=cache_dir)
 
-    # Prepare oemof.tabular input CSV files
-    create_default_elements(
-        os.path.join(preprocessed_output_path, "elements"),
-        select_components=scenario_specs["components"],
-    )
+    temporal_resolution = scenario_specs.get("temporal_resolution")
+
+    # Prepare oemof.tabular elements in memory
+    element_set = create_element_set(select_components=scenario_specs["components"])
 
     # update elements
-    update_scalars(scenario_specs["components"], preprocessed_output_path, scalars)
+    update_scalars(
+        scenario_specs["components"],
+        element_set,
+        scalars,
+        temporal_resolution=temporal_resolution,
+    )
+
+    # write elements once
+    element_set.to_csv(os.path.join(preprocessed_output_path, "elements"))
 
     # create sequences
-    create_profiles(
+    sequences = create_profiles(
         data_raw_path,
         preprocessed_output_path,
         select_components=scenario_specs["components"],
+        store_dir=profile_store_dir,
+        sequence_store_dir=sequence_store_dir,
+        temporal_resolution=temporal_resolution,
     )
 
+    # cluster sequences into representative periods
+    representative_periods = scenario_specs.get("representative_periods")
+    if representative_periods:
+        cluster_sequences(
+            preprocessed_output_path,
+            sequence_store_dir=sequence_store_dir,
+            **representative_periods,
+        )
+
+    # write datapackage.json from the model structure instead of inferring it
+    create_datapackage_json(
+        select_components=scenario_specs["components"],
+        package_name=scenario_specs["scenario"],
+        path=os.path.dirname(os.path.normpath(preprocessed_output_path)),
+        element_set=element_set,
+        sequences=sequences,
+    )
+
+    # create a datapackage for each point of a parameter sweep
+    sweep = scenario_specs.get("sweep")
+    if sweep:
+        create_sweep_datapackages(
+            scenario_specs["components"],
+            scenario_specs["scenario"],
+            sweep,
+            scalars,
+            preprocessed_output_path,
+            sequences,
+            temporal_resolution=temporal_resolution,
+        )
+
     # compare with previous data
     previous_path = preprocessed_output_path.replace("results", "defaults")
     new_path = preprocessed_output_path
@@ -18,6 +18,8 @@ setup(
     packages=["oemof_flexmex"],
     install_requires=[
         "pandas",
+        "pyarrow",
+        "tsam",
         "oemof==0.3.2",
         "oemof.tabular==0.0.2",
         "pyyaml",
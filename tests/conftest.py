@@ -0,0 +1,123 @@
+import pandas as pd
+import pytest
+from oemof.outputlib import processing
+from oemof.solph import Bus, EnergySystem, Flow, Investment, Model, Sink, Source
+from oemof.solph.components import GenericStorage
+
+from oemof_flexmex.results_array import extract_results
+
+
+def create_energysystem(
+    demand=(6, 8, 12, 14),
+    cheap_cost=1,
+    cheap_capacity=10,
+    expensive_cost=5,
+    storage="fixed",
+    loss_rate=0,
+):
+    r"""
+    Returns an EnergySystem with one bus, a cheap source of limited capacity, an expensive
+    source, a fixed demand and a storage, with hourly time steps from 2019-01-01.
+
+    Parameters
+    ----------
+    demand : sequence
+        Demand per time step, which sets the number of time steps
+    cheap_cost : float or sequence
+        Variable costs of the cheap source
+    cheap_capacity : float
+        Capacity of the cheap source
+    expensive_cost : float
+        Variable costs of the expensive source
+    storage : str or None
+        'fixed' for a storage with fixed capacities, 'investment' for a storage with investment
+        in all its capacities or None for no storage
+    loss_rate : float
+        Loss rate of the storage
+
+    Returns
+    -------
+    es : oemof.solph.EnergySystem
+    """
+    es = EnergySystem(
+        timeindex=pd.date_range("2019-01-01", periods=len(demand), freq="H")
+    )
+
+    bus = Bus(label="bus")
+    cheap = Source(
+        label="cheap",
+        outputs={bus: Flow(nominal_value=cheap_capacity, variable_costs=cheap_cost)},
+    )
+    expensive = Source(
+        label="expensive", outputs={bus: Flow(variable_costs=expensive_cost)}
+    )
+    sink = Sink(
+        label="sink",
+        inputs={bus: Flow(nominal_value=1, actual_value=list(demand), fixed=True)},
+    )
+
+    es.add(bus, cheap, expensive, sink)
+
+    if storage == "fixed":
+        es.add(
+            GenericStorage(
+                label="storage",
+                inputs={bus: Flow(nominal_value=5)},
+                outputs={bus: Flow(nominal_value=5)},
+                nominal_storage_capacity=20,
+                loss_rate=loss_rate,
+            )
+        )
+
+    elif storage == "investment":
+        es.add(
+            GenericStorage(
+                label="storage",
+                inputs={bus: Flow(investment=Investment(ep_costs=1))},
+                outputs={bus: Flow(investment=Investment(ep_costs=1))},
+                investment=Investment(ep_costs=1),
+                invest_relation_input_capacity=0.25,
+                invest_relation_output_capacity=0.25,
+                loss_rate=loss_rate,
+            )
+        )
+
+    elif storage is not None:
+        raise ValueError(f"Unknown storage '{storage}'.")
+
+    return es
+
+
+def solve(es):
+    r"""
+    Builds and solves the model of an EnergySystem with cbc and sets its meta results and
+    results, like optimization does.
+
+    Returns
+    -------
+    m : oemof.solph.Model
+    """
+    m = Model(es)
+    m.solve(solver="cbc")
+
+    # meta_results() reads es.results, so it comes first
+    es.meta_results = processing.meta_results(m)
+    es.results = extract_results(m)
+
+    return m
+
+
+@pytest.fixture(name="create_energysystem")
+def create_energysystem_fixture():
+    r"""
+    Factory of the small EnergySystem most tests solve, see create_energysystem().
+    """
+    return create_energysystem
+
+
+@pytest.fixture(name="solve")
+def solve_fixture():
+    r"""
+    Solver of the EnergySystems of the tests, see solve().
+    """
+    return solve
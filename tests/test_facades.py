@@ -1,10 +1,16 @@
 import os
+import tempfile
+
 import pandas as pd
+import pytest
 
 from oemof.solph import Sink, Source, Bus, Flow, Model, EnergySystem
 from oemof.outputlib import views
 
 from oemof_flexmex.facades import AsymmetricStorage, ReservoirWithPump, Bev
+from oemof_flexmex.postprocessing import get_sequences_by_tech
+from oemof_flexmex.results_array import extract_results
+from oemof_flexmex.results_store import get_node_metadata
 
 solver = "cbc"
 
@@ -190,7 +196,7 @@ def check_asymmetric_storage_optimize_investment():
     )
 
 
-def test_reservoir():
+def test_reservoir(tmp_path):
     timeindex = pd.date_range("2020-01-01", periods=3, freq="H")
 
     es = EnergySystem(timeindex=timeindex)
@@ -234,9 +240,7 @@ def test_reservoir():
 
     m = Model(es)
 
-    lp_file_path = os.path.join(
-        os.path.abspath(os.path.dirname(__file__)), "lp-file.lp"
-    )
+    lp_file_path = os.path.join(str(tmp_path), "lp-file.lp")
     m.write(lp_file_path, io_options={"symbolic_solver_labels": True})
 
     m.solve()
@@ -249,7 +253,122 @@ def test_reservoir():
     print(sequences)
 
 
-def test_bev():
+def create_electricity_energysystem(wind_capacity, wind_profile, demand_profile):
+    r"""
+    Returns an EnergySystem with an electricity bus, a wind park, a demand, shortage and
+    excess, to which the tests add the component to check. The timeindex has the length of
+    the profiles.
+    """
+    timeindex = pd.date_range("2020-01-01", periods=len(wind_profile), freq="H")
+
+    es = EnergySystem(timeindex=timeindex)
+
+    el_bus = Bus(label="el-bus")
+
+    windpark = Source(
+        label="el-windpark",
+        outputs={
+            el_bus: Flow(
+                fixed=True, nominal_value=wind_capacity, actual_value=wind_profile
+            )
+        },
+    )
+
+    el_demand = Sink(
+        label="el-demand",
+        inputs={
+            el_bus: Flow(fixed=True, nominal_value=100, actual_value=demand_profile)
+        },
+    )
+
+    el_shortage = Source(
+        label="el-shortage", outputs={el_bus: Flow(variable_costs=100)}
+    )
+
+    el_excess = Sink(label="el-excess", inputs={el_bus: Flow(variable_costs=0.0001)})
+
+    for node, tech in [
+        (windpark, "windpark"),
+        (el_demand, "demand"),
+        (el_shortage, "shortage"),
+        (el_excess, "excess"),
+    ]:
+        node.carrier = "electricity"
+        node.tech = tech
+
+    es.add(el_bus, windpark, el_demand, el_shortage, el_excess)
+
+    return es, el_bus
+
+
+def create_reservoir_energysystem(formulation):
+    es, el_bus = create_electricity_energysystem(
+        100, [0.9, 0.1, 0.2, 0.8], [0.2, 0.6, 0.5, 0.3]
+    )
+
+    reservoir = ReservoirWithPump(
+        label="el-reservoir",
+        bus=el_bus,
+        carrier="hydro",
+        tech="reservoir",
+        storage_capacity=60,
+        capacity_pump=20,
+        capacity_turbine=30,
+        profile=[0.5, 0.2, 0.1, 0.6],
+        loss_rate=0.01,
+        initial_storage_level=0.5,
+        efficiency_pump=0.9,
+        efficiency_turbine=0.9,
+        marginal_cost=1,
+        formulation=formulation,
+    )
+
+    es.add(reservoir)
+
+    return es
+
+
+def test_reservoir_compact():
+    r"""
+    The compact formulation of the ReservoirWithPump gives the same objective and the same
+    sequences of pump, inflow and turbine in postprocessing as the one with an internal bus.
+    """
+    sequences = {}
+    objective = {}
+
+    for formulation in ["internal_bus", "compact"]:
+        es = create_reservoir_energysystem(formulation)
+
+        m = Model(es)
+        m.solve(solver=solver)
+
+        objective[formulation] = m.objective()
+
+        sequences_by_tech = get_sequences_by_tech(
+            extract_results(m), get_node_metadata(es).set_index("label")
+        )
+        sequences[formulation] = sequences_by_tech.loc[:, ("el", "hydro-reservoir")]
+
+    assert objective["compact"] == pytest.approx(objective["internal_bus"])
+
+    assert sorted(sequences["compact"].columns) == [
+        "flow_in",
+        "flow_inflow",
+        "flow_out",
+        "storage_content",
+    ]
+    pd.testing.assert_frame_equal(
+        sequences["compact"],
+        sequences["internal_bus"].loc[:, sequences["compact"].columns],
+    )
+
+
+def test_reservoir_formulation():
+    with pytest.raises(ValueError, match="Formulation"):
+        create_reservoir_energysystem("lp")
+
+
+def test_bev(tmp_path):
     timeindex = pd.date_range("2020-01-01", periods=3, freq="H")
 
     es = EnergySystem(timeindex=timeindex)
@@ -294,9 +413,7 @@ def test_bev():
 
     m = Model(es)
 
-    lp_file_path = os.path.join(
-        os.path.abspath(os.path.dirname(__file__)), "lp-file.lp"
-    )
+    lp_file_path = os.path.join(str(tmp_path), "lp-file.lp")
     m.write(lp_file_path, io_options={"symbolic_solver_labels": True})
 
     m.solve()
@@ -309,8 +426,78 @@ def test_bev():
     print(sequences)
 
 
+def create_bev_energysystem(formulation):
+    es, el_bus = create_electricity_energysystem(150, [0.7, 0.2, 0.9], [0.1, 0.6, 0.1])
+
+    bev = Bev(
+        label="el-bev",
+        bus=el_bus,
+        carrier="electricity",
+        tech="bev",
+        storage_capacity=1000,
+        capacity=50,
+        availability=[0.8, 0.7, 0.6],
+        drive_power=[0.01, 0.02, 0.022],
+        amount=100,
+        loss_rate=0.01,
+        initial_storage_level=0.3,
+        min_storage_level=[0.1, 0.2, 0.15],
+        max_storage_level=[0.9, 0.95, 0.92],
+        efficiency_charging=0.95,
+        efficiency_discharging=0.9,
+        efficiency_v2g=0.8,
+        marginal_cost=1,
+        formulation=formulation,
+    )
+
+    es.add(bev)
+
+    return es
+
+
+def test_bev_compact():
+    r"""
+    The compact formulation of the Bev gives the same objective and the same sequences of
+    charging and vehicle-to-grid in postprocessing as the one with an internal bus, with
+    fewer variables.
+    """
+    sequences = {}
+    objective = {}
+    n_variables = {}
+
+    for formulation in ["internal_bus", "compact"]:
+        es = create_bev_energysystem(formulation)
+
+        m = Model(es)
+        m.solve(solver=solver)
+
+        objective[formulation] = m.objective()
+        n_variables[formulation] = m.nvariables()
+
+        sequences_by_tech = get_sequences_by_tech(
+            extract_results(m), get_node_metadata(es).set_index("label")
+        )
+        sequences[formulation] = sequences_by_tech.loc[:, ("el", "electricity-bev")]
+
+    assert objective["compact"] == pytest.approx(objective["internal_bus"])
+    assert n_variables["compact"] < n_variables["internal_bus"]
+
+    assert sorted(sequences["compact"].columns) == [
+        "flow_in",
+        "flow_out",
+        "storage_content",
+    ]
+    assert sequences["compact"]["flow_out"].sum() > 0
+    pd.testing.assert_frame_equal(
+        sequences["compact"],
+        sequences["internal_bus"].loc[:, sequences["compact"].columns],
+    )
+
+
 if __name__ == "__main__":
-    test_reservoir()
-    test_bev()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        test_reservoir(tmp_dir)
+        test_bev(tmp_dir)
+    test_bev_compact()
     check_asymmetric_storage_optimize_dispatch()
     check_asymmetric_storage_optimize_investment()
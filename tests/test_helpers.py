@@ -1,7 +1,19 @@
 import os
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
 import pytest
+import yaml
 
-from oemof_flexmex.helpers import check_if_csv_dirs_equal
+from oemof_flexmex.helpers import (
+    PhaseProfile,
+    check_if_csv_dirs_equal,
+    filter_scalar_input_data,
+    filter_scalar_input_data_batch,
+    load_scalar_input_data,
+    load_scalar_input_data_batch,
+    read_scalar_input_data,
+)
 
 basepath = os.path.abspath(os.path.dirname(__file__))
 
@@ -37,3 +49,200 @@ def test_check_dirs_with_different_file_contents():
 
     with pytest.raises(AssertionError):
         check_if_csv_dirs_equal(dir_a, dir_b)
+
+
+def test_read_scalar_input_data_cache(tmp_path):
+    r"""
+    Reads scalars data twice. The second time it comes from the cache.
+    """
+    data_dir = tmp_path / "In"
+    cache_dir = tmp_path / "cache"
+    data_dir.mkdir()
+
+    scalars = pd.DataFrame(
+        {
+            "Scenario": ["FlexMex1", "ALL"],
+            "Region": ["AT", "ALL"],
+            "Year": [2050, "ALL"],
+            "Parameter": ["Energy_FinalEnergy_Electricity", "Energy_Price_CO2"],
+            "Unit": ["GWh", "Eur/t"],
+            "Value": [60.0, 100.0],
+        }
+    )
+    scalars.to_csv(data_dir / "FlexMex1_Scalars.csv", index=False)
+
+    parsed = read_scalar_input_data(str(data_dir), "FlexMex1", cache_dir=str(cache_dir))
+
+    assert len(os.listdir(cache_dir)) == 1
+
+    cached = read_scalar_input_data(str(data_dir), "FlexMex1", cache_dir=str(cache_dir))
+
+    assert_frame_equal(parsed, cached)
+    assert pd.api.types.is_categorical_dtype(cached["Parameter"])
+
+    uncached = read_scalar_input_data(str(data_dir), "FlexMex1")
+
+    assert_frame_equal(
+        cached.astype({"Scenario": object, "Region": object}).loc[
+            :, ["Scenario", "Region"]
+        ],
+        uncached.reset_index(drop=True).loc[:, ["Scenario", "Region"]],
+    )
+
+    # another input directory gets a cache file of its own and keeps the first one
+    other_dir = tmp_path / "Other"
+    other_dir.mkdir()
+    scalars.iloc[:1].to_csv(other_dir / "FlexMex1_Scalars.csv", index=False)
+
+    other = read_scalar_input_data(str(other_dir), "FlexMex1", cache_dir=str(cache_dir))
+
+    assert len(other) == 1
+    assert len(os.listdir(cache_dir)) == 2
+
+    cached = read_scalar_input_data(str(data_dir), "FlexMex1", cache_dir=str(cache_dir))
+
+    assert_frame_equal(parsed, cached)
+
+
+def test_filter_scalar_input_data_batch():
+    r"""
+    Filters scalars for two scenarios at once and compares with filtering them one by one.
+    Duplicates left after filtering raise an error.
+    """
+    scalars = pd.DataFrame(
+        {
+            "Scenario": ["FlexMex1", "FlexMex1", "ALL", "FlexMex1UC2", "FlexMex2"],
+            "Region": ["AT", "DE", "ALL", "DE", "AT"],
+            "Year": [2050, 2050, "ALL", 2050, 2050],
+            "Parameter": ["Energy_FinalEnergy_Electricity"] * 2
+            + ["Energy_Price_CO2"]
+            + ["Energy_FinalEnergy_Electricity"] * 2,
+            "Unit": ["GWh", "GWh", "Eur/t", "GWh", "GWh"],
+            "Value": [60.0, 500.0, 100.0, 400.0, 70.0],
+        }
+    )
+
+    scenario_specs_list = [
+        {
+            "scenario": "FlexMex1_1",
+            "scenario_select": ["FlexMex1", "ALL"],
+            "scenario_overwrite": None,
+        },
+        {
+            "scenario": "FlexMex1_2",
+            "scenario_select": ["FlexMex1", "ALL"],
+            "scenario_overwrite": "FlexMex1UC2",
+        },
+    ]
+
+    filtered = filter_scalar_input_data_batch(scalars, scenario_specs_list)
+
+    for scenario_specs in scenario_specs_list:
+        assert_frame_equal(
+            filtered[scenario_specs["scenario"]],
+            filter_scalar_input_data(
+                scalars,
+                scenario_specs["scenario_select"],
+                scenario_specs["scenario_overwrite"],
+            ),
+        )
+
+    assert filtered["FlexMex1_2"].loc[1, "Value"] == 400.0
+
+    scalars.loc[4, "Scenario"] = "FlexMex1"
+
+    with pytest.raises(ValueError, match=r"\['FlexMex1_1', 'FlexMex1_2'\]"):
+        filter_scalar_input_data_batch(scalars, scenario_specs_list)
+
+
+def test_load_scalar_input_data_batch(tmp_path):
+    r"""
+    Loads the scalars of scenarios of two experiments at once and compares with loading them
+    one by one. Duplicates left after filtering raise an error that names the scenario.
+    """
+    data_dir = tmp_path / "In"
+    data_dir.mkdir()
+
+    for experiment, value in [("FlexMex1", 60.0), ("FlexMex2", 70.0)]:
+        pd.DataFrame(
+            {
+                "Scenario": [experiment, experiment, "ALL", experiment + "UC2"],
+                "Region": ["AT", "DE", "ALL", "DE"],
+                "Year": [2050, 2050, "ALL", 2050],
+                "Parameter": ["Energy_FinalEnergy_Electricity"] * 2
+                + ["Energy_Price_CO2"]
+                + ["Energy_FinalEnergy_Electricity"],
+                "Unit": ["GWh", "GWh", "Eur/t", "GWh"],
+                "Value": [value, 500.0, 100.0, 400.0],
+            }
+        ).to_csv(data_dir / (experiment + "_Scalars.csv"), index=False)
+
+    scenario_specs_list = [
+        {
+            "scenario": "FlexMex1_1",
+            "scenario_select": ["FlexMex1", "ALL"],
+            "scenario_overwrite": None,
+        },
+        {
+            "scenario": "FlexMex1_2",
+            "scenario_select": ["FlexMex1", "ALL"],
+            "scenario_overwrite": "FlexMex1UC2",
+        },
+        {
+            "scenario": "FlexMex2_1",
+            "scenario_select": ["FlexMex2", "ALL"],
+            "scenario_overwrite": None,
+        },
+    ]
+
+    scenario_yml_paths = []
+    for scenario_specs in scenario_specs_list:
+        path = str(tmp_path / (scenario_specs["scenario"] + ".yml"))
+        with open(path, "w") as f:
+            yaml.dump(scenario_specs, f)
+
+        scenario_yml_paths.append(path)
+
+    scalars = load_scalar_input_data_batch(scenario_yml_paths, str(data_dir))
+
+    assert list(scalars) == ["FlexMex1_1", "FlexMex1_2", "FlexMex2_1"]
+
+    for scenario_specs in scenario_specs_list:
+        assert_frame_equal(
+            scalars[scenario_specs["scenario"]],
+            load_scalar_input_data(scenario_specs, str(data_dir)),
+        )
+
+    assert scalars["FlexMex1_2"].loc[1, "Value"] == 400.0
+    assert scalars["FlexMex2_1"].loc[0, "Value"] == 70.0
+
+    # the overwriting scenario selects the same parameter twice
+    scenario_specs_list[1]["scenario_select"].append("FlexMex1UC2")
+    with open(scenario_yml_paths[1], "w") as f:
+        yaml.dump(scenario_specs_list[1], f)
+
+    with pytest.raises(ValueError, match=r"\['FlexMex1_2'\]"):
+        load_scalar_input_data_batch(scenario_yml_paths, str(data_dir))
+
+
+def test_phase_profile(tmp_path):
+    r"""
+    Each phase is recorded with its wall time, CPU time and the peak RSS so far, also if it
+    fails.
+    """
+    profile = PhaseProfile()
+
+    with profile.phase("sum"):
+        sum(range(10**6))
+
+    with pytest.raises(ValueError):
+        with profile.phase("fail"):
+            raise ValueError
+
+    profile.to_csv(str(tmp_path / "profile.csv"))
+    df = pd.read_csv(str(tmp_path / "profile.csv"))
+
+    assert list(df["phase"]) == ["sum", "fail"]
+    assert (df[["wall_time", "cpu_time"]] >= 0).all().all()
+    assert (df["peak_rss_cumulative"] > 0).all()
+    assert df["peak_rss_cumulative"].is_monotonic_increasing
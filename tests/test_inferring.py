@@ -0,0 +1,75 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from oemof_flexmex.inferring import create_datapackage_json, infer
+from oemof_flexmex.model_structure import create_element_set
+
+
+def load_schemas(path):
+    with open(path) as f:
+        datapackage = json.load(f)
+
+    return {
+        resource["name"]: (resource["path"], resource["schema"])
+        for resource in datapackage["resources"]
+    }
+
+
+def test_create_datapackage_json(tmp_path):
+    r"""
+    The datapackage.json written from the model structure has the same resources, fields,
+    primary keys and foreign keys as the one inferred from the data.
+    """
+    select_components = [
+        "electricity-demand",
+        "ch4-gt",
+        "ch4-bpchp",
+        "electricity-liion_battery",
+        "electricity-bev",
+    ]
+
+    element_set = create_element_set(select_components=select_components)
+    element_set["ch4-gt"]["capacity"] = 1.0
+    element_set.to_csv(str(tmp_path / "data" / "elements"))
+
+    (tmp_path / "data" / "sequences").mkdir()
+    pd.DataFrame(
+        {"AT-electricity-demand": np.ones(3)},
+        index=pd.date_range("2019-01-01", periods=3, freq="H", name="timeindex"),
+    ).to_csv(str(tmp_path / "data" / "sequences" / "electricity-demand_profile.csv"))
+
+    sequences = {"electricity-demand_profile": ["timeindex", "AT-electricity-demand"]}
+
+    create_datapackage_json(
+        select_components, "test", str(tmp_path), element_set, sequences
+    )
+    created = load_schemas(str(tmp_path / "datapackage.json"))
+
+    infer(select_components, "test", str(tmp_path))
+    inferred = load_schemas(str(tmp_path / "datapackage.json"))
+
+    assert sorted(created) == sorted(inferred)
+
+    for name, (path, schema) in inferred.items():
+        assert created[name][0] == path
+        assert [field["name"] for field in created[name][1]["fields"]] == [
+            field["name"] for field in schema["fields"]
+        ]
+        assert created[name][1].get("primaryKey") == schema.get("primaryKey")
+        assert created[name][1].get("foreignKeys") == schema.get("foreignKeys")
+
+    fields = {field["name"]: field["type"] for field in created["ch4-gt"][1]["fields"]}
+    assert fields["capacity"] == "number"
+    assert fields["from_bus"] == "string"
+    assert fields["output_parameters"] == "object"
+
+    foreign_keys = created["electricity-demand"][1]["foreignKeys"]
+    assert [fk["fields"] for fk in foreign_keys] == ["bus", "profile"]
+    assert foreign_keys[1]["reference"]["resource"] == "electricity-demand_profile"
+    assert [fk["fields"] for fk in created["ch4-bpchp"][1]["foreignKeys"]] == [
+        "fuel_bus",
+        "electricity_bus",
+        "heat_bus",
+    ]
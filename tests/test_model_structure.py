@@ -0,0 +1,64 @@
+import os
+
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from oemof_flexmex.model_structure import (
+    convert_dtypes_like_csv,
+    create_default_elements,
+    create_element_set,
+)
+
+
+def test_element_set_equals_csv_files(tmp_path):
+    r"""
+    Elements created in memory equal the elements written to and read from CSV files, also
+    with regard to dtypes, for all components and after updating values in memory. Writing in
+    parallel gives the same files.
+    """
+    select_components = ["electricity-demand", "electricity-bev", "ch4-gt"]
+
+    create_default_elements(str(tmp_path / "csv"), select_components=select_components)
+
+    element_set = create_element_set(select_components=select_components)
+
+    assert sorted(element_set) == sorted(select_components + ["bus"])
+
+    for name in element_set:
+        assert_frame_equal(
+            element_set[name],
+            pd.read_csv(str(tmp_path / "csv" / (name + ".csv")), index_col="region"),
+        )
+
+    element_set.to_csv(str(tmp_path / "parallel"), max_workers=4)
+
+    for name in element_set:
+        with open(os.path.join(str(tmp_path / "csv"), name + ".csv")) as a, open(
+            os.path.join(str(tmp_path / "parallel"), name + ".csv")
+        ) as b:
+            assert a.read() == b.read()
+
+    # all components, with values of other types set in memory and converted again
+    element_set = create_element_set()
+
+    element_set["bus"].loc[:, "balanced"] = ["True", "False"] * (
+        len(element_set["bus"]) // 2
+    )
+    element_set["electricity-demand"].loc[:, "amount"] = ""
+    element_set["ch4-gt"].loc[:, "tech"] = 1
+    element_set["ch4-gt"].iloc[0, element_set["ch4-gt"].columns.get_loc("tech")] = "gt"
+
+    for name in element_set:
+        element_set[name] = convert_dtypes_like_csv(element_set[name])
+
+    element_set.to_csv(str(tmp_path / "all"))
+
+    for name in element_set:
+        assert_frame_equal(
+            element_set[name],
+            pd.read_csv(str(tmp_path / "all" / (name + ".csv")), index_col="region"),
+        )
+
+    assert element_set["bus"]["balanced"].dtype == bool
+    assert element_set["electricity-demand"]["amount"].isna().all()
+    assert element_set["ch4-gt"]["tech"].dtype == object
@@ -0,0 +1,41 @@
+import pytest
+
+from oemof_flexmex.optimization import get_solver_options, get_solver_settings
+
+
+def test_solver_settings():
+    r"""
+    The solver section of a scenario updates the selected solver profile and the options are
+    merged. Threads and time limit are passed with the solver's own option names.
+    """
+    solver_settings = get_solver_settings(
+        {"profile": "cbc-parallel", "time_limit": 600, "options": {"presolve": "on"}}
+    )
+
+    assert solver_settings["name"] == "cbc"
+    assert solver_settings["threads"] == 4
+
+    assert get_solver_options(solver_settings) == {
+        "ratioGap": 0.0001,
+        "presolve": "on",
+        "threads": 4,
+        "sec": 600,
+    }
+
+    assert get_solver_settings() == {"name": "cbc", "options": {}}
+    assert get_solver_settings("glpk")["name"] == "glpk"
+
+    assert get_solver_options({"name": "gurobi", "threads": 2, "options": {}}) == {
+        "Threads": 2
+    }
+
+
+def test_solver_settings_errors():
+    r"""
+    Undefined profiles and settings a solver does not support raise errors.
+    """
+    with pytest.raises(ValueError, match="is not defined"):
+        get_solver_settings({"profile": "undefined"})
+
+    with pytest.raises(ValueError, match="not supported for solver 'glpk'"):
+        get_solver_options(get_solver_settings({"profile": "glpk", "threads": 2}))
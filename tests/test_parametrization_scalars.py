@@ -0,0 +1,60 @@
+import pandas as pd
+from pandas.testing import assert_series_equal
+
+from oemof_flexmex.parametrization_scalars import ScalarsIndex, get_parameter_values
+
+
+scalars = pd.DataFrame(
+    {
+        "Scenario": ["ALL", "FlexMex1", "FlexMex1", "FlexMex1"],
+        "Region": ["ALL", "AT", "DE", "FR"],
+        "Year": ["ALL", 2050, 2050, 2050],
+        "Parameter": [
+            "Energy_Price_CO2",
+            "Energy_FinalEnergy_Electricity",
+            "Energy_FinalEnergy_Electricity",
+            "Energy_FinalEnergy_Electricity",
+        ],
+        "Unit": ["Eur/t", "GWh", "GWh", "GWh"],
+        "Value": [100.0, 60.0, 500.0, 450.0],
+    }
+)
+
+
+def test_scalars_index_single_value():
+    r"""
+    A parameter given for 'ALL' regions is returned as a plain value.
+    """
+    scalars_index = ScalarsIndex(scalars)
+
+    value = get_parameter_values(scalars_index, "Energy_Price_CO2")
+
+    assert value == get_parameter_values(scalars, "Energy_Price_CO2")
+    assert value == 100.0
+
+
+def test_scalars_index_regional_values():
+    r"""
+    A parameter given per region is returned as a 'Region'-indexed Series.
+    """
+    scalars_index = ScalarsIndex(scalars)
+
+    values = get_parameter_values(scalars_index, "Energy_FinalEnergy_Electricity")
+
+    assert_series_equal(
+        values, get_parameter_values(scalars, "Energy_FinalEnergy_Electricity")
+    )
+
+
+def test_scalars_index_missing_parameter():
+    r"""
+    A missing parameter yields an empty Series, as does the lookup on the DataFrame.
+    """
+    scalars_index = ScalarsIndex(scalars)
+
+    assert "Energy_Price_CH4" not in scalars_index
+
+    assert_series_equal(
+        get_parameter_values(scalars_index, "Energy_Price_CH4"),
+        get_parameter_values(scalars, "Energy_Price_CH4"),
+    )
@@ -0,0 +1,127 @@
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from oemof_flexmex.parametrization_sequences import (
+    combine_profiles,
+    load_profile_store,
+    resample_profiles,
+    save_sequences,
+)
+from oemof_flexmex.postprocessing import upsample_sequences
+
+
+def write_raw_profiles(raw_profile_path, profiles):
+    os.makedirs(raw_profile_path)
+    for region, values in profiles.items():
+        pd.DataFrame({"timeindex": np.arange(1, 8761), "value": values}).to_csv(
+            os.path.join(raw_profile_path, f"FlexMex1_{region}_2050.csv"), index=False
+        )
+
+
+def test_profile_store(tmp_path):
+    r"""
+    Profiles combined from the profile store equal those read from the CSV files.
+    """
+    raw_profile_path = str(tmp_path / "Wind")
+    store_dir = str(tmp_path / "store")
+
+    write_raw_profiles(
+        raw_profile_path,
+        {"DE": np.linspace(0, 1, 8760), "AT": np.ones(8760, dtype=int)},
+    )
+
+    from_csv = combine_profiles(raw_profile_path, "wind-profile", store_dir=None)
+
+    from_store = combine_profiles(raw_profile_path, "wind-profile", store_dir=store_dir)
+    assert_frame_equal(from_csv, from_store)
+
+    profiles, region_index = load_profile_store(raw_profile_path, store_dir)
+
+    assert isinstance(profiles, np.memmap)
+    assert profiles.shape == (2, 8760)
+    assert list(region_index["region"]) == ["AT", "DE"]
+
+    from_store = combine_profiles(raw_profile_path, "wind-profile", store_dir=store_dir)
+    assert_frame_equal(from_csv, from_store)
+
+    assert len(os.listdir(store_dir)) == 2
+
+
+def test_save_sequences_to_store(tmp_path):
+    r"""
+    Identical sequences of two datapackages are written once and shared via the store.
+    """
+    store_dir = str(tmp_path / "store")
+
+    profile_df = pd.DataFrame(
+        {"AT-wind-profile": np.linspace(0, 1, 24)},
+        index=pd.DatetimeIndex(
+            pd.date_range("2019-01-01", freq="H", periods=24).values, name="timeindex"
+        ),
+    )
+
+    destinations = [str(tmp_path / f"wind_profile_{i}.csv") for i in range(2)]
+
+    for destination in destinations:
+        save_sequences(profile_df.copy(), destination, sequence_store_dir=store_dir)
+
+    assert len(os.listdir(store_dir)) == 1
+
+    for destination in destinations:
+        assert_frame_equal(
+            pd.read_csv(destination, index_col=0, parse_dates=True),
+            profile_df,
+        )
+
+    save_sequences(profile_df * 2, destinations[0], sequence_store_dir=store_dir)
+
+    assert len(os.listdir(store_dir)) == 2
+
+    # saving edited sequences without the store leaves the shared file in the store untouched
+    def read_store():
+        return {
+            filename: open(os.path.join(store_dir, filename)).read()
+            for filename in os.listdir(store_dir)
+        }
+
+    stored = read_store()
+
+    save_sequences(profile_df * 3, destinations[1])
+
+    assert_frame_equal(
+        pd.read_csv(destinations[1], index_col=0, parse_dates=True), profile_df * 3
+    )
+
+    assert read_store() == stored
+
+
+def test_resample_profiles():
+    r"""
+    Rates are averaged, energy shares keep their energy per time step. Up-sampling the result
+    to hourly values gives back the energy of each time step.
+    """
+    profile_df = pd.DataFrame(
+        {
+            "AT-demand-profile": np.arange(1, 13) / 78,
+            "AT-wind-profile": np.arange(12) / 11,
+        },
+        index=pd.date_range("2019-01-01", freq="H", periods=12, name="timeindex"),
+    )
+
+    mean = resample_profiles(profile_df, "3H", how="mean")
+    summed = resample_profiles(profile_df, "3H", how="sum")
+
+    assert len(mean) == 4
+    assert mean.index.name == "timeindex"
+    assert np.allclose(mean["AT-wind-profile"], [1 / 11, 4 / 11, 7 / 11, 10 / 11])
+    assert np.isclose((summed["AT-demand-profile"] * 3).sum(), 1)
+
+    hourly = upsample_sequences(summed)
+
+    assert_frame_equal(
+        hourly.index.to_frame(), profile_df.index.to_frame(), check_names=False
+    )
+    assert np.isclose(hourly["AT-demand-profile"].sum(), 1)
@@ -0,0 +1,516 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+from oemof.outputlib import processing
+from oemof.solph import Bus, EnergySystem, Model
+from oemof.tabular import facades
+from oemof.tools.economics import annuity
+
+from oemof_flexmex.facades import AsymmetricStorage, Bev
+from oemof_flexmex.postprocessing import (
+    get_capacities,
+    get_costs,
+    get_node_table,
+    get_required_keys,
+    get_sequences_by_tech,
+    map_to_flexmex_results,
+    save_flexmex_timeseries,
+)
+from oemof_flexmex.results_array import extract_results
+from oemof_flexmex.results_store import (
+    get_node_metadata,
+    load_node_metadata,
+    load_results,
+    write_results,
+)
+
+solver = "cbc"
+
+
+def create_energysystem():
+    es = EnergySystem(timeindex=pd.date_range("2019-01-01", periods=3, freq="H"))
+
+    bus = Bus(label="AT-electricity")
+
+    es.add(bus)
+
+    es.add(
+        facades.Dispatchable(
+            label="AT-ch4-gt",
+            type="dispatchable",
+            carrier="ch4",
+            tech="gt",
+            bus=bus,
+            capacity=10,
+            marginal_cost=10,
+        )
+    )
+
+    es.add(
+        facades.Volatile(
+            label="AT-wind-onshore",
+            type="volatile",
+            carrier="wind",
+            tech="onshore",
+            bus=bus,
+            capacity=20,
+            profile=[1, 0, 0],
+        )
+    )
+
+    es.add(
+        facades.Load(
+            label="AT-electricity-demand",
+            type="load",
+            carrier="electricity",
+            tech="demand",
+            bus=bus,
+            amount=6,
+            profile=[0, 1, 1],
+        )
+    )
+
+    es.add(
+        facades.Excess(
+            label="AT-electricity-curtailment",
+            type="excess",
+            carrier="electricity",
+            tech="curtailment",
+            bus=bus,
+        )
+    )
+
+    es.add(
+        facades.Storage(
+            label="AT-electricity-liionbattery",
+            type="storage",
+            carrier="electricity",
+            tech="liionbattery",
+            bus=bus,
+            expandable=True,
+            capacity_cost=1,
+            storage_capacity_cost=1,
+            invest_relation_output_capacity=1,
+            efficiency=1,
+        )
+    )
+
+    es.add(
+        AsymmetricStorage(
+            label="AT-h2-cavern",
+            type="asymmetric storage",
+            carrier="h2",
+            tech="cavern",
+            bus=bus,
+            expandable=True,
+            capacity_charge=0,
+            capacity_discharge=0,
+            storage_capacity=0,
+            capacity_cost_charge=2,
+            capacity_cost_discharge=2,
+            storage_capacity_cost=2,
+        )
+    )
+
+    return es
+
+
+def test_get_node_table():
+    es = create_energysystem()
+
+    node_table = get_node_table(get_node_metadata(es).set_index("label"))
+
+    assert list(node_table.index[node_table["is_bus"]]) == ["AT-electricity"]
+    assert list(node_table.index[node_table["is_sink"]]) == [
+        "AT-electricity-demand",
+        "AT-electricity-curtailment",
+    ]
+    assert node_table.at["AT-electricity-liionbattery", "storage_role"] == "storage"
+    assert node_table.at["AT-h2-cavern", "storage_role"] == "asymmetric storage"
+    assert node_table["storage_role"].notna().sum() == 2
+    assert list(node_table["position"]) == list(range(len(node_table)))
+
+
+def test_get_capacities():
+    r"""
+    Invested capacities of the charge and discharge devices are labelled with the storage,
+    exogenous capacities are read from the components.
+    """
+    es = create_energysystem()
+
+    m = Model(es)
+    m.solve(solver=solver)
+
+    capacities = get_capacities(
+        extract_results(m), get_node_metadata(es).set_index("label")
+    )
+
+    assert list(capacities.index.names) == [
+        "region",
+        "name",
+        "type",
+        "carrier",
+        "tech",
+        "var_name",
+    ]
+
+    capacities = capacities.reset_index()
+
+    assert list(zip(capacities["name"], capacities["var_name"])) == [
+        ("AT-electricity-liionbattery", "capacity_charge_invest"),
+        ("AT-h2-cavern", "capacity_charge_invest"),
+        ("AT-electricity-liionbattery", "capacity_discharge_invest"),
+        ("AT-h2-cavern", "capacity_discharge_invest"),
+        ("AT-ch4-gt", "capacity"),
+        ("AT-wind-onshore", "capacity"),
+        ("AT-electricity-liionbattery", "storage_capacity"),
+        ("AT-h2-cavern", "capacity_charge"),
+        ("AT-h2-cavern", "capacity_discharge"),
+        ("AT-h2-cavern", "storage_capacity"),
+        ("AT-electricity-liionbattery", "storage_capacity_invest"),
+        ("AT-h2-cavern", "storage_capacity_invest"),
+    ]
+
+    h2_cavern = capacities.loc[capacities["name"] == "AT-h2-cavern"]
+    assert (h2_cavern["carrier"] == "h2").all()
+    assert (h2_cavern["type"] == "asymmetric storage").all()
+
+    # the storages shift the wind power of the first time step to the demand
+    invest = capacities.loc[capacities["var_name"].str.endswith("_invest")]
+    assert invest["var_value"].sum() > 0
+
+
+def test_get_sequences_by_tech():
+    r"""
+    The sequences are labelled by region, carrier-tech and their role for the component.
+    """
+    es = create_energysystem()
+
+    m = Model(es)
+    m.solve(solver=solver)
+
+    results = extract_results(m)
+
+    sequences_by_tech = get_sequences_by_tech(
+        results, get_node_metadata(es).set_index("label")
+    )
+
+    assert list(sequences_by_tech.columns.names) == [
+        "region",
+        "carrier_tech",
+        "var_name",
+    ]
+    # loads and excess of oemof.tabular only keep carrier and tech in a datapackage
+    columns = [column for column in sequences_by_tech.columns if pd.notna(column[1])]
+
+    assert sorted(columns) == [
+        ("AT", "ch4-gt", "flow_out"),
+        ("AT", "electricity-liionbattery", "flow_in"),
+        ("AT", "electricity-liionbattery", "flow_out"),
+        ("AT", "electricity-liionbattery", "storage_content"),
+        ("AT", "h2-cavern", "flow_in"),
+        ("AT", "h2-cavern", "flow_out"),
+        ("AT", "h2-cavern", "storage_content"),
+        ("AT", "wind-onshore", "flow_out"),
+    ]
+
+    wind = sequences_by_tech[("AT", "wind-onshore", "flow_out")]
+    assert wind.values.ravel().tolist() == [20, 0, 0]
+    assert sequences_by_tech.index.equals(results.timeindex)
+
+
+def test_get_required_keys(tmp_path):
+    r"""
+    The results loaded with the required keys leave out the flows of the internal bus of a
+    Bev, but give the same sequences by tech and capacities as all results.
+    """
+    es = create_energysystem()
+
+    es.add(
+        Bev(
+            label="AT-electricity-bev",
+            bus=es.groups["AT-electricity"],
+            carrier="electricity",
+            tech="bev",
+            storage_capacity=100,
+            capacity=5,
+            availability=[0.8, 0.7, 0.6],
+            drive_power=[0.01, 0.02, 0.02],
+            amount=10,
+            initial_storage_level=0.5,
+            efficiency_charging=0.95,
+            efficiency_discharging=0.9,
+            efficiency_v2g=0.8,
+            marginal_cost=1,
+        )
+    )
+
+    m = Model(es)
+    m.solve(solver=solver)
+
+    es.meta_results = processing.meta_results(m)
+    es.results = extract_results(m)
+
+    write_results(es, str(tmp_path))
+
+    nodes = load_node_metadata(str(tmp_path))
+    keys = get_required_keys(str(tmp_path), nodes)
+
+    results = load_results(str(tmp_path))
+    required = load_results(str(tmp_path), keys=keys)
+
+    assert len(required.rows) < len(results.rows)
+    assert (
+        "AT-electricity-bev-internal_bus",
+        "AT-electricity-bev-drive_power",
+    ) not in keys
+
+    # the columns contain NaN, which assert_frame_equal of pandas 0.25 cannot look up
+    sequences_by_tech = get_sequences_by_tech(required, nodes)
+    expected = get_sequences_by_tech(results, nodes)
+
+    assert sequences_by_tech.columns.equals(expected.columns)
+    np.testing.assert_array_equal(sequences_by_tech.values, expected.values)
+
+    pd.testing.assert_frame_equal(
+        get_capacities(required, nodes), get_capacities(results, nodes)
+    )
+
+
+def test_map_to_flexmex_results(caplog):
+    r"""
+    Values are mapped by parameter and key and converted to GWh. Keys that are missing or
+    not unique are left empty and logged once.
+    """
+    template = pd.DataFrame(
+        {
+            "UseCase": ["FlexMex1_1", "FlexMex1_1", "FlexMex1_1", "FlexMex1_2"],
+            "Region": ["AT", "AT", "DE", "AT"],
+            "Parameter": ["Energy_Gas", "Capacity_Gas", "Energy_Gas", "Energy_Gas"],
+            "Value": np.nan,
+        }
+    )
+    mapping = pd.DataFrame(
+        {
+            "Parameter": ["Energy_Gas", "Capacity_Gas"],
+            "carrier": ["ch4", "ch4"],
+            "tech": ["gt", "gt"],
+            "var_name": ["flow_out", "capacity"],
+        }
+    )
+    oemoflex_scalars = pd.DataFrame(
+        {
+            "region": ["AT", "AT", "DE", "DE", np.nan, np.nan],
+            "carrier": ["ch4", "ch4", "ch4", "ch4", np.nan, np.nan],
+            "tech": ["gt", "gt", "gt", "gt", np.nan, np.nan],
+            "var_name": [
+                "flow_out",
+                "capacity",
+                "flow_out",
+                "flow_out",
+                "cost_varom",
+                "cost_varom",
+            ],
+            "var_value": [12345.0, 10.4, 1.0, 2.0, 3.0, 4.0],
+            "var_unit": ["MWh", "MW", "MWh", "MWh", "Eur", "Eur"],
+        }
+    )
+
+    with caplog.at_level(logging.INFO):
+        flexmex_scalars = map_to_flexmex_results(
+            oemoflex_scalars, template, mapping, "FlexMex1_1"
+        )
+
+    assert flexmex_scalars["Value"][:2].tolist() == [12.0, 10.0]
+    assert flexmex_scalars["Value"][2:].isna().all()
+    assert (flexmex_scalars["Modell"] == "oemof").all()
+
+    messages = [record.getMessage() for record in caplog.records]
+    assert len(messages) == 1
+    assert "('DE', 'ch4', 'gt', 'flow_out')" in messages[0]
+
+
+def test_get_costs():
+    r"""
+    Costs are the summed flows and invested capacities times their cost factors, per
+    component and cost.
+    """
+    prep_elements = {
+        "ch4-gt": pd.DataFrame(
+            {
+                "region": ["AT", "DE"],
+                "name": ["AT-ch4-gt", "DE-ch4-gt"],
+                "type": "conversion",
+                "carrier": "ch4",
+                "tech": "gt",
+                "marginal_cost": [2.0, 3.0],
+                "carrier_cost": 40.0,
+                "expandable": True,
+            }
+        ),
+        "electricity-liion_battery": pd.DataFrame(
+            {
+                "region": ["AT"],
+                "name": ["AT-electricity-liion-battery"],
+                "type": "storage",
+                "carrier": "electricity",
+                "tech": "liion_battery",
+                "expandable": True,
+            }
+        ),
+        "electricity-transmission": pd.DataFrame(
+            {
+                "region": ["AT_DE"],
+                "name": ["AT-DE"],
+                "type": "link",
+                "carrier": "electricity",
+                "tech": "transmission",
+                "marginal_cost": [0.5],
+            }
+        ),
+    }
+
+    parameters = {
+        "EnergyConversion_InterestRate_ALL": 5,
+        "Energy_Price_CH4": 30,
+        "Energy_Price_CO2": 100,
+        "Energy_EmissionFactor_CH4": 0.1,
+        "EnergyConversion_Capex_Electricity_CH4_GT": 400,
+        "EnergyConversion_FixOM_Electricity_CH4_GT": 2,
+        "EnergyConversion_LifeTime_Electricity_CH4_GT": 30,
+        "Storage_Capex_Electricity_LiIonBatteryCharge": 100,
+        "Storage_LifeTime_Electricity_LiIonBatteryCharge": 20,
+        "Storage_Capex_Electricity_LiIonBatteryDischarge": 50,
+        "Storage_LifeTime_Electricity_LiIonBatteryDischarge": 20,
+        "Storage_Capex_Electricity_LiIonBatteryStorage": 2000,
+        "Storage_LifeTime_Electricity_LiIonBatteryStorage": 10,
+        "Storage_FixOM_Electricity_LiIonBattery": 1,
+    }
+    scalars_raw = pd.DataFrame(
+        {
+            "Region": "ALL",
+            "Parameter": list(parameters),
+            "Value": list(parameters.values()),
+        }
+    )
+    gt_at = ("AT", "AT-ch4-gt", "conversion", "ch4", "gt")
+    gt_de = ("DE", "DE-ch4-gt", "conversion", "ch4", "gt")
+    battery = (
+        "AT",
+        "AT-electricity-liion-battery",
+        "storage",
+        "electricity",
+        "liion_battery",
+    )
+    link = ("AT_DE", "AT-DE", "link", "electricity", "transmission")
+
+    oemoflex_scalars = pd.DataFrame(
+        [
+            gt_at + ("flow_out", 100.0),
+            gt_at + ("flow_in", 250.0),
+            gt_at + ("invest", 10.0),
+            gt_de + ("flow_out", 200.0),
+            gt_de + ("flow_in", 500.0),
+            battery + ("capacity_charge_invest", 4.0),
+            battery + ("capacity_discharge_invest", 4.0),
+            battery + ("storage_capacity_invest", 16.0),
+            link + ("flow_net_forward", 30.0),
+            link + ("flow_net_backward", 10.0),
+        ],
+        columns=["region", "name", "type", "carrier", "tech", "var_name", "var_value"],
+    )
+
+    costs = get_costs(oemoflex_scalars, prep_elements, scalars_raw)
+
+    assert (costs["var_unit"] == "Eur").all()
+
+    costs = costs.set_index(["name", "var_name"])["var_value"]
+
+    assert list(costs.index) == [
+        ("AT-ch4-gt", "cost_varom"),
+        ("DE-ch4-gt", "cost_varom"),
+        ("AT-DE", "cost_varom"),
+        ("AT-ch4-gt", "cost_carrier"),
+        ("DE-ch4-gt", "cost_carrier"),
+        ("AT-ch4-gt", "cost_fuel"),
+        ("DE-ch4-gt", "cost_fuel"),
+        ("AT-ch4-gt", "cost_emission"),
+        ("DE-ch4-gt", "cost_emission"),
+        ("AT-ch4-gt", "cost_invest"),
+        ("AT-electricity-liion-battery", "cost_invest"),
+        ("AT-ch4-gt", "cost_fixom"),
+        ("AT-electricity-liion-battery", "cost_fixom"),
+    ]
+
+    assert costs[("DE-ch4-gt", "cost_varom")] == 200 * 3
+    assert costs[("AT-DE", "cost_varom")] == (30 + 10) * 0.5
+    assert costs[("DE-ch4-gt", "cost_carrier")] == 500 * 40
+    # the carrier cost is split into fuel and emission cost by price
+    assert np.isclose(costs[("DE-ch4-gt", "cost_fuel")], 500 * 40 * 30 / 40)
+    assert np.isclose(costs[("DE-ch4-gt", "cost_emission")], 500 * 40 * 10 / 40)
+
+    assert costs[("AT-ch4-gt", "cost_invest")] == 10 * annuity(400, 30, 0.05)
+    assert np.isclose(
+        costs[("AT-electricity-liion-battery", "cost_invest")],
+        4 * annuity(100, 20, 0.05)
+        + 4 * annuity(50, 20, 0.05)
+        + 16 * annuity(2000 * 1e-3, 10, 0.05),
+    )
+    assert np.isclose(costs[("AT-ch4-gt", "cost_fixom")], 10 * 0.02 * 400)
+    assert np.isclose(
+        costs[("AT-electricity-liion-battery", "cost_fixom")],
+        0.01 * (4 * 100 + 4 * 50 + 16 * 2000 * 1e-3),
+    )
+
+
+def test_save_flexmex_timeseries(tmp_path):
+    r"""
+    The timeseries are written as by pd.DataFrame.to_csv(), one file per region, carrier-tech
+    and variable. Only the directories of the files are created.
+    """
+    sequences_by_tech = pd.DataFrame(
+        {
+            ("AT", "ch4-bpchp", "flow_electricity"): [1.0, 0.1 + 0.2, np.nan],
+            ("AT", "ch4-bpchp", "flow_heat"): [2.0, -0.0, 1e-20],
+            ("DE", "ch4-bpchp", "flow_electricity"): [3.0, 4.0, 5.0],
+            ("DE", "ch4-bpchp", "flow_fuel"): [6.0, 7.0, 8.0],
+            ("DE", "unknown-tech", "flow_out"): [9.0, 9.0, 9.0],
+        },
+        index=pd.date_range("2019-01-01", periods=3, freq="H"),
+    )
+    sequences_by_tech.columns.names = ["region", "carrier_tech", "var_name"]
+
+    for max_workers in [None, 2]:
+        dir = str(tmp_path / str(max_workers))
+
+        save_flexmex_timeseries(
+            sequences_by_tech, "FlexMex1", "oemof", "2050", dir, max_workers=max_workers
+        )
+
+        assert sorted(os.listdir(os.path.join(dir, "CHP", "BpCCGT"))) == [
+            "ElectricityGeneration",
+            "HeatGeneration",
+        ]
+        assert os.listdir(dir) == ["CHP"]
+
+        for region, var_name, subdir in [
+            ("AT", "flow_electricity", "ElectricityGeneration"),
+            ("AT", "flow_heat", "HeatGeneration"),
+            ("DE", "flow_electricity", "ElectricityGeneration"),
+        ]:
+            expected = (
+                sequences_by_tech[(region, "ch4-bpchp", var_name)]
+                .reset_index(drop=True)
+                .rename("value")
+                .rename_axis("timeindex")
+                .to_frame()
+                .to_csv()
+            )
+
+            path = os.path.join(
+                dir, "CHP", "BpCCGT", subdir, f"FlexMex1_oemof_{region}_2050.csv"
+            )
+            with open(path) as file:
+                assert file.read() == expected
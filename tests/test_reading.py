@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+from oemof.solph import EnergySystem
+
+# DONT REMOVE THIS LINE!
+# pylint: disable=unused-import
+from oemof.tabular import datapackage  # noqa
+from oemof_flexmex.facades import TYPEMAP
+from oemof_flexmex.inferring import create_datapackage_json, select_foreign_keys
+from oemof_flexmex.model_structure import create_element_set
+from oemof_flexmex.reading import check_if_energysystems_equal, load_energysystem
+
+
+def test_load_energysystem(tmp_path):
+    r"""
+    The EnergySystem loaded from DataFrames equals the one created by
+    EnergySystem.from_datapackage, including busses, profiles and subnodes.
+    """
+    select_components = [
+        "electricity-demand",
+        "electricity-heatpump-small",
+        "electricity-transmission",
+        "electricity-liion_battery",
+        "electricity-bev",
+    ]
+
+    element_set = create_element_set(select_components=select_components)
+    for name in select_components:
+        for column, values in element_set[name].items():
+            if values.dtype == float and values.isna().all():
+                element_set[name][column] = 0.5
+    element_set.to_csv(str(tmp_path / "data" / "elements"))
+
+    (tmp_path / "data" / "sequences").mkdir()
+    timeindex = pd.date_range("2019-01-01", periods=4, freq="H", name="timeindex")
+
+    sequences = {}
+    for key, components in select_foreign_keys(select_components).items():
+        if key in ["bus", "from_to_bus", "chp"]:
+            continue
+
+        for name in components:
+            resource = name + "_profile" if key == "profile" else key + "_profile"
+            columns = list(element_set[name][key])
+            sequences_df = pd.DataFrame(
+                np.linspace(0.1, 0.7, 4 * len(columns)).reshape(4, -1),
+                index=timeindex,
+                columns=columns,
+            )
+            sequences_df.to_csv(
+                str(tmp_path / "data" / "sequences" / (resource + ".csv"))
+            )
+            sequences[resource] = [timeindex.name] + columns
+
+    create_datapackage_json(
+        select_components, "test", str(tmp_path), element_set, sequences
+    )
+
+    path = str(tmp_path / "datapackage.json")
+
+    es = load_energysystem(path, typemap=TYPEMAP)
+
+    check_if_energysystems_equal(
+        EnergySystem.from_datapackage(path, attributemap={}, typemap=TYPEMAP), es
+    )
+
+    demand = es.groups["AT-electricity-demand"]
+    assert isinstance(demand.profile, np.ndarray)
+    assert demand.bus is es.groups["AT-electricity"]
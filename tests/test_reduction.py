@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from oemof.solph import Bus, Flow, Source, Transformer
+from oemof.solph.components import GenericStorage
+
+from oemof_flexmex.reduction import (
+    add_zero_results,
+    get_inactive_nodes,
+    reduce_energysystem,
+)
+from oemof_flexmex.results_array import extract_results
+
+
+def add_inactive_nodes(es):
+    r"""
+    Adds components with zero capacity, zero profiles or zero outputs and the buses they need
+    to the EnergySystem of the tests.
+    """
+    bus = es.groups["bus"]
+    gas = Bus(label="gas")
+    h2 = Bus(label="h2")
+
+    gas_import = Source(label="gas-import", outputs={gas: Flow(variable_costs=2)})
+    pv = Source(
+        label="pv",
+        outputs={bus: Flow(nominal_value=5, actual_value=[0, 0, 0, 0], fixed=True)},
+    )
+    gt = Transformer(
+        label="gt",
+        inputs={gas: Flow()},
+        outputs={bus: Flow(nominal_value=0, variable_costs=1)},
+        conversion_factors={bus: 0.5},
+    )
+    h2_storage = GenericStorage(
+        label="h2-storage",
+        inputs={h2: Flow(nominal_value=0)},
+        outputs={h2: Flow(nominal_value=0)},
+        nominal_storage_capacity=0,
+    )
+
+    es.add(gas, h2, gas_import, pv, gt, h2_storage)
+
+    return es
+
+
+def test_get_inactive_nodes(create_energysystem):
+    r"""
+    Components with zero capacity, zero profiles or zero outputs are inactive.
+    """
+    inactive = get_inactive_nodes(add_inactive_nodes(create_energysystem()))
+
+    assert [node.label for node in inactive] == ["pv", "gt", "h2-storage"]
+
+
+def test_reduce_energysystem(create_energysystem, solve):
+    r"""
+    The reduced model has the same objective and, with the zero results added, the same
+    results as the model of the whole EnergySystem.
+    """
+    m = solve(add_inactive_nodes(create_energysystem()))
+    expected = extract_results(m)
+
+    reduced_es, zero_results = reduce_energysystem(
+        add_inactive_nodes(create_energysystem())
+    )
+
+    assert sorted(node.label for node in reduced_es.nodes) == [
+        "bus",
+        "cheap",
+        "expensive",
+        "gas",
+        "gas-import",
+        "sink",
+        "storage",
+    ]
+
+    m_reduced = solve(reduced_es)
+    results = add_zero_results(extract_results(m_reduced), zero_results)
+
+    assert np.isclose(m_reduced.objective(), m.objective())
+
+    assert results.rows == expected.rows
+    assert np.allclose(results.values, expected.values)
+
+    pd.testing.assert_frame_equal(results.scalars, expected.scalars)
+
+
+def test_reduce_energysystem_keeps_es(create_energysystem):
+    r"""
+    The inactive components are removed from a copy, the EnergySystem passed in keeps all of
+    its nodes, inputs and outputs.
+    """
+    es = add_inactive_nodes(create_energysystem())
+
+    def get_edges(es):
+        return {
+            (str(node.label), str(target.label))
+            for node in es.nodes
+            for target in node.outputs
+        }
+
+    nodes = list(es.nodes)
+    edges = get_edges(es)
+
+    reduce_energysystem(es)
+
+    assert es.nodes == nodes
+    assert get_edges(es) == edges
+
+    for node in es.nodes:
+        for source in node.inputs:
+            assert node in source.outputs
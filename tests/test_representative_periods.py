@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from oemof_flexmex.representative_periods import (
+    cluster_sequences,
+    expand_periods,
+    get_objective_weighting,
+    load_periods,
+)
+
+
+def test_cluster_sequences(tmp_path):
+    r"""
+    Ten days of hourly sequences are clustered into two typical days. The weights add up to
+    the number of original days.
+    """
+    sequences_path = tmp_path / "sequences"
+    os.makedirs(str(sequences_path))
+
+    timeindex = pd.date_range("2019-01-01", freq="H", periods=240, name="timeindex")
+    day = np.arange(240) // 24
+
+    pd.DataFrame(
+        {"AT-wind-profile": np.where(day % 2, 0.8, 0.2)}, index=timeindex
+    ).to_csv(str(sequences_path / "wind_profile.csv"))
+    pd.DataFrame(
+        {"AT-electricity-demand-profile": np.full(240, 1 / 240)}, index=timeindex
+    ).to_csv(str(sequences_path / "electricity-demand_profile.csv"))
+
+    cluster_sequences(str(tmp_path), n_periods=2, sequence_store_dir=None)
+
+    period_weights, period_mapping = load_periods(str(tmp_path))
+
+    assert period_weights.sum() == 10
+    assert list(period_mapping["timesteps"]) == [24] * 10
+
+    wind = pd.read_csv(str(sequences_path / "wind_profile.csv"), index_col=0)
+
+    assert len(wind) == 48
+    assert sorted(wind["AT-wind-profile"].unique()) == [0.2, 0.8]
+
+    # wind and demand are clustered together
+    assert period_mapping.groupby("typical_period").size().tolist() == [5, 5]
+
+
+def test_cluster_sequences_partial_period(tmp_path):
+    r"""
+    A horizon of ten and a half days is clustered into typical days. The last half day counts
+    by its length, so the weights add up to 10.5 days.
+    """
+    sequences_path = tmp_path / "sequences"
+    os.makedirs(str(sequences_path))
+
+    timeindex = pd.date_range("2019-01-01", freq="H", periods=252, name="timeindex")
+    day = np.arange(252) // 24
+
+    pd.DataFrame(
+        {"AT-wind-profile": np.where(day % 2, 0.8, 0.2)}, index=timeindex
+    ).to_csv(str(sequences_path / "wind_profile.csv"))
+
+    cluster_sequences(str(tmp_path), n_periods=2, sequence_store_dir=None)
+
+    period_weights, period_mapping = load_periods(str(tmp_path))
+
+    assert list(period_mapping["timesteps"]) == [24] * 10 + [12]
+    assert np.isclose(period_weights.sum(), 10.5)
+
+    # the half day is represented by the typical day of the even days
+    last_typical_period = period_mapping["typical_period"].iloc[-1]
+    assert np.isclose(period_weights[last_typical_period], 5.5)
+
+
+def test_expand_periods():
+    r"""
+    Sequences of representative periods are expanded to the original periods. The objective
+    weighting of each time step is its period's weight.
+    """
+    sequences = pd.DataFrame(
+        {"flow": [1.0, 2.0, 3.0, 4.0]},
+        index=pd.date_range("2019-01-01", freq="H", periods=4, name="timeindex"),
+    )
+    period_mapping = pd.DataFrame(
+        {"period": [0, 1, 2], "typical_period": [1, 0, 1], "timesteps": [2, 2, 1]}
+    )
+
+    expanded = expand_periods(sequences, period_mapping, timesteps_per_period=2)
+
+    assert list(expanded["flow"]) == [3.0, 4.0, 1.0, 2.0, 3.0]
+    assert expanded.index[-1] == pd.Timestamp("2019-01-01 04:00")
+
+    period_weights = pd.Series(
+        [1.0, 1.5], index=pd.Index([0, 1], name="typical_period")
+    )
+
+    assert get_objective_weighting(period_weights, 2, timeincrement=1) == [
+        1.0,
+        1.0,
+        1.5,
+        1.5,
+    ]
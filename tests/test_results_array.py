@@ -0,0 +1,57 @@
+import numpy as np
+from oemof.outputlib import processing
+
+from oemof_flexmex.results_array import extract_results
+
+
+def test_extract_results(create_energysystem, solve):
+    r"""
+    The results are those of oemof.outputlib.processing.results(), keyed by labels and in the
+    same order.
+    """
+    m = solve(create_energysystem(storage="investment"))
+
+    results = extract_results(m)
+
+    expected = {
+        (str(source), None if target is None else str(target)): value
+        for (source, target), value in processing.results(m).items()
+    }
+
+    assert list(results) == list(expected)
+
+    for key, value in expected.items():
+        assert list(results[key]["sequences"].columns) == list(
+            value["sequences"].columns
+        )
+        assert np.allclose(results[key]["sequences"], value["sequences"])
+        assert results[key]["sequences"].index.equals(value["sequences"].index)
+
+        assert list(results[key]["scalars"].index) == list(value["scalars"].index)
+        assert np.allclose(results[key]["scalars"], value["scalars"])
+
+
+def test_get_rows(create_energysystem, solve):
+    r"""
+    Rows are selected by node and variable and their sequences are read from the array.
+    """
+    m = solve(create_energysystem(storage="investment"))
+
+    results = extract_results(m)
+
+    assert results.values.shape == (len(results.rows), 4)
+    assert results.get_variables() == ["capacity", "flow"]
+
+    rows = results.get_rows(label="storage")
+    assert [results.rows[row] for row in rows] == [
+        ("bus", "storage", "flow"),
+        ("storage", None, "capacity"),
+        ("storage", "bus", "flow"),
+    ]
+
+    rows = results.get_rows(label="bus", variable="flow")
+    sequences = results.get_sequences(rows)
+
+    assert list(sequences.columns.names) == ["from", "to", "type"]
+    assert sequences.shape == (4, 5)
+    assert np.allclose(sequences[("bus", "sink", "flow")], [6, 8, 12, 14])
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+import pytest
+from oemof.solph import Bus, EnergySystem
+
+from oemof_flexmex.results_store import (
+    get_node_metadata,
+    load_meta_results,
+    load_node_metadata,
+    load_results,
+    write_results,
+)
+
+
+def test_write_and_load_results(tmpdir, create_energysystem, solve):
+    r"""
+    The results loaded from the results store are those written.
+    """
+    es = create_energysystem()
+    solve(es)
+
+    write_results(es, str(tmpdir))
+
+    results = load_results(str(tmpdir))
+
+    expected = es.results
+
+    assert list(results) == list(expected)
+    assert results.rows == expected.rows
+    assert np.allclose(results.values, expected.values)
+
+    for key, value in expected.items():
+        assert np.allclose(value["sequences"], results[key]["sequences"])
+        assert list(value["sequences"].columns) == list(
+            results[key]["sequences"].columns
+        )
+        assert np.allclose(value["scalars"], results[key]["scalars"])
+
+    assert results[("storage", None)]["sequences"].index.freq == "H"
+
+    meta_results = load_meta_results(str(tmpdir))
+    assert np.isclose(meta_results["objective"], es.meta_results["objective"])
+
+
+def test_load_results_selected_keys(tmpdir, create_energysystem, solve):
+    es = create_energysystem()
+    solve(es)
+
+    write_results(es, str(tmpdir))
+
+    results = load_results(str(tmpdir), keys=[("expensive", "bus"), ("storage", None)])
+
+    assert list(results) == [("expensive", "bus"), ("storage", None)]
+    assert list(results[("storage", None)]["sequences"].columns) == ["capacity"]
+
+
+def test_load_results_without_sequences(tmpdir, solve):
+    r"""
+    Results without sequence files are loaded as empty results.
+    """
+    es = EnergySystem(timeindex=pd.date_range("2019-01-01", periods=4, freq="H"))
+    es.add(Bus(label="bus"))
+    solve(es)
+
+    write_results(es, str(tmpdir))
+
+    results = load_results(str(tmpdir))
+
+    assert list(results) == []
+    assert results.values.shape == (0, 0)
+    assert results.scalars.empty
+
+
+def test_node_metadata(tmpdir, create_energysystem, solve):
+    es = create_energysystem()
+    solve(es)
+
+    write_results(es, str(tmpdir))
+
+    nodes = load_node_metadata(str(tmpdir), columns=["class"])
+
+    assert list(nodes.columns) == ["class"]
+    assert nodes.at["storage", "class"] == "oemof.solph.components.GenericStorage"
+
+
+def test_node_metadata_unique_labels(create_energysystem):
+    es = create_energysystem()
+    es.add(Bus(label="bus"))
+
+    with pytest.raises(ValueError, match="unique"):
+        get_node_metadata(es)
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from oemof.outputlib import processing
+from oemof.solph import Model
+
+from oemof_flexmex.rolling_horizon import optimize_rolling_horizon
+
+
+# storing the cheap supply of the first two hours of each four pays off
+COSTS = [1, 1, 5, 5, 1, 1, 5, 5]
+
+
+def create_dispatch_energysystem(create_energysystem):
+    return create_energysystem(
+        demand=[6] * 8, cheap_cost=COSTS, expensive_cost=10, loss_rate=0.01
+    )
+
+
+def get_sequences_by_label(results):
+    return {
+        tuple(str(node) for node in key): value["sequences"]
+        for key, value in results.items()
+    }
+
+
+def test_rolling_horizon_single_window(create_energysystem):
+    r"""
+    A window covering all time steps gives the results of the model of the whole year.
+    """
+    es = create_dispatch_energysystem(create_energysystem)
+    m = Model(es)
+    m.solve(solver="cbc")
+    expected = get_sequences_by_label(processing.results(m))
+
+    results, meta_results = optimize_rolling_horizon(
+        create_dispatch_energysystem(create_energysystem),
+        timeincrement=1,
+        window=8,
+        look_ahead=2,
+    )
+    results = get_sequences_by_label(results)
+
+    for key, sequences in expected.items():
+        assert np.allclose(sequences, results[key])
+
+    assert np.isclose(meta_results["objective"], m.objective())
+
+
+def test_rolling_horizon_windows(create_energysystem):
+    r"""
+    Results of overlapping windows are stitched together. The storage content is carried
+    from one window to the next and the original attributes are reset afterwards.
+    """
+    es = create_dispatch_energysystem(create_energysystem)
+    bus, cheap, storage = es.groups["bus"], es.groups["cheap"], es.groups["storage"]
+
+    results, meta_results = optimize_rolling_horizon(
+        es, timeincrement=1, window=3, look_ahead=2
+    )
+
+    content = results[("storage", None)]["sequences"]["capacity"]
+    init_cap = results[("storage", None)]["scalars"]["init_cap"]
+    inflow = results[("bus", "storage")]["sequences"]["flow"]
+    outflow = results[("storage", "bus")]["sequences"]["flow"]
+
+    assert content.index.equals(es.timeindex)
+    assert np.isclose(content.iloc[-1], init_cap)
+
+    # the storage balance holds across the borders of the windows
+    previous = content.shift(1)
+    previous.iloc[0] = init_cap
+    assert np.allclose(content, previous * 0.99 + inflow - outflow)
+
+    assert storage.balanced
+    assert storage.initial_storage_level is None
+    assert len(es.flows()[(cheap, bus)].variable_costs) == 8
+
+    # the objective counts each time step once, not the look-ahead of the windows
+    cheap_supply = results[("cheap", "bus")]["sequences"]["flow"]
+    expensive_supply = results[("expensive", "bus")]["sequences"]["flow"]
+    assert np.isclose(
+        meta_results["objective"],
+        (cheap_supply * COSTS).sum() + (expensive_supply * 10).sum(),
+    )
+
+
+def test_rolling_horizon_expandable(create_energysystem):
+    r"""
+    Expandable components are not allowed in rolling horizon optimization.
+    """
+    es = create_dispatch_energysystem(create_energysystem)
+    es.groups["storage"].expandable = True
+
+    with pytest.raises(ValueError, match="dispatch scenarios only"):
+        optimize_rolling_horizon(es, timeincrement=1, window=3, look_ahead=2)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from oemof.solph import Model
+
+from oemof_flexmex.results_array import extract_results
+from oemof_flexmex.sweep import overwrite_scalars, set_flow_bounds, update_energysystem
+
+
+def test_update_energysystem(create_energysystem):
+    r"""
+    A model updated with the costs and capacities of a sweep point gives the same results as
+    a model built for the sweep point.
+    """
+    es = create_energysystem(loss_rate=0.01)
+    m = Model(es)
+    m.solve(solver="cbc")
+
+    es_point = create_energysystem(expensive_cost=2, cheap_capacity=12, loss_rate=0.01)
+
+    bound_flows = update_energysystem(es, es_point)
+    assert [(str(i), str(o)) for i, o in bound_flows] == [("cheap", "bus")]
+
+    set_flow_bounds(m, bound_flows)
+    m._add_objective(update=True)
+    m.solve(solver="cbc")
+
+    m_point = Model(es_point)
+    m_point.solve(solver="cbc")
+
+    assert np.isclose(m.objective(), m_point.objective())
+
+    results = extract_results(m)
+    expected = extract_results(m_point)
+
+    for key, value in expected.items():
+        assert np.allclose(value["sequences"], results[key]["sequences"])
+
+
+def test_update_energysystem_unsupported(create_energysystem):
+    r"""
+    Changes of attributes that enter the constraints cannot be transferred to the model.
+    """
+    es = create_energysystem(loss_rate=0.01)
+    Model(es)
+
+    with pytest.raises(ValueError, match="storage.loss_rate"):
+        update_energysystem(es, create_energysystem(loss_rate=0.02))
+
+
+def test_overwrite_scalars():
+    r"""
+    Swept parameters are set in all regions, other parameters are kept.
+    """
+    scalars = pd.DataFrame(
+        {
+            "Region": ["AT", "DE", "ALL"],
+            "Parameter": ["Energy_Price_CO2", "Energy_Price_CO2", "Energy_Price_CH4"],
+            "Value": [100.0, 100.0, 20.0],
+        }
+    )
+
+    overwritten = overwrite_scalars(scalars, {"Energy_Price_CO2": 50})
+
+    assert list(overwritten["Value"]) == [50.0, 50.0, 20.0]
+    assert list(scalars["Value"]) == [100.0, 100.0, 20.0]
+
+    with pytest.raises(ValueError, match="not in the scalars"):
+        overwrite_scalars(scalars, {"Energy_Price_Oil": 50})
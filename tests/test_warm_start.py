@@ -0,0 +1,53 @@
+import numpy as np
+from oemof.outputlib import processing
+from oemof.solph import Model
+
+from oemof_flexmex.warm_start import set_warm_start_values, split_index
+
+
+def get_reference_results(es):
+    m = Model(es)
+    m.solve(solver="cbc")
+
+    return {
+        (str(source), None if target is None else str(target)): value
+        for (source, target), value in processing.results(m).items()
+    }
+
+
+def test_split_index(create_energysystem):
+    es = create_energysystem()
+    bus, cheap = es.groups["bus"], es.groups["cheap"]
+
+    assert split_index((cheap, bus, 3)) == (("cheap", "bus"), 3)
+    assert split_index((bus, 3)) == (("bus", None), 3)
+    assert split_index(bus) == (("bus", None), None)
+
+
+def test_set_warm_start_values(create_energysystem):
+    r"""
+    Variables get the values of the reference with the same labels and timestamps, the other
+    variables are left out.
+    """
+    reference_results = get_reference_results(create_energysystem(storage=None))
+
+    # two more hours and a storage
+    m = Model(create_energysystem(demand=(6, 8, 12, 14, 10, 9)))
+
+    variables, n_variables = set_warm_start_values(m, reference_results)
+
+    # 4 time steps of the 2 free flows of the reference are set, out of 6 time steps of
+    # 4 free flows and the storage content and the initial storage content
+    assert len(variables) == 8
+    assert n_variables == 31
+
+    expected = reference_results[("expensive", "bus")]["sequences"]["flow"]
+    flow = [
+        m.flow[m.es.groups["expensive"], m.es.groups["bus"], t].value for t in range(4)
+    ]
+    assert np.allclose(flow, expected)
+
+    assert all(
+        m.flow[m.es.groups["expensive"], m.es.groups["bus"], t].value is None
+        for t in [4, 5]
+    )